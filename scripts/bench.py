@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""Benchmarks for the fetch-stats.py pipeline
+
+Each benchmark runs against a generated season-scale league or a recorded
+archive, so none of them needs the network. See "Benchmarks" in README.md.
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Union
+
+# Optional NumPy, only to compare batched percentiles against percentile_ranks
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import config
+import jsonio
+from config import COUNTRY_INFO, GAME_ID_START, set_workspace
+from fetch_layer import ReplayTransport, replay_latency
+from games_db import decode_boxscore
+from jsonio import available_json_backends, dump_json_file, json_dumps, json_loads, load_json_file, msgspec, \
+    set_json_backend
+from records import GameStatTable
+from scoring import PROFILE_STATS, percentile_ranks, profile_stat
+from stats_fetcher import StatsFetcher
+
+def write_synthetic_league(workspace: str, games: int = 1312, wally_teams: int = 12, roster_size: int = 30,
+                           nations: int = 32, seed: int = 2026) -> None:
+    """Write a deterministic season-scale workspace (rosters + FINAL boxscores) for benchmarks"""
+    rng = random.Random(seed)
+    os.makedirs(f"{workspace}/db/games", exist_ok=True)
+    os.makedirs(f"{workspace}/snapshots", exist_ok=True)
+    os.makedirs(f"{workspace}/site/public/data", exist_ok=True)
+    
+    # Nation depth charts: 20 forwards, 8 defense, 3 goalies each
+    codes = list(COUNTRY_INFO) + [f"N{i:02d}" for i in range(max(0, nations - len(COUNTRY_INFO)))]
+    codes = codes[:nations]
+    depth = {code: {"F": [], "D": [], "G": []} for code in codes}
+    for code in codes:
+        for pos, count in (("F", 20), ("D", 8), ("G", 3)):
+            for i in range(count):
+                depth[code][pos].append(f"{chr(65 + rng.randrange(26))}{code.lower()}{pos.lower()}{i} Synth{code}{pos}{i}")
+    
+    # Wally rosters drawn from the nation pools, plus a few non-Olympians per team
+    pool = [(name, code, pos) for code in codes for pos in ("F", "D", "G") for name in depth[code][pos]]
+    rng.shuffle(pool)
+    rosters = {}
+    for t in range(wally_teams):
+        picks = pool[t * (roster_size - 2):(t + 1) * (roster_size - 2)]
+        roster = [{"name": name, "pos": pos, "nhl_team": "SYN", "olympic_country": code} for name, code, pos in picks]
+        roster += [{"name": f"Bench{t}{i} Player", "pos": "F", "nhl_team": "SYN", "olympic_country": None} for i in range(2)]
+        rosters[f"Synthetic Team {t + 1}"] = roster
+    dump_json_file(rosters, f"{workspace}/rosters.json", indent=False)
+    
+    start = datetime(2025, 10, 7)
+    for g in range(games):
+        game_id = GAME_ID_START + g
+        home, away = rng.sample(codes, 2)
+        game_date = (start + timedelta(days=g * 180 // max(games, 1))).strftime('%Y-%m-%d')
+        scores = {home: rng.randint(0, 6), away: rng.randint(0, 6)}
+        
+        def side(code: str, goals_against: int) -> Dict:
+            def skater(name: str) -> Dict:
+                return {"playerId": rng.randrange(8_000_000, 8_999_999), "sweaterNumber": rng.randrange(1, 99),
+                        "name": {"default": f"{name[0]}. {name.split()[-1]}"}, "position": "C",
+                        "goals": rng.choice((0, 0, 0, 0, 1, 1, 2)), "assists": rng.choice((0, 0, 0, 1, 1, 2)),
+                        "points": 0, "plusMinus": rng.randint(-2, 2), "pim": rng.choice((0, 0, 0, 2)),
+                        "hits": rng.randint(0, 5), "powerPlayGoals": 0, "sog": rng.randint(0, 6),
+                        "faceoffWinningPctg": 0.5, "toi": f"{rng.randint(8, 24)}:{rng.randint(0, 59):02d}",
+                        "blockedShots": rng.randint(0, 3), "shifts": rng.randint(15, 30),
+                        "giveaways": rng.randint(0, 3), "takeaways": rng.randint(0, 3)}
+            shots = rng.randint(20, 40)
+            starter = {"playerId": rng.randrange(8_000_000, 8_999_999), "name": {"default": f"{depth[code]['G'][0][0]}. {depth[code]['G'][0].split()[-1]}"},
+                       "position": "G", "toi": "60:00", "shotsAgainst": shots, "saves": max(0, shots - goals_against),
+                       "goalsAgainst": goals_against, "savePctg": 0.9, "evenStrengthShotsAgainst": "0/0",
+                       "powerPlayShotsAgainst": "0/0", "shorthandedShotsAgainst": "0/0", "pim": 0, "starter": True}
+            backup = dict(starter, name={"default": f"{depth[code]['G'][1][0]}. {depth[code]['G'][1].split()[-1]}"},
+                          toi="0:00", shotsAgainst=0, saves=0, goalsAgainst=0, starter=False)
+            return {"forwards": [skater(n) for n in rng.sample(depth[code]["F"], 12)],
+                    "defense": [skater(n) for n in rng.sample(depth[code]["D"], 6)],
+                    "goalies": [starter, backup]}
+        
+        boxscore = {
+            "id": game_id, "season": 20252026, "gameType": 9, "gameDate": game_date,
+            "venue": {"default": "Synthetic Arena"}, "startTimeUTC": f"{game_date}T19:00:00Z",
+            "gameState": "FINAL", "gameScheduleState": "OK",
+            "periodDescriptor": {"number": 3, "periodType": "REG", "maxRegulationPeriods": 3},
+            "awayTeam": {"id": 1, "abbrev": away, "score": scores[away], "sog": 30, "commonName": {"default": away}},
+            "homeTeam": {"id": 2, "abbrev": home, "score": scores[home], "sog": 30, "commonName": {"default": home}},
+            "clock": {"timeRemaining": "00:00", "secondsRemaining": 0, "running": False, "inIntermission": False},
+            "playerByGameStats": {"awayTeam": side(away, scores[home]), "homeTeam": side(home, scores[away])},
+            "gameOutcome": {"lastPeriodType": "REG"},
+        }
+        dump_json_file(boxscore, f"{workspace}/db/games/{game_id}.json")
+
+def bench_memory(games: int = 1312) -> None:
+    """Run the full pipeline on a synthetic season and report peak memory"""
+    with tempfile.TemporaryDirectory(prefix="wally-bench-") as workspace:
+        print(f"🧪 Writing synthetic league ({games} games) to {workspace}...")
+        write_synthetic_league(workspace, games=games)
+        set_workspace(workspace, game_count=games)
+        
+        baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        tracemalloc.start()
+        started = time.perf_counter()
+        fetcher = StatsFetcher()
+        fetcher.run(rate_limit=0)
+        elapsed = time.perf_counter() - started
+        retained, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    print(f"\n🧪 Memory benchmark: {games} games, {len(fetcher.game_table)} player-game rows, "
+          f"{len(fetcher.all_olympic_players)} players")
+    print(f"   elapsed:          {elapsed:.2f}s")
+    print(f"   retained state:   {retained / 2**20:.1f} MiB (held by StatsFetcher after the run)")
+    print(f"   traced peak:      {traced_peak / 2**20:.1f} MiB")
+    print(f"   peak RSS:         {peak_rss * scale / 2**20:.1f} MiB (startup {baseline_rss * scale / 2**20:.1f} MiB)")
+
+def bench_json(games: int = 1312, repeat: int = 3) -> None:
+    """Compare JSON backends decoding the boxscore cache and encoding standings"""
+    def best_of(fn) -> float:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+    
+    def read_payloads(games_dir: str) -> List[bytes]:
+        payloads = []
+        for filename in sorted(os.listdir(games_dir)):
+            if filename.endswith('.json') and not filename.endswith('.miss.json'):
+                with open(os.path.join(games_dir, filename), 'rb') as f:
+                    payloads.append(f.read())
+        return payloads
+    
+    datasets = []
+    if os.path.isdir(config.GAMES_DB_PATH) and os.listdir(config.GAMES_DB_PATH):
+        datasets.append(("games cache", read_payloads(config.GAMES_DB_PATH)))
+    
+    active = jsonio.JSON_BACKEND
+    with tempfile.TemporaryDirectory(prefix="wally-bench-") as workspace:
+        print(f"🧪 Writing synthetic league ({games} games) to {workspace}...")
+        write_synthetic_league(workspace, games=games)
+        datasets.append(("synthetic season", read_payloads(f"{workspace}/db/games")))
+        set_workspace(workspace, game_count=games)
+        fetcher = StatsFetcher()
+        fetcher.run(rate_limit=0)
+        standings = fetcher.generate_standings_json()
+    
+    print("\n🧪 JSON benchmark (best of {}):".format(repeat))
+    for label, payloads in datasets:
+        size = sum(len(p) for p in payloads) / 2**20
+        print(f"   decode {label}: {len(payloads)} files, {size:.1f} MiB")
+        for backend in available_json_backends():
+            set_json_backend(backend)
+            elapsed = best_of(lambda: [json_loads(p) for p in payloads])
+            print(f"      {backend:<16}{elapsed * 1000:8.1f} ms")
+        set_json_backend(active)
+        elapsed = best_of(lambda: [decode_boxscore(p) for p in payloads])
+        print(f"      {'projection':<16}{elapsed * 1000:8.1f} ms  (raw -> projection{', msgspec typed' if msgspec else ''})")
+        projected = [json_dumps(decode_boxscore(p)) for p in payloads]
+        elapsed = best_of(lambda: [json_loads(p) for p in projected])
+        print(f"      {'cached read':<16}{elapsed * 1000:8.1f} ms  "
+              f"(projected cache, {sum(len(p) for p in projected) / 2**20:.1f} MiB, {active})")
+    
+    print(f"   encode standings ({len(standings['all_olympic_players'])} players, indented)")
+    for backend in available_json_backends():
+        set_json_backend(backend)
+        encoded = json_dumps(standings, indent=True)
+        elapsed = best_of(lambda: json_dumps(standings, indent=True))
+        print(f"      {backend:<16}{elapsed * 1000:8.1f} ms  {len(encoded) / 2**20:.1f} MiB")
+    set_json_backend(active)
+
+def bench_parse(games: int = 1312, workers: Optional[List[int]] = None) -> None:
+    """Compare serial and process-pool parsing of a synthetic season's cached boxscores"""
+    cpus = os.cpu_count() or 1
+    workers = workers or sorted({1, 2, 4, cpus})
+    with tempfile.TemporaryDirectory(prefix="wally-bench-") as workspace:
+        print(f"🧪 Writing synthetic league ({games} games) to {workspace}...")
+        write_synthetic_league(workspace, games=games)
+        set_workspace(workspace, game_count=games)
+        StatsFetcher().fetch_games(rate_limit=0)  # migrate raw payloads into projections first
+        
+        print(f"\n🧪 Parse benchmark: {games} games, {cpus} CPUs")
+        baseline = None
+        for count in workers:
+            fetcher = StatsFetcher()
+            started = time.perf_counter()
+            fetcher.fetch_games(rate_limit=0, workers=count)
+            elapsed = time.perf_counter() - started
+            table = {name: fetcher.game_table[name].tobytes() for name, _ in GameStatTable.COLUMNS}
+            result = (table, fetcher.player_keys, fetcher.game_dates)
+            if baseline is None:
+                baseline = (elapsed, result)
+            same = "identical" if result == baseline[1] else "⚠️ differs from serial"
+            print(f"   {count:>2} worker{'s' if count > 1 else ' '}  {elapsed * 1000:8.1f} ms  "
+                  f"x{baseline[0] / elapsed:4.1f}  {len(fetcher.game_table)} rows, {same}")
+
+def bench_percentiles(games: int = 1312, repeat: int = 5) -> None:
+    """Compare percentile_ranks with a pairwise count and, when installed, NumPy on the profile populations"""
+    def best_of(fn) -> float:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+    
+    def pairwise(values: List[float]) -> List[float]:
+        return [50.0 * (sum(w < v for w in values) * 2 + sum(w == v for w in values)) / len(values) for v in values]
+    
+    def batched(values: List[float]) -> List[float]:
+        ordered = numpy.sort(numpy.asarray(values, dtype=float))
+        return (50.0 * (numpy.searchsorted(ordered, values, 'left') + numpy.searchsorted(ordered, values, 'right'))
+                / len(values)).tolist()
+    
+    with tempfile.TemporaryDirectory(prefix="wally-bench-") as workspace:
+        print(f"🧪 Writing synthetic league ({games} games) to {workspace}...")
+        write_synthetic_league(workspace, games=games)
+        set_workspace(workspace, game_count=games)
+        fetcher = StatsFetcher()
+        fetcher.run(rate_limit=0)
+    
+    # The season populations compute_profiles ranks, one per profiled stat
+    played = [p for p in fetcher.all_olympic_players.values() if p.stats['gp'] > 0]
+    season = []
+    for kind, stats in PROFILE_STATS.items():
+        group = [p for p in played if (p.pos == 'G') == (kind == 'goalie')]
+        for stat in stats:
+            values = [profile_stat(p.stats, stat) for p in group]
+            season.append([v for v in values if v is not None])
+    rng = random.Random(44)
+    scaled = [[rng.choice(values) for _ in range(len(values) * 20)] for values in season if values]
+    
+    print(f"\n🧪 Percentile benchmark (best of {repeat}):")
+    for label, populations in (("season", season), ("20x players", scaled)):
+        expected = [percentile_ranks(values) for values in populations]
+        print(f"   {label}: {len(populations)} populations, {sum(map(len, populations))} values")
+        methods = [("sort + bisect", percentile_ranks), ("pairwise count", pairwise)]
+        if numpy is not None:
+            methods.append(("numpy batched", batched))
+        for name, rank in methods:
+            if name == "pairwise count" and label != "season":
+                continue  # quadratic; the season populations already show it
+            same = [rank(values) for values in populations] == expected
+            elapsed = best_of(lambda: [rank(values) for values in populations])
+            print(f"      {name:<16}{elapsed * 1000:8.2f} ms" + ("" if same else "  ⚠️ differs from percentile_ranks"))
+        if numpy is None:
+            print("      (numpy not installed; pip install numpy to compare batched percentiles)")
+
+def bench_fetch(archive: str, latency: Union[None, str, float] = None, repeat: int = 3) -> None:
+    """Time the fetch + processing paths against a recorded archive, offline and reproducibly"""
+    inputs = [name for name in ("rosters.json", "name_overrides.json", "player_ids.json", "scoring.json")
+              if os.path.exists(f"{config.WORKSPACE_PATH}/{name}")]
+    source = config.WORKSPACE_PATH
+    cold, warm, digests = [], [], set()
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="wally-bench-") as workspace:
+            for name in inputs:
+                shutil.copy(f"{source}/{name}", workspace)
+            os.makedirs(f"{workspace}/site/public/data", exist_ok=True)
+            set_workspace(workspace)
+            
+            started = time.perf_counter()
+            StatsFetcher(transport=ReplayTransport(archive, latency)).fetch_games(rate_limit=0)
+            cold.append(time.perf_counter() - started)
+            
+            started = time.perf_counter()
+            StatsFetcher(transport=ReplayTransport(archive, latency)).run(rate_limit=0)
+            warm.append(time.perf_counter() - started)
+            
+            published = load_json_file(config.STANDINGS_PATH)
+            sections = {key: published.get(key) for key in ("standings", "standings_by_game", "marginal_points",
+                                                             "teams", "all_olympic_players")}
+            digests.add(hashlib.sha256(json_dumps(sections)).hexdigest()[:16])
+    set_workspace(source)
+    
+    print(f"\n🧪 Fetch benchmark: {archive} (latency: {latency or 'none'}, best of {repeat})")
+    print(f"   fetch + parse, empty cache:  {min(cold) * 1000:8.1f} ms")
+    print(f"   full run, warm cache:        {min(warm) * 1000:8.1f} ms")
+    print(f"   output digest: {', '.join(sorted(digests))}" + ("" if len(digests) == 1 else "  ⚠️ runs disagree"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Wally Cup pipeline without the network")
+    benchmarks = parser.add_subparsers(dest="benchmark", required=True, metavar="{memory,json,parse,percentiles,fetch}")
+    for name, help_text in (("memory", "run the pipeline on a synthetic season and report peak memory"),
+                            ("json", "compare JSON backends on the games cache and a synthetic season"),
+                            ("parse", "compare serial and parallel boxscore parsing on a synthetic season"),
+                            ("percentiles", "compare percentile ranking methods on a synthetic season's profiles")):
+        benchmarks.add_parser(name, help=help_text).add_argument(
+            "--games", type=int, default=1312, help="number of games in the synthetic season")
+    fetch = benchmarks.add_parser("fetch", help="time the fetch and processing paths against a recorded archive")
+    fetch.add_argument("archive", help="archive written by fetch-stats.py --record")
+    fetch.add_argument("--replay-latency", default=None,
+                       help="simulated latency: 'recorded' or a number of seconds (default none)")
+    args = parser.parse_args()
+    
+    if args.benchmark == 'memory':
+        bench_memory(args.games)
+    elif args.benchmark == 'json':
+        bench_json(args.games)
+    elif args.benchmark == 'parse':
+        bench_parse(args.games)
+    elif args.benchmark == 'percentiles':
+        bench_percentiles(args.games)
+    else:
+        bench_fetch(args.archive, replay_latency(parser, args.replay_latency))
+
+if __name__ == "__main__":
+    main()
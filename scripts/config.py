@@ -0,0 +1,61 @@
+"""Workspace, API and season configuration shared by the pipeline's modules
+
+set_workspace() and set_base_url() rebind the paths and URLs, so modules read
+them as config.GAMES_DB_PATH rather than importing them by name.
+"""
+
+import os
+from typing import Optional
+
+API_BASE_URL = os.environ.get("WALLY_BASE_URL", "https://api-web.nhle.com/v1")
+BASE_URL = API_BASE_URL + "/gamecenter/{}/boxscore"
+PLAY_BY_PLAY_URL = API_BASE_URL + "/gamecenter/{}/play-by-play"
+USER_AGENT = "Mozilla/5.0"
+WORKSPACE_PATH = os.environ.get("WALLY_WORKSPACE", "/Users/cams_macmini/.openclaw/workspace/wally-cup")
+ROSTERS_PATH = f"{WORKSPACE_PATH}/rosters.json"
+STANDINGS_PATH = f"{WORKSPACE_PATH}/site/public/data/standings.json"
+SNAPSHOTS_PATH = f"{WORKSPACE_PATH}/snapshots"
+GAMES_DB_PATH = os.environ.get("WALLY_GAMES_DB") or f"{WORKSPACE_PATH}/db/games"  # may be shared by several leagues
+GAME_ID_START = 2025090001
+GAME_ID_END = 2025090022
+
+def set_base_url(url: str) -> None:
+    """Point the API endpoints at another host, e.g. a local stand-in (WALLY_BASE_URL does this at startup)"""
+    global API_BASE_URL, BASE_URL, PLAY_BY_PLAY_URL
+    API_BASE_URL = url
+    BASE_URL = API_BASE_URL + "/gamecenter/{}/boxscore"
+    PLAY_BY_PLAY_URL = API_BASE_URL + "/gamecenter/{}/play-by-play"
+
+def set_workspace(path: str, game_count: Optional[int] = None, games_db: Optional[str] = None) -> None:
+    """Point all workspace-relative paths (and optionally the game ID range) at another directory
+
+    The games DB moves with the workspace unless games_db names a shared one.
+    """
+    global WORKSPACE_PATH, ROSTERS_PATH, STANDINGS_PATH, SNAPSHOTS_PATH, GAMES_DB_PATH, GAME_ID_END
+    WORKSPACE_PATH = path
+    ROSTERS_PATH = f"{WORKSPACE_PATH}/rosters.json"
+    STANDINGS_PATH = f"{WORKSPACE_PATH}/site/public/data/standings.json"
+    SNAPSHOTS_PATH = f"{WORKSPACE_PATH}/snapshots"
+    GAMES_DB_PATH = games_db or f"{WORKSPACE_PATH}/db/games"
+    if game_count is not None:
+        GAME_ID_END = GAME_ID_START + game_count - 1
+
+# Olympic schedule date range
+OLYMPIC_START_DATE = "2026-02-11"
+OLYMPIC_END_DATE = "2026-02-22"
+
+# Country information
+COUNTRY_INFO = {
+    "CAN": {"name": "Canada", "flag": "🇨🇦"},
+    "USA": {"name": "United States", "flag": "🇺🇸"},
+    "SWE": {"name": "Sweden", "flag": "🇸🇪"},
+    "FIN": {"name": "Finland", "flag": "🇫🇮"},
+    "CZE": {"name": "Czechia", "flag": "🇨🇿"},
+    "SUI": {"name": "Switzerland", "flag": "🇨🇭"},
+    "GER": {"name": "Germany", "flag": "🇩🇪"},
+    "SVK": {"name": "Slovakia", "flag": "🇸🇰"},
+    "DEN": {"name": "Denmark", "flag": "🇩🇰"},
+    "LAT": {"name": "Latvia", "flag": "🇱🇻"},
+    "ITA": {"name": "Italy", "flag": "🇮🇹"},
+    "FRA": {"name": "France", "flag": "🇫🇷"}
+}
@@ -0,0 +1,266 @@
+"""HTTP transports (live, recording, replay) and retrying, circuit-broken requests to the NHL API"""
+
+import argparse
+import base64
+import gzip
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Union
+
+from config import USER_AGENT
+from jsonio import json_dumps, json_loads
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a request while the upstream circuit is open"""
+
+class TransientFetchError(Exception):
+    """Raised when a request still fails after all retries"""
+
+class CircuitBreaker:
+    """Stops calling an upstream after consecutive failed attempts, probing again after a cooldown
+
+    Once the cooldown passes the breaker is half-open: the first caller of
+    allow() gets to make one probe request, and every other caller is refused
+    until that probe is recorded as a success (closing the breaker) or a
+    failure (opening it again).
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    @property
+    def blocked(self) -> bool:
+        """Whether allow() would refuse a request now; unlike allow(), never claims the probe"""
+        state = self.state
+        return state == "open" or (state == "half_open" and self.probe_in_flight)
+
+    def allow(self) -> bool:
+        """Whether a request may be attempted now; in half-open state only the caller that claims the probe may"""
+        with self._lock:
+            state = self.state
+            if state == "half_open" and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            return state == "closed"
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"⚡ Circuit opened after {self.failures} failed attempts; serving from cache for {self.cooldown:.0f}s")
+                self.opened_at = time.monotonic()
+            self.probe_in_flight = False
+
+class TransportResponse:
+    """The parts of an HTTP response the fetch layer reads"""
+    __slots__ = ('status_code', 'headers', 'content', 'elapsed')
+
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes, elapsed: float = 0.0):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.elapsed = elapsed
+
+class HTTPTransport:
+    """Live HTTP through a shared requests session, opened on the first request
+
+    Importing requests costs more than a cached run's whole startup, so runs
+    that never touch the network never import it.
+    """
+
+    def __init__(self):
+        self.session = None
+
+    def get(self, url: str, timeout=None) -> TransportResponse:
+        if self.session is None:
+            import requests
+            self.session = requests.Session()
+            self.session.headers.update({"User-Agent": USER_AGENT})
+        started = time.perf_counter()
+        response = self.session.get(url, timeout=timeout)
+        return TransportResponse(response.status_code, dict(response.headers), response.content,
+                                 time.perf_counter() - started)
+
+# Response headers worth keeping in a recording
+RECORDED_HEADERS = ('Content-Type', 'Retry-After', 'ETag', 'Last-Modified', 'Cache-Control')
+
+class RecordingTransport:
+    """Passes requests through to another transport and appends every exchange to an archive
+    
+    The archive is gzipped JSON lines, one {url, status, headers, elapsed, body}
+    record per response, appended as its own gzip member so a run that dies
+    midway still leaves a readable archive. Failed requests are recorded with
+    an "error" instead of a status.
+    """
+
+    def __init__(self, inner, archive_path: str):
+        self.inner = inner
+        self.archive_path = archive_path
+        os.makedirs(os.path.dirname(os.path.abspath(archive_path)), exist_ok=True)
+
+    def _append(self, record: Dict) -> None:
+        with gzip.open(self.archive_path, 'ab') as f:
+            f.write(json_dumps(record) + b'\n')
+
+    def get(self, url: str, timeout=None) -> TransportResponse:
+        started = time.perf_counter()
+        try:
+            response = self.inner.get(url, timeout=timeout)
+        except Exception as e:
+            self._append({"url": url, "error": f"{type(e).__name__}: {e}", "elapsed": time.perf_counter() - started})
+            raise
+        headers = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+        try:
+            body = {"body": response.content.decode('utf-8')}
+        except UnicodeDecodeError:
+            body = {"body_b64": base64.b64encode(response.content).decode('ascii')}
+        self._append(dict({"url": url, "status": response.status_code, "headers": headers,
+                           "elapsed": round(response.elapsed, 4)}, **body))
+        return response
+
+def read_recording(archive_path: str) -> List[Dict]:
+    with gzip.open(archive_path, 'rb') as f:
+        return [json_loads(line) for line in f if line.strip()]
+
+class ReplayTransport:
+    """Serves responses from a RecordingTransport archive, with no network access
+    
+    Responses for a URL are replayed in recorded order, repeating the last one
+    once they run out. A URL that was never recorded raises ConnectionError,
+    which the fetch layer treats like being offline. latency is None for no
+    delay, "recorded" to sleep for each response's recorded time, or a fixed
+    number of seconds.
+    """
+
+    def __init__(self, archive_path: str, latency: Union[None, str, float] = None):
+        self.latency = latency
+        self.responses: Dict[str, List[Dict]] = defaultdict(list)
+        for record in read_recording(archive_path):
+            self.responses[record['url']].append(record)
+        self.served: Dict[str, int] = defaultdict(int)
+
+    def get(self, url: str, timeout=None) -> TransportResponse:
+        records = self.responses.get(url)
+        if not records:
+            raise ConnectionError(f"{url} is not in the recording")
+        record = records[min(self.served[url], len(records) - 1)]
+        self.served[url] += 1
+        
+        delay = record.get('elapsed', 0.0) if self.latency == 'recorded' else self.latency
+        if delay:
+            time.sleep(delay)
+        if 'error' in record:
+            raise ConnectionError(f"recorded failure: {record['error']}")
+        if 'body_b64' in record:
+            content = base64.b64decode(record['body_b64'])
+        else:
+            content = record.get('body', '').encode('utf-8')
+        return TransportResponse(record['status'], dict(record.get('headers', {})), content, record.get('elapsed', 0.0))
+
+def make_transport(record: Optional[str] = None, replay: Optional[str] = None,
+                   latency: Union[None, str, float] = None):
+    """The transport for a run: live HTTP, recorded to an archive, or replayed from one"""
+    if replay:
+        return ReplayTransport(replay, latency)
+    if record:
+        return RecordingTransport(HTTPTransport(), record)
+    return HTTPTransport()
+
+def add_transport_arguments(parser: argparse.ArgumentParser) -> None:
+    """--record, --replay and --replay-latency, for the command-line tools that run the pipeline"""
+    parser.add_argument("--record", metavar="ARCHIVE", help="record every API response to a gzipped archive")
+    parser.add_argument("--replay", metavar="ARCHIVE", help="serve API responses from a recorded archive instead of the network")
+    parser.add_argument("--replay-latency", default=None,
+                        help="simulated latency when replaying: 'recorded' or a number of seconds (default none)")
+
+def replay_latency(parser: argparse.ArgumentParser, value: Optional[str]) -> Union[None, str, float]:
+    """A --replay-latency value as None, 'recorded' or seconds"""
+    if value in (None, 'recorded'):
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        parser.error("--replay-latency must be 'recorded' or a number of seconds")
+
+def transport_from_args(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """The transport asked for by the arguments from add_transport_arguments"""
+    return make_transport(args.record, args.replay, replay_latency(parser, args.replay_latency))
+
+class ResilientFetcher:
+    """HTTP GET with bounded retries, full-jitter exponential backoff, Retry-After and a circuit breaker
+    
+    get() returns the response for 2xx and for non-retryable statuses (e.g. 404),
+    raises TransientFetchError once retries are exhausted and CircuitOpenError
+    when the breaker is open.
+    """
+    RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+    def __init__(self, transport, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 10.0,
+                 timeout=(5, 10), breaker: Optional[CircuitBreaker] = None):
+        self.transport = transport
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.requests = 0  # Transport attempts made, for rate limiting only real network traffic
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Delay before the next attempt: Retry-After when given, else full jitter over base * 2^attempt"""
+        if retry_after:
+            try:
+                return min(self.max_delay, max(0.0, float(retry_after)))
+            except ValueError:
+                try:
+                    delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                    return min(self.max_delay, max(0.0, delay))
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def get(self, url: str):
+        last_error = None
+        for attempt in range(self.max_attempts):
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"circuit open, skipping {url}")
+            retry_after = None
+            self.requests += 1
+            try:
+                response = self.transport.get(url, timeout=self.timeout)
+            except Exception as e:  # connection errors, timeouts, truncated reads
+                last_error = e
+            else:
+                if response.status_code not in self.RETRYABLE_STATUS:
+                    self.breaker.record_success()
+                    return response
+                last_error = TransientFetchError(f"HTTP {response.status_code}")
+                retry_after = response.headers.get('Retry-After')
+            self.breaker.record_failure()
+            if attempt + 1 < self.max_attempts and not self.breaker.blocked:
+                delay = self._backoff(attempt, retry_after)
+                print(f"↻ {url} failed ({last_error}); retry {attempt + 1}/{self.max_attempts - 1} in {delay:.1f}s")
+                time.sleep(delay)
+        raise TransientFetchError(f"{url} failed after retries: {last_error}")
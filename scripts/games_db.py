@@ -0,0 +1,259 @@
+"""The games cache: boxscore projections, raw archives, negative results and re-check schedule
+
+Paths are under config.GAMES_DB_PATH, which several leagues may share
+(WALLY_GAMES_DB).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional, Union
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+import config
+from jsonio import atomic_write, dump_json_file, json_loads, load_json_file
+from locks import FileLock
+
+# Boxscore fields the pipeline reads. The games cache stores only this
+# projection; bump BOXSCORE_SCHEMA_VERSION when adding a field so cached
+# games are re-projected from their raw archives (or run --reproject).
+BOXSCORE_SCHEMA_VERSION = 1
+_BOX_NAME = {"default": str}
+_BOX_SKATER = {"playerId": int, "name": _BOX_NAME, "goals": int, "assists": int, "plusMinus": int, "pim": int, "toi": str}
+_BOX_GOALIE = {"playerId": int, "name": _BOX_NAME, "toi": str, "shotsAgainst": int, "saves": int}
+_BOX_TEAM_PLAYERS = {"forwards": [_BOX_SKATER], "defense": [_BOX_SKATER], "goalies": [_BOX_GOALIE]}
+_BOX_TEAM = {"abbrev": str, "score": int}
+BOXSCORE_FIELDS = {
+    "gameDate": str,
+    "gameState": str,
+    "startTimeUTC": str,
+    "homeTeam": _BOX_TEAM,
+    "awayTeam": _BOX_TEAM,
+    "gameOutcome": {"lastPeriodType": str},
+    "periodDescriptor": {"number": int},
+    "clock": {"timeRemaining": str},
+    "playerByGameStats": {"homeTeam": _BOX_TEAM_PLAYERS, "awayTeam": _BOX_TEAM_PLAYERS},
+}
+KEEP_RAW_BOXSCORES = os.environ.get("WALLY_KEEP_RAW", "1") != "0"
+
+def project_boxscore(value, spec=BOXSCORE_FIELDS):
+    """Keep only the keys named in spec (recursively); absent keys stay absent"""
+    if isinstance(spec, dict):
+        if not isinstance(value, dict):
+            return value
+        return {key: project_boxscore(value[key], sub) for key, sub in spec.items() if key in value}
+    if isinstance(spec, list):
+        if not isinstance(value, list):
+            return value
+        return [project_boxscore(item, spec[0]) for item in value]
+    return value
+
+if msgspec is not None:
+    # Typed decoder built from BOXSCORE_FIELDS: msgspec skips every other part
+    # of the payload without building Python objects for it.
+    def _box_struct(name: str, spec: Dict):
+        fields = []
+        for key, sub in spec.items():
+            if isinstance(sub, dict):
+                typ = _box_struct(f"{name}_{key}", sub)
+            elif isinstance(sub, list):
+                typ = List[_box_struct(f"{name}_{key}", sub[0])]
+            else:
+                typ = sub
+            fields.append((key, Union[typ, msgspec.UnsetType], msgspec.UNSET))
+        return msgspec.defstruct(name, fields)
+
+    _BOXSCORE_DECODER = msgspec.json.Decoder(_box_struct("Boxscore", BOXSCORE_FIELDS))
+
+def decode_boxscore(data: bytes) -> Dict:
+    """Decode a raw boxscore payload into its projection"""
+    if msgspec is not None:
+        try:
+            return msgspec.to_builtins(_BOXSCORE_DECODER.decode(data))
+        except msgspec.ValidationError:
+            pass  # Unexpected types upstream; fall back to a dict walk
+    return project_boxscore(json_loads(data))
+
+def raw_boxscore_path(game_id: int) -> str:
+    return f"{config.GAMES_DB_PATH}/raw/{game_id}.json.gz"
+
+def store_boxscore(game_id: int, raw: bytes) -> Dict:
+    """Cache a raw payload: projection in db/games, gzipped original in db/games/raw"""
+    boxscore = decode_boxscore(raw)
+    archive_raw_boxscore(game_id, raw)
+    cache_projection(game_id, boxscore)
+    return boxscore
+
+def archive_raw_boxscore(game_id: int, raw: bytes) -> None:
+    """Keep the gzipped original payload that --reproject rebuilds the projection from (unless WALLY_KEEP_RAW=0)"""
+    if KEEP_RAW_BOXSCORES:
+        os.makedirs(f"{config.GAMES_DB_PATH}/raw", exist_ok=True)
+        with atomic_write(raw_boxscore_path(game_id), gzip.open) as f:
+            f.write(raw)
+
+def cache_projection(game_id: int, boxscore: Dict) -> None:
+    dump_json_file(dict(boxscore, _schema=BOXSCORE_SCHEMA_VERSION), f"{config.GAMES_DB_PATH}/{game_id}.json", indent=False)
+
+def load_cached_boxscore(game_id: int) -> Optional[Dict]:
+    """Load a game's projection from the cache, migrating raw or outdated entries; None if not cached"""
+    cache_file = f"{config.GAMES_DB_PATH}/{game_id}.json"
+    if not os.path.exists(cache_file):
+        return None
+    with open(cache_file, 'rb') as f:
+        data = f.read()
+    cached = json_loads(data)
+    if not cached:
+        return cached
+    version = cached.pop('_schema', None)
+    if version == BOXSCORE_SCHEMA_VERSION:
+        return cached
+    if version is None:
+        # Pre-projection cache entry holding the full payload
+        return store_boxscore(game_id, data)
+    if os.path.exists(raw_boxscore_path(game_id)):
+        with gzip.open(raw_boxscore_path(game_id), 'rb') as f:
+            return store_boxscore(game_id, f.read())
+    return cached
+
+def reproject_boxscores() -> int:
+    """Rebuild every cached projection from its raw archive; returns the number of games rewritten"""
+    raw_dir = f"{config.GAMES_DB_PATH}/raw"
+    if not os.path.isdir(raw_dir):
+        return 0
+    count = 0
+    for filename in sorted(os.listdir(raw_dir)):
+        if filename.endswith('.json.gz'):
+            with gzip.open(os.path.join(raw_dir, filename), 'rb') as f:
+                store_boxscore(int(filename[:-len('.json.gz')]), f.read())
+            count += 1
+    return count
+
+# Negative results (non-retryable statuses) are cached with an expiry instead of as empty boxscores
+NEGATIVE_CACHE_TTL = {404: 6 * 3600}
+NEGATIVE_CACHE_DEFAULT_TTL = 30 * 60
+
+def negative_cache_path(game_id: int) -> str:
+    return f"{config.GAMES_DB_PATH}/{game_id}.miss.json"
+
+def read_negative_cache(game_id: int) -> Optional[Dict]:
+    """The unexpired negative cache entry for a game, if any"""
+    path = negative_cache_path(game_id)
+    if not os.path.exists(path):
+        return None
+    try:
+        entry = load_json_file(path)
+    except Exception:
+        return None
+    return entry if entry.get('expires_at', 0) > time.time() else None
+
+def write_negative_cache(game_id: int, status: int) -> None:
+    ttl = NEGATIVE_CACHE_TTL.get(status, NEGATIVE_CACHE_DEFAULT_TTL)
+    dump_json_file({"status": status, "expires_at": time.time() + ttl}, negative_cache_path(game_id), indent=False)
+
+def clear_negative_cache(game_id: int) -> None:
+    try:
+        os.remove(negative_cache_path(game_id))
+    except FileNotFoundError:
+        pass
+
+# Stat corrections: FINAL games are re-checked on a decaying schedule for a while
+REVALIDATE_FIRST_DELAY = 15 * 60
+REVALIDATE_WINDOW = 48 * 3600
+REVALIDATE_BUDGET = int(os.environ.get("WALLY_REVALIDATE_BUDGET", "3"))
+
+def boxscore_hash(boxscore: Dict) -> str:
+    """Content hash of a projection (only the fields the pipeline reads)
+
+    Hashed from canonical JSON rather than the active backend's encoding, so
+    leagues sharing a games DB agree on it whichever backend each one runs.
+    """
+    canonical = json.dumps(boxscore, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def boxscore_stat_deltas(old: Dict, new: Dict) -> Dict[str, Dict[str, int]]:
+    """Per-player stat changes between two projections of the same game, keyed by boxscore name"""
+    def lines(boxscore: Dict) -> Dict:
+        result = {}
+        for side in ('homeTeam', 'awayTeam'):
+            groups = boxscore.get('playerByGameStats', {}).get(side, {})
+            for group in ('forwards', 'defense', 'goalies'):
+                for player in groups.get(group, []):
+                    result[player.get('playerId')] = player
+        return result
+    
+    old_lines, new_lines = lines(old), lines(new)
+    deltas = {}
+    for player_id in old_lines.keys() | new_lines.keys():
+        before, after = old_lines.get(player_id, {}), new_lines.get(player_id, {})
+        changed = {stat: after.get(stat, 0) - before.get(stat, 0)
+                   for stat in ('goals', 'assists', 'plusMinus', 'pim', 'saves', 'shotsAgainst')
+                   if after.get(stat, 0) != before.get(stat, 0)}
+        if changed:
+            deltas[(after or before).get('name', {}).get('default', str(player_id))] = changed
+    return deltas
+
+class RevalidationSchedule:
+    """When to re-check FINAL games for stat corrections
+    
+    A game is re-checked REVALIDATE_FIRST_DELAY after it was first cached as
+    FINAL, then at doubling intervals until it has been final for
+    REVALIDATE_WINDOW. Each run re-checks at most `budget` games, most overdue
+    first. Entries (final_at, checked_at, checks, hash) live in
+    db/games/revalidation.json.
+    """
+
+    def __init__(self, budget: int = REVALIDATE_BUDGET):
+        self.path = f"{config.GAMES_DB_PATH}/revalidation.json"
+        self.budget = budget
+        self.games: Dict[str, Dict] = {}
+        if os.path.exists(self.path):
+            try:
+                self.games = load_json_file(self.path)
+            except ValueError:
+                pass
+
+    def track(self, game_id: int, boxscore: Dict) -> None:
+        """Start the schedule for a game that was just cached as FINAL"""
+        now = time.time()
+        self.games[str(game_id)] = {"final_at": now, "checked_at": now, "checks": 0, "hash": boxscore_hash(boxscore)}
+
+    def next_check(self, entry: Dict) -> float:
+        return entry["checked_at"] + REVALIDATE_FIRST_DELAY * 2 ** entry["checks"]
+
+    def due(self) -> List[int]:
+        """Games to re-check this run, within the budget; expired games leave the schedule"""
+        now = time.time()
+        for game_id, entry in list(self.games.items()):
+            if now - entry["final_at"] > REVALIDATE_WINDOW:
+                del self.games[game_id]
+        overdue = sorted((self.next_check(entry), int(game_id)) for game_id, entry in self.games.items()
+                         if self.next_check(entry) <= now)
+        return [game_id for _, game_id in overdue[:self.budget]]
+
+    def checked(self, game_id: int, content_hash: str) -> bool:
+        """Record a re-check; True if the content changed since the last one"""
+        entry = self.games[str(game_id)]
+        changed = entry["hash"] != content_hash
+        entry.update(checked_at=time.time(), checks=entry["checks"] + 1, hash=content_hash)
+        return changed
+
+    def save(self) -> None:
+        """Write the schedule, merged with what other leagues sharing the games DB saved meanwhile"""
+        lock = FileLock(f"{config.GAMES_DB_PATH}/locks/revalidation.lock", remove=True)
+        lock.acquire(None)
+        try:
+            merged = RevalidationSchedule(self.budget).games
+            for game_id, entry in self.games.items():
+                if entry["checked_at"] >= merged.get(game_id, entry)["checked_at"]:
+                    merged[game_id] = entry
+            now = time.time()
+            self.games = {game_id: entry for game_id, entry in merged.items() if now - entry["final_at"] <= REVALIDATE_WINDOW}
+            dump_json_file(self.games, self.path, indent=False)
+        finally:
+            lock.release()
@@ -0,0 +1,186 @@
+"""JSON encoding with the fastest available backend, atomic writes and streamed output"""
+
+import hashlib
+import io
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Optional fast JSON backends; everything falls back to the stdlib json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# JSON serialization backend, chosen once at startup (override with WALLY_JSON_BACKEND)
+JSON_BACKENDS = ('orjson', 'msgspec', 'stdlib')
+
+def available_json_backends() -> List[str]:
+    """JSON backends importable in this environment, fastest first"""
+    installed = {'orjson': orjson is not None, 'msgspec': msgspec is not None, 'stdlib': True}
+    return [name for name in JSON_BACKENDS if installed[name]]
+
+def set_json_backend(name: Optional[str] = None) -> str:
+    """Select a JSON backend by name, or the fastest available one; returns the backend in use"""
+    global JSON_BACKEND
+    available = available_json_backends()
+    if name and name not in available:
+        print(f"⚠️ JSON backend '{name}' is not available, using {available[0]}")
+        name = None
+    JSON_BACKEND = name or available[0]
+    return JSON_BACKEND
+
+JSON_BACKEND = 'stdlib'
+set_json_backend(os.environ.get("WALLY_JSON_BACKEND"))
+
+def json_loads(data):
+    """Decode JSON from bytes or str with the active backend"""
+    if JSON_BACKEND == 'orjson':
+        return orjson.loads(data)
+    if JSON_BACKEND == 'msgspec':
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+def json_dumps(obj, indent: bool = False) -> bytes:
+    """Encode obj to UTF-8 JSON bytes; indent=True matches json.dump(..., indent=2) layout"""
+    if JSON_BACKEND == 'orjson':
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if JSON_BACKEND == 'msgspec':
+        encoded = msgspec.json.encode(obj)
+        return msgspec.json.format(encoded, indent=2) if indent else encoded
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+def load_json_file(path: str):
+    """Read and decode a JSON file with the active backend"""
+    with open(path, 'rb') as f:
+        return json_loads(f.read())
+
+@contextmanager
+def atomic_write(path: str, opener=open):
+    """Write a file next to path and move it into place once complete
+    
+    Readers, including other runs, see either the old file or the new one,
+    never a partial write. The temporary name is per process, so concurrent
+    writers of the same path don't clobber each other's halves.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with opener(tmp_path, 'wb') as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def file_version(path: str) -> Optional[tuple]:
+    """(mtime, size) of a file, or None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def dump_json_file(obj, path: str, indent: bool = True) -> None:
+    """Encode obj with the active backend and write it to path (atomically)"""
+    with atomic_write(path) as f:
+        f.write(json_dumps(obj, indent=indent))
+
+class RawJSON:
+    """Already-encoded JSON written verbatim by write_json_streaming (e.g. a memoized section)"""
+    __slots__ = ('data',)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    @classmethod
+    def encode(cls, value, level: int = 1) -> 'RawJSON':
+        """Encode value (streams included) as it would be written at the given nesting level"""
+        buffer = io.BytesIO()
+        _write_json_value(buffer, value, level)
+        return cls(buffer.getvalue())
+
+class JSONArrayStream:
+    """Marks an iterable to be written as a JSON array, one item at a time"""
+    __slots__ = ('items',)
+
+    def __init__(self, items):
+        self.items = items
+
+    def __iter__(self):
+        return iter(self.items)
+
+class JSONObjectStream:
+    """Marks an iterable of (key, value) pairs to be written as a JSON object, one member at a time"""
+    __slots__ = ('items',)
+
+    def __init__(self, items):
+        self.items = items
+
+    def __iter__(self):
+        return iter(self.items)
+
+def _write_json_value(f, value, level: int) -> None:
+    """Write value at the given nesting level in the json.dump(..., indent=2) layout"""
+    if isinstance(value, RawJSON):
+        f.write(value.data)
+        return
+    streams = (JSONArrayStream, JSONObjectStream)
+    if isinstance(value, streams) or (isinstance(value, dict) and any(isinstance(v, streams + (RawJSON,)) for v in value.values())):
+        is_object = not isinstance(value, JSONArrayStream)
+        items = value.items() if isinstance(value, dict) else value
+        open_char, close_char = (b'{', b'}') if is_object else (b'[', b']')
+        inner = b'\n' + b'  ' * (level + 1)
+        first = True
+        for item in items:
+            f.write((open_char if first else b',') + inner)
+            first = False
+            if is_object:
+                key, item = item
+                f.write(json_dumps(key) + b': ')
+            _write_json_value(f, item, level + 1)
+        f.write(open_char + close_char if first else b'\n' + b'  ' * level + close_char)
+    else:
+        text = json_dumps(value, indent=True)
+        f.write(text.replace(b'\n', b'\n' + b'  ' * level) if level else text)
+
+def write_json_streaming(path: str, data: Dict) -> None:
+    """Serialize data to path section by section, expanding JSON*Stream values lazily
+    
+    With the stdlib backend the output is identical to json.dump(data, f, indent=2)
+    on the materialized data; faster backends produce the same layout. Only one
+    streamed item is held in memory at a time. The file is written next to its
+    destination and moved into place when complete.
+    """
+    with atomic_write(path) as f:
+        _write_json_value(f, data, 0)
+
+# Top-level members that change on every run without the content changing;
+# left out of published files' content hashes
+VOLATILE_FIELDS = ('updated_at',)
+
+class _DigestSink:
+    """Write target that hashes what is written instead of keeping it"""
+    __slots__ = ('digest',)
+
+    def __init__(self):
+        self.digest = hashlib.sha256()
+
+    def write(self, data: bytes) -> None:
+        self.digest.update(data)
+
+def content_digest(data, indent: bool = True) -> str:
+    """sha256 of data as it would be published, leaving out top-level VOLATILE_FIELDS"""
+    if isinstance(data, dict) and any(key in data for key in VOLATILE_FIELDS):
+        data = {key: value for key, value in data.items() if key not in VOLATILE_FIELDS}
+    sink = _DigestSink()
+    if indent:
+        _write_json_value(sink, data, 0)
+    else:
+        sink.write(json_dumps(data, indent=False))
+    return sink.digest.hexdigest()
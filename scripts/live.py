@@ -0,0 +1,173 @@
+"""Live mode: per-player tallies for in-progress games from play-by-play cursors"""
+
+import os
+from typing import Dict, Optional
+
+import config
+from fetch_layer import CircuitOpenError, ResilientFetcher, TransientFetchError
+from games_db import project_boxscore
+from jsonio import dump_json_file, json_loads, load_json_file
+from records import toi_to_seconds
+
+def play_clock_seconds(play: Dict) -> int:
+    """Seconds since opening faceoff for a play-by-play event"""
+    period = play.get('periodDescriptor', {}).get('number', 1)
+    return (period - 1) * 20 * 60 + toi_to_seconds(play.get('timeInPeriod'))
+
+def seconds_to_toi(seconds: int) -> str:
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+def live_boxscore(pbp: Dict, tallies: Dict[str, Dict[str, int]]) -> Dict:
+    """Boxscore-shaped projection of a play-by-play payload and its live per-player tallies
+    
+    Plus/minus isn't in the feed and stays 0; goalies who have faced a shot are
+    credited with the elapsed game time as TOI.
+    """
+    sides = {pbp.get('homeTeam', {}).get('id'): 'homeTeam', pbp.get('awayTeam', {}).get('id'): 'awayTeam'}
+    plays = pbp.get('plays', [])
+    elapsed = seconds_to_toi(play_clock_seconds(plays[-1])) if plays else '0:00'
+    groups = {side: {'forwards': [], 'defense': [], 'goalies': []} for side in ('homeTeam', 'awayTeam')}
+    for spot in pbp.get('rosterSpots', []):
+        side = sides.get(spot.get('teamId'))
+        if side is None:
+            continue
+        t = tallies.get(str(spot.get('playerId')), {})
+        name = {'default': f"{spot.get('firstName', {}).get('default', '')[:1]}. {spot.get('lastName', {}).get('default', '')}"}
+        if spot.get('positionCode') == 'G':
+            groups[side]['goalies'].append({
+                'playerId': spot.get('playerId'), 'name': name,
+                'toi': elapsed if t.get('shots_against') else '0:00',
+                'shotsAgainst': t.get('shots_against', 0), 'saves': t.get('saves', 0)
+            })
+        else:
+            groups[side]['defense' if spot.get('positionCode') == 'D' else 'forwards'].append({
+                'playerId': spot.get('playerId'), 'name': name, 'goals': t.get('goals', 0),
+                'assists': t.get('assists', 0), 'plusMinus': 0, 'pim': t.get('pim', 0)
+            })
+    return project_boxscore(dict(pbp, playerByGameStats=groups))
+
+class LiveFeed:
+    """Play-by-play cursors for in-progress games
+    
+    Each poll applies only the plays past a game's cursor (its last sortOrder)
+    to per-player tallies: goals, assists, PIM, and shots/saves against goalies.
+    If a counted play disappears from the feed (an overturned goal), the game's
+    tallies are rebuilt. State lives in the workspace's db/live/ so a restart
+    resumes from the cursor; it's dropped once the FINAL boxscore has been
+    reconciled. The latest projection of each game stays in boxscores, never in
+    the games cache, which other workspaces may share and only holds
+    boxscores as the API served them.
+    """
+
+    def __init__(self):
+        self.games: Dict[int, Dict] = {}
+        self.boxscores: Dict[int, Dict] = {}  # game_id -> latest live_boxscore projection
+
+    @staticmethod
+    def state_path(game_id: int) -> str:
+        return f"{config.WORKSPACE_PATH}/db/live/{game_id}.json"
+
+    @staticmethod
+    def _new_state() -> Dict:
+        return {"cursor": -1, "events": [], "players": {}}
+
+    def _state(self, game_id: int) -> Dict:
+        if game_id not in self.games:
+            state = None
+            if os.path.exists(self.state_path(game_id)):
+                try:
+                    state = load_json_file(self.state_path(game_id))
+                except ValueError:
+                    pass
+            self.games[game_id] = state or self._new_state()
+        return self.games[game_id]
+
+    @staticmethod
+    def apply(state: Dict, play: Dict) -> bool:
+        """Add one play to the tallies; False for event types that don't move stats"""
+        kind = play.get('typeDescKey')
+        details = play.get('details', {})
+        
+        def bump(player_id, stat: str, n: int = 1) -> None:
+            if player_id:
+                tallies = state['players'].setdefault(str(player_id), {})
+                tallies[stat] = tallies.get(stat, 0) + n
+        
+        if kind == 'goal':
+            bump(details.get('scoringPlayerId'), 'goals')
+            bump(details.get('assist1PlayerId'), 'assists')
+            bump(details.get('assist2PlayerId'), 'assists')
+            bump(details.get('goalieInNetId'), 'shots_against')
+        elif kind == 'shot-on-goal':
+            bump(details.get('goalieInNetId'), 'shots_against')
+            bump(details.get('goalieInNetId'), 'saves')
+        elif kind == 'penalty':
+            bump(details.get('committedByPlayerId'), 'pim', details.get('duration', 0))
+        else:
+            return False
+        state['events'].append(play.get('eventId'))
+        return True
+
+    def update(self, game_id: int, pbp: Dict) -> Dict:
+        """Apply new plays from a play-by-play payload; returns the live boxscore projection"""
+        state = self._state(game_id)
+        plays = sorted(pbp.get('plays', []), key=lambda play: play.get('sortOrder', 0))
+        present = {play.get('eventId') for play in plays}
+        if any(event not in present for event in state['events']):
+            print(f"↺ Game {game_id}: play-by-play revised, rebuilding live tallies")
+            state.clear()
+            state.update(self._new_state())
+        
+        applied = 0
+        for play in plays:
+            if play.get('sortOrder', 0) > state['cursor']:
+                applied += self.apply(state, play)
+                state['cursor'] = play.get('sortOrder', 0)
+        if applied:
+            print(f"⚡ Game {game_id}: {applied} new scoring/penalty/shot events")
+        
+        os.makedirs(os.path.dirname(self.state_path(game_id)), exist_ok=True)
+        dump_json_file(state, self.state_path(game_id), indent=False)
+        self.boxscores[game_id] = live_boxscore(pbp, state['players'])
+        return self.boxscores[game_id]
+
+    def poll(self, game_id: int, http: 'ResilientFetcher') -> Optional[Dict]:
+        """Fetch a game's play-by-play and apply it; None if the feed is unavailable"""
+        try:
+            response = http.get(config.PLAY_BY_PLAY_URL.format(game_id))
+        except (CircuitOpenError, TransientFetchError) as e:
+            print(f"✗ Play-by-play for game {game_id} unavailable: {e}")
+            return None
+        if response.status_code != 200:
+            return None
+        try:
+            pbp = json_loads(response.content)
+        except ValueError:
+            return None
+        return self.update(game_id, pbp)
+
+    def reconcile(self, game_id: int, boxscore: Dict) -> int:
+        """Compare live tallies with the FINAL boxscore and drop the game's live state
+        
+        The boxscore is authoritative; returns how many players' live tallies
+        disagreed with it.
+        """
+        tallies = self._state(game_id)['players']
+        mismatched = 0
+        for side in ('homeTeam', 'awayTeam'):
+            groups = boxscore.get('playerByGameStats', {}).get(side, {})
+            for player in groups.get('forwards', []) + groups.get('defense', []):
+                t = tallies.get(str(player.get('playerId')), {})
+                if any(t.get(stat, 0) != player.get(stat, 0) for stat in ('goals', 'assists', 'pim')):
+                    mismatched += 1
+            for goalie in groups.get('goalies', []):
+                t = tallies.get(str(goalie.get('playerId')), {})
+                if t.get('shots_against', 0) != goalie.get('shotsAgainst', 0) or t.get('saves', 0) != goalie.get('saves', 0):
+                    mismatched += 1
+        print(f"✓ Game {game_id} reconciled with FINAL boxscore"
+              + (f" ({mismatched} players corrected)" if mismatched else ""))
+        self.games.pop(game_id, None)
+        self.boxscores.pop(game_id, None)
+        if os.path.exists(self.state_path(game_id)):
+            os.remove(self.state_path(game_id))
+        return mismatched
@@ -0,0 +1,124 @@
+"""File locks coordinating overlapping runs on a workspace and a shared games DB"""
+
+import os
+import socket
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Advisory file locks coordinate overlapping runs; without fcntl (Windows) runs aren't coordinated
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import config
+from jsonio import json_dumps, load_json_file
+
+# Coordination between overlapping runs: cron ticks, the query API, --live, leagues sharing a games DB
+RUN_LOCK_HUNG_AFTER = 30 * 60  # a run holding the lock longer than this is reported as hung
+GAME_LOCK_TIMEOUT = 120.0  # longest to wait on another run's fetch of a game before fetching anyway
+
+class LockHeld(Exception):
+    """Another process holds a FileLock"""
+
+    def __init__(self, path: str, holder: Optional[Dict]):
+        self.holder = holder
+        if not holder:
+            super().__init__(f"{path} is held by another process")
+            return
+        running = time.time() - holder.get('started', time.time())
+        message = f"held by pid {holder.get('pid')} on {holder.get('host')} for {running:.0f}s"
+        if running > RUN_LOCK_HUNG_AFTER:
+            message += " (looks hung; stop that process to recover)"
+        super().__init__(message)
+
+class FileLock:
+    """Advisory lock (flock) on a file that also records who holds it
+    
+    The kernel drops a flock when its process exits, however it exits, so a
+    crashed holder never blocks later runs. The holder's {pid, host, started}
+    is written into the file and cleared on release; finding it still there on
+    acquire means the previous holder died mid-run, and it is kept in
+    `recovered` so the caller can report the stale lock. With remove=True the
+    file is deleted on release instead, for short-lived locks that would
+    otherwise pile up. Without fcntl every acquire succeeds.
+    """
+
+    def __init__(self, path: str, remove: bool = False):
+        self.path = path
+        self.remove = remove
+        self.fd: Optional[int] = None
+        self.recovered: Optional[Dict] = None
+
+    def acquire(self, timeout: Optional[float] = 0) -> bool:
+        """Take the lock, waiting up to timeout seconds (None waits forever); False if it stayed held"""
+        if fcntl is None:
+            return True
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = 0.01
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                if self._locked_current_file(fd):
+                    break
+                # The holder removed the file as it released it; lock whatever is at the path now
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            except BlockingIOError:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    os.close(fd)
+                    return False
+                time.sleep(delay if remaining is None else min(delay, remaining))
+                delay = min(delay * 2, 0.25)
+        self.fd = fd
+        self.recovered = self.holder()
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, json_dumps({"pid": os.getpid(), "host": socket.gethostname(), "started": time.time()}), 0)
+        return True
+
+    def _locked_current_file(self, fd: int) -> bool:
+        """Whether fd is still the file at the lock's path (it isn't once a holder removed it)"""
+        try:
+            return os.fstat(fd).st_ino == os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return False
+
+    def release(self) -> None:
+        if self.fd is None:
+            return
+        if self.remove:
+            # Removed while still held, so a waiter that gets this file next sees it's gone
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+        else:
+            os.ftruncate(self.fd, 0)
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+
+    def holder(self) -> Optional[Dict]:
+        """Who holds (or, if nobody does, last failed to release) the lock"""
+        try:
+            return load_json_file(self.path) or None
+        except (OSError, ValueError):
+            return None
+
+@contextmanager
+def run_lock(wait: Optional[float] = 0):
+    """Hold the workspace's run lock for the block; raises LockHeld if another run keeps it past wait seconds"""
+    lock = FileLock(f"{config.WORKSPACE_PATH}/db/run.lock")
+    if not lock.acquire(wait):
+        raise LockHeld(lock.path, lock.holder())
+    if lock.recovered:
+        print(f"♻️ Recovered the run lock from pid {lock.recovered.get('pid')}, which exited without releasing it")
+    try:
+        yield
+    finally:
+        lock.release()
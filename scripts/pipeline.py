@@ -0,0 +1,231 @@
+"""The publish pipeline's stage DAG, memoized stage outputs and skip-unchanged publishing"""
+
+import hashlib
+import os
+import time
+from array import array
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Any, Optional
+
+import config
+from jsonio import RawJSON, atomic_write, content_digest, dump_json_file, file_version, json_dumps, json_loads, \
+    load_json_file, write_json_streaming
+
+class PublishManifest:
+    """Content hashes of the files the last publish wrote
+
+    Every rewrite of a published file is a commit, a full site build and a
+    Pages deploy, and standings.json gets a fresh updated_at on every run.
+    Files are hashed on their content without VOLATILE_FIELDS and only
+    rewritten when the hash differs from the recorded one, or the file was
+    changed or removed since. Hashes are kept in db/published.json.
+    """
+
+    def __init__(self):
+        self.path = f"{config.WORKSPACE_PATH}/db/published.json"
+        self.files: Dict[str, Dict] = {}
+        if os.path.exists(self.path):
+            try:
+                self.files = load_json_file(self.path)
+            except ValueError:
+                pass
+        self.written: List[str] = []
+        self.unchanged: List[str] = []
+
+    def write(self, path: str, data, indent: bool = True) -> bool:
+        """Write data to path (streamed when indented) unless its content is unchanged; returns whether it was written
+
+        The content is hashed before anything is written, so streams in data
+        must be re-iterable (lists or RawJSON sections, not generators).
+        """
+        name = os.path.relpath(path, config.WORKSPACE_PATH)
+        digest = content_digest(data, indent)
+        recorded = self.files.get(name)
+        if recorded and recorded['hash'] == digest and tuple(recorded['version']) == file_version(path):
+            self.unchanged.append(name)
+            return False
+        if indent:
+            write_json_streaming(path, data)
+        else:
+            dump_json_file(data, path, indent=False)
+        self.files[name] = {"hash": digest, "version": file_version(path)}
+        self.written.append(name)
+        return True
+
+    def save(self) -> None:
+        """Record the hashes if anything was written"""
+        if self.written:
+            dump_json_file(self.files, self.path, indent=False)
+
+def snapshot_files() -> List[list]:
+    """[name, mtime, size] of every daily snapshot file, to fingerprint what the history is built from"""
+    if not os.path.isdir(config.SNAPSHOTS_PATH):
+        return []
+    return [[filename, *(file_version(os.path.join(config.SNAPSHOTS_PATH, filename)) or ())]
+            for filename in sorted(os.listdir(config.SNAPSHOTS_PATH)) if filename.endswith('.json')]
+
+def stage_fingerprint(*parts) -> str:
+    """sha256 over parts: buffers (bytes, arrays) are hashed as-is, anything else by its JSON encoding"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, (bytes, bytearray, memoryview, array)) else json_dumps(part))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+# Modules whose code shapes the pipeline's outputs
+PIPELINE_MODULES = ('config', 'jsonio', 'games_db', 'records', 'scoring', 'pipeline', 'live', 'rosters', 'stats_fetcher')
+
+@lru_cache(maxsize=1)
+def code_fingerprint() -> str:
+    """Fingerprint of the pipeline's source, so memoized stage outputs never outlive the code that produced them"""
+    sources = []
+    for name in PIPELINE_MODULES:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{name}.py"), 'rb') as f:
+            sources.append(f.read())
+    return stage_fingerprint(*sources)
+
+class Stage:
+    """One step of the publish pipeline
+
+    fn receives a dict of its declared inputs (earlier stages' outputs or
+    seeds) and returns its output. memo=True stores the output keyed by the
+    stage's input fingerprint; restore(output) re-applies a memoized output's
+    side effects on the fetcher. raw=True outputs are RawJSON sections, stored
+    as their bytes. content_fingerprint=True fingerprints the output itself
+    rather than the inputs, for stages that read state outside the DAG.
+    """
+    __slots__ = ('name', 'fn', 'inputs', 'memo', 'restore', 'raw', 'content_fingerprint')
+
+    def __init__(self, name: str, fn, inputs=(), memo: bool = False, restore=None, raw: bool = False,
+                 content_fingerprint: bool = False):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.memo = memo
+        self.restore = restore
+        self.raw = raw
+        self.content_fingerprint = content_fingerprint
+
+class StageScheduler:
+    """Run a stage DAG: dependencies first, one stage at a time, unchanged memoized stages skipped
+
+    A stage's fingerprint hashes its name, the code fingerprint and its inputs'
+    fingerprints, so it only changes when something upstream did. Memoized
+    outputs live in memo_dir as '{name}.memo' (fingerprint line, then the
+    encoded output). Stages run serially on the calling thread, in declaration
+    order as far as their inputs allow: they share the fetcher and mutate its
+    PlayerRecords (z-scores write save_pct), and under the GIL a thread pool
+    bought nothing over this.
+    A read_only scheduler reuses memos but never writes them or the manifest.
+    """
+
+    def __init__(self, stages: List[Stage], memo_dir: Optional[str] = None, read_only: bool = False):
+        self.stages = {stage.name: stage for stage in stages}
+        self.memo_dir = memo_dir
+        self.read_only = read_only
+        self.timings: Dict[str, tuple] = {}  # name -> ('ran' | 'memo', seconds)
+        self.fingerprints: Dict[str, str] = {}  # name -> fingerprint, as of the last run
+
+    def _memo_path(self, name: str) -> str:
+        return f"{self.memo_dir}/{name}.memo"
+
+    def _load(self, stage: Stage, fingerprint: str):
+        """The memoized output for this fingerprint, or None"""
+        try:
+            with open(self._memo_path(stage.name), 'rb') as f:
+                if f.readline().rstrip(b'\n').decode('ascii') != fingerprint:
+                    return None
+                payload = f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+        try:
+            return RawJSON(payload) if stage.raw else json_loads(payload)
+        except ValueError:
+            return None
+
+    def _store(self, stage: Stage, fingerprint: str, output) -> None:
+        os.makedirs(self.memo_dir, exist_ok=True)
+        path = self._memo_path(stage.name)
+        with atomic_write(path) as f:
+            f.write(fingerprint.encode('ascii') + b'\n')
+            f.write(output.data if stage.raw else json_dumps(output))
+
+    def _run_stage(self, stage: Stage, inputs: Dict, fingerprint: str):
+        started = time.perf_counter()
+        output = self._load(stage, fingerprint) if stage.memo and self.memo_dir else None
+        if output is not None:
+            if stage.restore:
+                stage.restore(output)
+            status = 'memo'
+        else:
+            output = stage.fn(inputs)
+            if stage.memo and self.memo_dir and not self.read_only:
+                self._store(stage, fingerprint, output)
+            status = 'ran'
+        self.timings[stage.name] = (status, time.perf_counter() - started)
+        return output
+
+    def required(self, targets) -> List[str]:
+        """Names of the targets and every stage they depend on"""
+        needed, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name in self.stages and name not in needed:
+                needed.add(name)
+                stack.extend(self.stages[name].inputs)
+        return [name for name in self.stages if name in needed]
+
+    def run(self, seeds: Dict[str, tuple], targets: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Run the stages targets need (default: all); seeds maps name -> (value, fingerprint)
+        
+        Returns every output by name. The memo fingerprints of the run are
+        recorded in memo_dir/manifest.json for load_memoized().
+        """
+        values = {name: value for name, (value, _) in seeds.items()}
+        fingerprints = {name: fingerprint for name, (_, fingerprint) in seeds.items()}
+        memo_keys = {}
+        pending = {name: self.stages[name] for name in self.required(targets or self.stages)}
+        while pending:
+            ready = [name for name, stage in pending.items() if all(dep in fingerprints for dep in stage.inputs)]
+            if not ready:
+                raise ValueError(f"Stages with unresolvable inputs: {', '.join(sorted(pending))}")
+            for name in ready:
+                stage = pending.pop(name)
+                fingerprint = stage_fingerprint(code_fingerprint(), name, [fingerprints[dep] for dep in stage.inputs])
+                values[name] = self._run_stage(stage, {dep: values[dep] for dep in stage.inputs}, fingerprint)
+                fingerprints[name] = stage_fingerprint(values[name]) if stage.content_fingerprint else fingerprint
+                if stage.memo:
+                    memo_keys[name] = fingerprint
+        self.fingerprints = fingerprints
+        if self.memo_dir and not self.read_only:
+            os.makedirs(self.memo_dir, exist_ok=True)
+            dump_json_file(memo_keys, f"{self.memo_dir}/manifest.json")
+        return values
+
+    def load_memoized(self, names: List[str]) -> Dict[str, Any]:
+        """Outputs of the named stages as of the last run, straight from their memos
+        
+        Raises ValueError if a stage has no memo matching that run.
+        """
+        try:
+            memo_keys = load_json_file(f"{self.memo_dir}/manifest.json")
+        except (OSError, ValueError):
+            memo_keys = {}
+        outputs = {}
+        for name in names:
+            stage = self.stages[name]
+            output = self._load(stage, memo_keys[name]) if name in memo_keys else None
+            if output is None:
+                raise ValueError(f"no computed '{name}' output in {self.memo_dir}; run the compute command first")
+            outputs[name] = output
+        return outputs
+
+@contextmanager
+def timed(label: str):
+    """Print how long the block took"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        print(f"⏱️ {label} took {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""Query API: serve the pipeline's latest state from memory over HTTP
+
+Keeps the fetch-stats.py pipeline running in-process and answers JSON queries
+and a server-sent events stream of changes from its stage outputs. See
+"Query API" in README.md.
+"""
+
+import argparse
+import asyncio
+import gzip
+import os
+import re
+import time
+from collections import deque
+from http import HTTPStatus
+from typing import Dict, List, Any, Optional
+from urllib.parse import unquote, urlsplit
+
+# Optional brotli for Content-Encoding: br; gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from fetch_layer import add_transport_arguments, transport_from_args
+from jsonio import RawJSON, json_dumps, json_loads
+from locks import run_lock
+from pipeline import stage_fingerprint
+from stats_fetcher import MILESTONES_LISTED, StatsFetcher
+
+def team_slug(team: str) -> str:
+    """URL slug for a Wally team, as the site builds it"""
+    return re.sub(r'[^a-z0-9]+', '-', team.lower()).strip('-')
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """Pick 'br' (when brotli is installed), 'gzip' or 'identity' from an Accept-Encoding header"""
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.partition(';')
+        weight = 1.0
+        params = params.strip().lower()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    for encoding in (('br',) if brotli else ()) + ('gzip',):
+        if weights.get(encoding, weights.get('*', 0.0)) > 0:
+            return encoding
+    return 'identity'
+
+class APIResource:
+    """A precomputed JSON response body with a strong ETag; compressed variants are built on first request"""
+    __slots__ = ('body', 'etag', 'variants')
+
+    MIN_COMPRESS_SIZE = 512  # Smaller bodies aren't worth a Content-Encoding
+
+    def __init__(self, obj):
+        self.body = json_dumps(obj)
+        self.etag = stage_fingerprint(self.body)[:32]
+        self.variants = {'identity': self.body}
+
+    def encoded(self, encoding: str):
+        """(body, encoding, ETag header) for the negotiated encoding"""
+        if len(self.body) < self.MIN_COMPRESS_SIZE:
+            encoding = 'identity'
+        if encoding not in self.variants:
+            self.variants[encoding] = brotli.compress(self.body) if encoding == 'br' else gzip.compress(self.body, 6)
+        # Strong ETags differ per representation
+        return self.variants[encoding], encoding, f'"{self.etag}"' if encoding == 'identity' else f'"{self.etag}-{encoding}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """Whether an If-None-Match header names any representation of this body"""
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag == '*':
+                return True
+            tag = tag.removeprefix('W/').strip('"')
+            if tag.split('-', 1)[0] == self.etag:
+                return True
+        return False
+
+class EventStream:
+    """Server-sent events with sequence ids, a bounded replay buffer and Last-Event-ID resumption
+
+    Ids are '{epoch}-{seq}', where epoch identifies this server process. A
+    client resuming from an id still in the buffer gets exactly the events it
+    missed. One from another process, or one too old to replay, gets a 'reset'
+    event and should reload through the query endpoints. Each event is encoded
+    once for all clients. Idle clients are coroutines waiting on a shared
+    asyncio.Event, with a comment line every HEARTBEAT seconds.
+    """
+    HEARTBEAT = 15.0
+    RETRY_MS = 5000
+
+    def __init__(self, buffer_size: int = 1000):
+        self.epoch = format(int(time.time()), 'x')
+        self.seq = 0
+        self.buffer = deque(maxlen=buffer_size)  # (seq, encoded event), oldest first
+        self.loop = None
+        self.wakeup = None
+        self.clients = 0
+
+    def bind(self, loop) -> None:
+        """Attach to the event loop that serves clients; publish() may then be called from any thread"""
+        self.loop = loop
+        self.wakeup = asyncio.Event()
+
+    def encode(self, event: str, data, event_id: str) -> bytes:
+        return f"id: {event_id}\nevent: {event}\ndata: ".encode() + json_dumps(data) + b"\n\n"
+
+    def publish(self, events: List[tuple]) -> None:
+        """Queue (event type, data) pairs for every connected and resuming client"""
+        encoded = []
+        for event, data in events:
+            self.seq += 1
+            encoded.append((self.seq, self.encode(event, data, f"{self.epoch}-{self.seq}")))
+        if not encoded:
+            return
+        if self.loop:
+            self.loop.call_soon_threadsafe(self._append, encoded)
+        else:
+            self.buffer.extend(encoded)
+
+    def _append(self, encoded: List[tuple]) -> None:
+        self.buffer.extend(encoded)
+        self.wakeup.set()
+        self.wakeup = type(self.wakeup)()
+
+    @property
+    def last_seq(self) -> int:
+        return self.buffer[-1][0] if self.buffer else 0
+
+    def resume_point(self, last_event_id: Optional[str]) -> Optional[int]:
+        """Sequence number to replay after, or None if last_event_id can't be resumed here"""
+        if not last_event_id:
+            return self.last_seq
+        epoch, _, seq = last_event_id.partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        first = self.buffer[0][0] if self.buffer else self.last_seq + 1
+        return seq if first - 1 <= seq <= self.last_seq else None
+
+    def since(self, seq: int) -> List[bytes]:
+        """Encoded events after seq, oldest first"""
+        if not self.buffer or seq >= self.last_seq:
+            return []
+        start = max(0, seq + 1 - self.buffer[0][0])
+        return [encoded for _, encoded in list(self.buffer)[start:]]
+
+    async def serve(self, writer, last_event_id: Optional[str]) -> None:
+        """Stream events to one client until it disconnects"""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                     b"Connection: keep-alive\r\nAccess-Control-Allow-Origin: *\r\nX-Accel-Buffering: no\r\n\r\n")
+        writer.write(f"retry: {self.RETRY_MS}\n\n".encode())
+        cursor = self.resume_point(last_event_id)
+        if cursor is None:
+            cursor = self.last_seq
+            writer.write(self.encode('reset', {"reason": "cannot resume from that event id, reload the standings"},
+                                     f"{self.epoch}-{cursor}"))
+        self.clients += 1
+        try:
+            while True:
+                pending = self.since(cursor)
+                if pending:
+                    # A client that fell out of the buffer starts over rather than skipping events silently
+                    if self.resume_point(f"{self.epoch}-{cursor}") is None:
+                        cursor = self.last_seq
+                        writer.write(self.encode('reset', {"reason": "fell behind the event buffer"}, f"{self.epoch}-{cursor}"))
+                    else:
+                        writer.write(b''.join(pending))
+                        cursor = self.last_seq
+                    await writer.drain()
+                    continue
+                wakeup = self.wakeup
+                try:
+                    await asyncio.wait_for(wakeup.wait(), self.HEARTBEAT)
+                except asyncio.TimeoutError:
+                    writer.write(b": keep-alive\n\n")
+                    await writer.drain()
+        finally:
+            self.clients -= 1
+
+class QueryAPI:
+    """In-memory HTTP query API over the latest computed pipeline state
+
+    Each section below maps stage outputs to a set of paths. update() rebuilds
+    a section's serialized bodies only when the fingerprints of its source
+    stages change, so unchanged sections keep their bodies, ETags and
+    compressed variants across refreshes. A rebuilt section with a change
+    function also diffs its old and new objects into events for /events.
+    """
+
+    def __init__(self):
+        self.resources: Dict[str, APIResource] = {}
+        self.section_keys: Dict[str, List] = {}
+        self.section_paths: Dict[str, List[str]] = {}
+        self.section_objects: Dict[str, Dict[str, Any]] = {}  # name -> {path: object}, for diffing
+        self.milestones_seen: Dict[tuple, tuple] = {}  # (player, country, type, game_id) -> (date, game_id)
+        self.milestones_floor: tuple = ()  # (date, game_id) of the oldest milestone on a full list so far
+        self.events = EventStream()
+        self.sections = {
+            'standings': (('standings', 'marginal'), self._standings_paths, self._standings_changes),
+            'teams': (('teams',), self._team_paths, None),
+            'players': (('players',), self._player_paths, self._player_changes),
+            'recaps': (('recaps',), self._recap_paths, None),
+            'hot': (('hot',), lambda hot: {'/hot': hot['summary']}, self._hot_changes),
+            'cold': (('cold',), lambda cold: {'/cold': cold['summary']}, None),
+            'milestones': (('milestones',), lambda milestones: {'/milestones': milestones}, self._milestone_changes),
+            'leaderboards': (('leaderboards',), lambda leaderboards: {'/leaderboards': leaderboards}, None),
+            'views': (('views',), lambda views: {f"/views/{page}": model for page, model in views.items()}, None),
+            'profiles': (('profiles',), lambda profiles: {'/profiles': profiles}, None),
+        }
+
+    @staticmethod
+    def _loaded(section):
+        return json_loads(section.data) if isinstance(section, RawJSON) else section
+
+    def _standings_paths(self, standings, marginal) -> Dict[str, Any]:
+        return {'/standings': {"standings": standings, "marginal_points": marginal}}
+
+    def _team_paths(self, teams) -> Dict[str, Any]:
+        teams = self._loaded(teams)
+        paths = {'/teams': [{"team": name, "slug": team_slug(name), "totals": team['totals']} for name, team in teams.items()]}
+        for name, team in teams.items():
+            paths[f"/teams/{team_slug(name)}"] = dict(team, team=name)
+        return paths
+
+    def _player_paths(self, players) -> Dict[str, Any]:
+        players = self._loaded(players)
+        paths = {'/players': [{key: value for key, value in player.items() if key != 'game_log'} for player in players]}
+        for player in players:
+            if player.get('player_id') is not None:
+                paths[f"/players/{player['player_id']}"] = player
+        return paths
+
+    def _recap_paths(self, recaps) -> Dict[str, Any]:
+        recaps = self._loaded(recaps)
+        paths = {'/recaps': recaps}
+        for date, recap in recaps.items():
+            paths[f"/recaps/{date}"] = recap
+        return paths
+
+    @staticmethod
+    def _standings_changes(before: Dict, after: Dict) -> List[tuple]:
+        """A 'roto' event for each team whose roto points or rank moved"""
+        previous = {row['team']: row for row in before['/standings']['standings']}
+        events = []
+        for row in after['/standings']['standings']:
+            old = previous.get(row['team'])
+            if old and (old['total_roto_points'], old['rank']) != (row['total_roto_points'], row['rank']):
+                events.append(('roto', {"team": row['team'], "roto_points": row['total_roto_points'],
+                                        "change": row['total_roto_points'] - old['total_roto_points'],
+                                        "rank": row['rank'], "previous_rank": old['rank']}))
+        return events
+
+    @staticmethod
+    def _player_changes(before: Dict, after: Dict) -> List[tuple]:
+        """A 'player' event for each player whose season stats changed, with the per-stat deltas"""
+        previous = {(p['name'], p['country']): p['stats'] for p in before['/players']}
+        events = []
+        for player in after['/players']:
+            old = previous.get((player['name'], player['country']), {})
+            changes = {stat: value - old.get(stat, 0) for stat, value in player['stats'].items()
+                       if isinstance(value, (int, float)) and value != old.get(stat, 0)}
+            if changes:
+                events.append(('player', {"name": player['name'], "country": player['country'],
+                                          "wally_team": player['wally_team'], "stats": player['stats'], "changes": changes}))
+        return events
+
+    @staticmethod
+    def _hot_changes(before: Dict, after: Dict) -> List[tuple]:
+        """One 'hot' event when players enter or leave the hot list"""
+        old = [(p['name'], p['country']) for p in before['/hot']]
+        new = [(p['name'], p['country']) for p in after['/hot']]
+        if old == new:
+            return []
+        return [('hot', {"entered": [name for name, country in new if (name, country) not in old],
+                         "left": [name for name, country in old if (name, country) not in new],
+                         "hot_players": after['/hot']})]
+
+    def _milestone_changes(self, before: Dict, after: Dict) -> List[tuple]:
+        """A 'milestone' event for each milestone not listed before, oldest first
+
+        /milestones holds only the latest MILESTONES_LISTED, so a milestone
+        that drops off a full list and comes back (after a stat correction,
+        say) isn't new. Once the list has been full, nothing older than its
+        oldest entry counts as new, and seen milestones older than that are
+        forgotten; the rest are kept, so the set stays about the list's size.
+        """
+        identity = lambda m: (m['player'], m.get('country'), m['type'], m.get('game_id'))
+        recency = lambda m: (m['date'], m.get('game_id'))
+        listed = after['/milestones']
+        if len(listed) >= MILESTONES_LISTED:
+            self.milestones_floor = max(self.milestones_floor, min(map(recency, listed)))
+        self.milestones_seen.update((identity(m), recency(m)) for m in before['/milestones'])
+        events = []
+        for milestone in reversed(listed):
+            if identity(milestone) not in self.milestones_seen and recency(milestone) >= self.milestones_floor:
+                events.append(('milestone', milestone))
+        self.milestones_seen = {key: seen for key, seen in self.milestones_seen.items() if seen >= self.milestones_floor}
+        self.milestones_seen.update((identity(m), recency(m)) for m in listed)
+        return events
+
+    def update(self, results: Dict[str, Any], fingerprints: Dict[str, str]) -> List[str]:
+        """Swap in new stage outputs and publish change events; returns the names of the sections that changed"""
+        resources = dict(self.resources)
+        changed, events = [], []
+        for name, (sources, build, changes) in self.sections.items():
+            key = [fingerprints.get(source) for source in sources]
+            if self.section_keys.get(name) == key and None not in key:
+                continue
+            paths = build(*(results[source] for source in sources))
+            for path in self.section_paths.get(name, ()):
+                resources.pop(path, None)
+            resources.update((path, APIResource(obj)) for path, obj in paths.items())
+            if changes and name in self.section_objects:
+                events.extend(changes(self.section_objects[name], paths))
+            self.section_objects[name] = paths
+            self.section_paths[name] = list(paths)
+            self.section_keys[name] = key
+            changed.append(name)
+        self.resources = resources  # One assignment, so readers never see a half-updated set
+        self.events.publish(events)
+        return changed
+
+    def refresh(self, transport=None, workers: int = 1) -> List[str]:
+        """Run the pipeline (publishing standings.json as usual) and update from its outputs"""
+        with run_lock():
+            fetcher = StatsFetcher(transport=transport)
+            results = fetcher.run(workers=workers)
+        changed = self.update(results, fetcher.stage_fingerprints)
+        print(f"🛰️ API sections updated: {', '.join(changed) or 'none'} ({self.events.clients} event clients)")
+        return changed
+
+    def respond(self, method: str, target: str, headers: Dict[str, str]):
+        """(status, headers, body) for a request; HEAD gets GET's headers and no body"""
+        response_headers = {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'}
+        if method not in ('GET', 'HEAD'):
+            response_headers['Allow'] = 'GET, HEAD'
+            return 405, response_headers, json_dumps({"error": "method not allowed"})
+        if not self.resources:
+            response_headers['Retry-After'] = '5'
+            return 503, response_headers, json_dumps({"error": "standings not computed yet"})
+        resource = self.resources.get(unquote(urlsplit(target).path).rstrip('/') or '/')
+        if resource is None:
+            return 404, response_headers, json_dumps({"error": "not found", "paths": sorted(
+                path for path in self.resources if path.count('/') == 1)})
+
+        body, encoding, etag = resource.encoded(negotiate_encoding(headers.get('accept-encoding', '')))
+        response_headers.update({'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'})
+        if resource.matches(headers.get('if-none-match', '')):
+            return 304, response_headers, b''
+        if encoding != 'identity':
+            response_headers['Content-Encoding'] = encoding
+        return 200, response_headers, body
+
+    async def handle(self, reader, writer) -> None:
+        """Serve HTTP/1.1 requests on one connection until it closes or asks to"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                headers = {}
+                for line in header_lines:
+                    name, sep, value = line.partition(':')
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.split(' ', 2)
+                except ValueError:
+                    method, target, version = '', '/', 'HTTP/1.0'
+                if headers.get('content-length', '0') != '0' or 'transfer-encoding' in headers:
+                    method = ''  # Request bodies aren't read, so the connection can't be reused
+                if method == 'GET' and target.split('?', 1)[0] == '/events':
+                    await self.events.serve(writer, headers.get('last-event-id'))
+                    return
+
+                status, response_headers, body = self.respond(method, target, headers)
+                keep_alive = method != '' and version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                response_headers['Content-Length'] = str(len(body))
+                response_headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+                lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"] + [f"{k}: {v}" for k, v in response_headers.items()]
+                writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+                if method != 'HEAD' and status != 304:
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+def serve_api(port: int = 8780, host: str = '127.0.0.1', interval: float = 60.0, transport=None, workers: int = 1) -> None:
+    """Serve standings, teams, players, recaps, hot/cold lists and a change stream from memory over HTTP
+
+    The pipeline re-runs every interval seconds on a worker thread (still
+    publishing standings.json); requests are answered from precomputed bodies
+    by an asyncio server on the main thread and keep getting the last good
+    state while a refresh runs or if one fails.
+    """
+    api = QueryAPI()
+
+    async def refresh_forever():
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                await loop.run_in_executor(None, api.refresh, transport, workers)
+            except Exception as e:
+                print(f"✗ Refresh failed, still serving the previous state: {e}")
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+    async def serve():
+        api.events.bind(asyncio.get_running_loop())
+        server = await asyncio.start_server(api.handle, host, port, backlog=1024)
+        print(f"🛰️ Query API on http://{host}:{port} (refreshing every {interval:g}s)")
+        async with server:
+            await asyncio.gather(server.serve_forever(), refresh_forever())
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Wally Cup standings from memory over HTTP, refreshing periodically")
+    parser.add_argument("--port", type=int, default=8780, help="port to listen on (default 8780)")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default 127.0.0.1)")
+    parser.add_argument("--interval", type=float, default=60.0, help="seconds between pipeline refreshes")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes for parsing cached FINAL boxscores (0 = one per CPU, default 1)")
+    add_transport_arguments(parser)
+    args = parser.parse_args()
+    serve_api(args.port, args.host, args.interval, transport_from_args(parser, args), workers=args.workers or os.cpu_count() or 1)
+
+if __name__ == "__main__":
+    main()
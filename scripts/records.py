@@ -0,0 +1,186 @@
+"""Per-game fact table and the player, game log and goalie records derived from it"""
+
+import unicodedata
+from array import array
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+def strip_diacritics(s: str) -> str:
+    """Normalize unicode characters to ASCII equivalents (é→e, ü→u, etc.)"""
+    return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
+
+SKATER_LOG_STATS = ('gp', 'goals', 'assists', 'plus_minus', 'pim')
+GOALIE_LOG_STATS = ('gp', 'wins', 'saves', 'shots_against')
+
+@lru_cache(maxsize=None)
+def date_to_ordinal(date: str) -> int:
+    """Convert a YYYY-MM-DD string to a proleptic ordinal (0 for missing dates)"""
+    return datetime.strptime(date, '%Y-%m-%d').toordinal() if date else 0
+
+@lru_cache(maxsize=None)
+def ordinal_to_date(ordinal: int) -> str:
+    """Inverse of date_to_ordinal"""
+    return datetime.fromordinal(ordinal).strftime('%Y-%m-%d') if ordinal else ''
+
+def toi_to_seconds(toi: str) -> int:
+    """Convert an NHL 'MM:SS' time-on-ice string to seconds"""
+    try:
+        minutes, seconds = toi.split(':')
+        return int(minutes) * 60 + int(seconds)
+    except (AttributeError, ValueError):
+        return 0
+
+class GameStatTable:
+    """Columnar fact table with one row per player per game.
+
+    Every column is a typed ``array`` so a row costs a few dozen bytes instead of
+    a dict-of-dicts. Player and Wally team columns hold indexes into the
+    fetcher's dimension lists (team_idx is -1 for players not on a Wally roster).
+    All per-player, per-team, windowed and per-day figures are group-by
+    reductions over these columns.
+    """
+
+    COLUMNS = (
+        ('game_id', 'q'), ('date', 'l'), ('player_idx', 'l'), ('team_idx', 'l'),
+        ('gp', 'l'), ('goals', 'l'), ('assists', 'l'), ('plus_minus', 'l'), ('pim', 'l'),
+        ('wins', 'l'), ('saves', 'l'), ('shots_against', 'l'), ('toi', 'l'),
+    )
+    STAT_COLUMNS = ('gp', 'goals', 'assists', 'plus_minus', 'pim', 'wins', 'saves', 'shots_against')
+
+    def __init__(self):
+        self.columns = {name: array(typecode) for name, typecode in self.COLUMNS}
+        self._append = [self.columns[name].append for name, _ in self.COLUMNS]
+
+    def __len__(self) -> int:
+        return len(self.columns['game_id'])
+
+    def __getitem__(self, name: str) -> array:
+        return self.columns[name]
+
+    def append(self, *values: int) -> None:
+        """Append one row; values follow the COLUMNS order"""
+        for append, value in zip(self._append, values):
+            append(value)
+
+    def logged_rows(self) -> List[int]:
+        """Row indexes that appear in player game logs (dated games actually played)"""
+        game_id, date, gp = self.columns['game_id'], self.columns['date'], self.columns['gp']
+        return [i for i in range(len(self)) if gp[i] > 0 and game_id[i] and date[i]]
+
+    def group_rows(self, key: str, rows: Optional[List[int]] = None) -> Dict[int, List[int]]:
+        """Group row indexes by the values of a key column, preserving row order"""
+        key_col = self.columns[key]
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for i in (range(len(self)) if rows is None else rows):
+            groups[key_col[i]].append(i)
+        return groups
+
+    def group_sum(self, key: str, columns=STAT_COLUMNS, rows: Optional[List[int]] = None) -> Dict[int, Dict[str, int]]:
+        """Sum stat columns grouped by a key column, optionally over a subset of rows"""
+        key_col = self.columns[key]
+        cols = [(name, self.columns[name]) for name in columns]
+        sums: Dict[int, Dict[str, int]] = {}
+        for i in (range(len(self)) if rows is None else rows):
+            group = sums.get(key_col[i])
+            if group is None:
+                group = sums[key_col[i]] = dict.fromkeys(columns, 0)
+            for name, col in cols:
+                group[name] += col[i]
+        return sums
+
+class GameLogRow:
+    """One player's line for one game, read out of the GameStatTable"""
+    __slots__ = ('game_id', 'date', 'gp', 'goals', 'assists', 'plus_minus', 'pim',
+                 'wins', 'saves', 'shots_against', 'is_goalie')
+
+    def __init__(self, game_id: int, date: str, gp: int, goals: int, assists: int, plus_minus: int,
+                 pim: int, wins: int, saves: int, shots_against: int, is_goalie: bool):
+        self.game_id = game_id
+        self.date = date
+        self.gp = gp
+        self.goals = goals
+        self.assists = assists
+        self.plus_minus = plus_minus
+        self.pim = pim
+        self.wins = wins
+        self.saves = saves
+        self.shots_against = shots_against
+        self.is_goalie = is_goalie
+
+    @classmethod
+    def from_table(cls, table: GameStatTable, i: int, is_goalie: bool) -> 'GameLogRow':
+        c = table.columns
+        return cls(c['game_id'][i], ordinal_to_date(c['date'][i]), c['gp'][i], c['goals'][i], c['assists'][i],
+                   c['plus_minus'][i], c['pim'][i], c['wins'][i], c['saves'][i], c['shots_against'][i], is_goalie)
+
+    def stats_dict(self) -> Dict[str, int]:
+        """Stats in the game-log shape for this player's position"""
+        return {stat: getattr(self, stat) for stat in (GOALIE_LOG_STATS if self.is_goalie else SKATER_LOG_STATS)}
+
+    def to_dict(self) -> Dict:
+        return {"game_id": self.game_id, "date": self.date, "stats": self.stats_dict()}
+
+class GoalieLine:
+    """Aggregate goaltending line for a Wally team"""
+    __slots__ = ('wins', 'saves', 'shots_against', 'save_pct', 'qualified')
+
+    def __init__(self, wins: int = 0, saves: int = 0, shots_against: int = 0, save_pct: float = 0, qualified: bool = False):
+        self.wins = wins
+        self.saves = saves
+        self.shots_against = shots_against
+        self.save_pct = save_pct
+        self.qualified = qualified
+
+    def to_dict(self) -> Dict:
+        return {"wins": self.wins, "saves": self.saves, "shots_against": self.shots_against,
+                "save_pct": self.save_pct, "qualified": self.qualified}
+
+class PlayerRecord:
+    """An Olympic player tracked across all games, with derived totals and rankings"""
+    __slots__ = ('name', 'country', 'pos', 'wally_team', 'player_id', 'headshot_url', 'stats',
+                 'zscore', 'zscore_rank', 'hot_zscore', 'is_hot', 'hot_72h_stats',
+                 'cold_zscore', 'is_cold', 'cold_72h_stats')
+
+    def __init__(self, name: str, country: str, pos: str, wally_team: Optional[str] = None,
+                 player_id: Optional[int] = None, headshot_url: Optional[str] = None):
+        self.name = name
+        self.country = country
+        self.pos = pos
+        self.wally_team = wally_team
+        self.player_id = player_id
+        self.headshot_url = headshot_url
+        self.stats = {"gp": 0, "goals": 0, "assists": 0, "plus_minus": 0, "pim": 0}
+        self.zscore = None
+        self.zscore_rank = None
+        self.hot_zscore = None
+        self.is_hot = False
+        self.hot_72h_stats = None
+        self.cold_zscore = None
+        self.is_cold = False
+        self.cold_72h_stats = None
+
+    def to_dict(self, game_log: List[Dict]) -> Dict:
+        """Serialize in the standings.json player shape"""
+        d = {
+            "name": self.name,
+            "country": self.country,
+            "pos": self.pos,
+            "wally_team": self.wally_team,
+            "player_id": self.player_id,
+            "headshot_url": self.headshot_url,
+            "stats": self.stats,
+            "game_log": game_log,
+            "zscore": self.zscore,
+            "zscore_rank": self.zscore_rank,
+            "hot_zscore": self.hot_zscore,
+            "is_hot": self.is_hot,
+            "cold_zscore": self.cold_zscore,
+            "is_cold": self.is_cold,
+        }
+        if self.hot_72h_stats is not None:
+            d["hot_72h_stats"] = self.hot_72h_stats
+        if self.cold_72h_stats is not None:
+            d["cold_72h_stats"] = self.cold_72h_stats
+        return d
@@ -0,0 +1,185 @@
+"""Wally rosters: name lookups, their cached inputs and the effective-dated ledger of roster moves"""
+
+import marshal
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+import config
+from jsonio import atomic_write, dump_json_file, json_loads, load_json_file
+from pipeline import code_fingerprint, stage_fingerprint
+from records import date_to_ordinal, ordinal_to_date, strip_diacritics
+
+def build_player_lookups(rosters: Dict) -> tuple:
+    """Roster name -> (team, country, pos, nhl_team), and abbreviated box score names -> roster name"""
+    player_lookup = {}
+    abbreviated_lookup = {}
+    for team_name, players in rosters.items():
+        for player in players:
+            full_name = player["name"]
+            player_lookup[full_name] = {
+                "team": team_name,
+                "country": player["olympic_country"],
+                "pos": player["pos"],
+                "nhl_team": player["nhl_team"]
+            }
+            
+            # Create abbreviated name mapping (First Initial. Last Name)
+            name_parts = full_name.split()
+            if len(name_parts) >= 2:
+                # Standard: "J. Ek" for "Joel Eriksson Ek"
+                abbreviated = f"{name_parts[0][0]}. {name_parts[-1]}"
+                abbreviated_lookup[abbreviated] = full_name
+                # Also store ASCII-normalized version for diacritic matching
+                ascii_abbreviated = strip_diacritics(abbreviated)
+                if ascii_abbreviated != abbreviated:
+                    abbreviated_lookup[ascii_abbreviated] = full_name
+                # Multi-word last name: "J. Eriksson Ek" for "Joel Eriksson Ek"
+                if len(name_parts) >= 3:
+                    multi_word = f"{name_parts[0][0]}. {' '.join(name_parts[1:])}"
+                    abbreviated_lookup[multi_word] = full_name
+                    ascii_multi = strip_diacritics(multi_word)
+                    if ascii_multi != multi_word:
+                        abbreviated_lookup[ascii_multi] = full_name
+                # Hyphenated first name: "P-L. Dubois" for "Pierre-Luc Dubois"
+                if '-' in name_parts[0]:
+                    hyph_parts = name_parts[0].split('-')
+                    hyph_abbr = f"{'-'.join(p[0] for p in hyph_parts)}. {name_parts[-1]}"
+                    abbreviated_lookup[hyph_abbr] = full_name
+    return player_lookup, abbreviated_lookup
+
+# Workspace files the roster lookups are derived from (rosters.json is required)
+ROSTER_INPUTS = ('rosters.json', 'name_overrides.json', 'player_ids.json')
+
+def load_roster_inputs() -> Dict[str, Any]:
+    """Roster inputs and their derived lookup tables, from db/lookups.bin when the inputs are unchanged
+
+    The cache is marshalled plain data keyed by a hash of the input files and
+    the pipeline's code, so an edit to either rebuilds it on the next run.
+    """
+    contents = {}
+    for name in ROSTER_INPUTS:
+        try:
+            with open(config.ROSTERS_PATH if name == 'rosters.json' else f"{config.WORKSPACE_PATH}/{name}", 'rb') as f:
+                contents[name] = f.read()
+        except FileNotFoundError:
+            if name == 'rosters.json':
+                raise
+            contents[name] = None
+    key = stage_fingerprint(code_fingerprint(), sys.version, *(data if data is not None else '-' for data in contents.values()))
+    cache_path = f"{config.WORKSPACE_PATH}/db/lookups.bin"
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_key, inputs = marshal.loads(f.read())
+        if cached_key == key:
+            return inputs
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    
+    rosters = json_loads(contents['rosters.json'])
+    player_lookup, abbreviated_lookup = build_player_lookups(rosters)
+    inputs = {
+        'rosters': rosters,
+        'name_overrides': json_loads(contents['name_overrides.json']) if contents['name_overrides.json'] is not None else {},
+        'player_ids': json_loads(contents['player_ids.json']) if contents['player_ids.json'] is not None else {},
+        'player_lookup': player_lookup,
+        'abbreviated_lookup': abbreviated_lookup,
+    }
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with atomic_write(cache_path) as f:
+        f.write(marshal.dumps((key, inputs)))
+    return inputs
+
+# Roster entry fields a move keeps, so a dropped player can still be matched in older games
+ROSTER_MOVE_FIELDS = ('olympic_country', 'pos', 'nhl_team')
+
+def diff_rosters(old: Dict, new: Dict, effective: Optional[str] = None) -> List[Dict]:
+    """Added, removed and moved players between two versions of rosters.json
+
+    Each move is {name, from, to, effective, olympic_country, pos, nhl_team};
+    from/to is None for a player joining or leaving the Wally rosters. A roster
+    entry's own "effective" date (YYYY-MM-DD) overrides the default; with
+    neither, the move is undated (None) until RosterLedger.date_moves().
+    """
+    def assignments(rosters: Dict) -> Dict[str, tuple]:
+        return {player['name']: (team, player) for team, players in rosters.items() for player in players}
+    
+    before, after = assignments(old), assignments(new)
+    moves = []
+    for name in list(before) + [name for name in after if name not in before]:
+        old_team, old_entry = before.get(name, (None, None))
+        new_team, new_entry = after.get(name, (None, None))
+        if old_team == new_team:
+            continue
+        entry = new_entry or old_entry
+        moves.append({"name": name, "from": old_team, "to": new_team,
+                      "effective": (new_entry or {}).get('effective') or effective,
+                      **{field: entry.get(field) for field in ROSTER_MOVE_FIELDS}})
+    return moves
+
+class RosterLedger:
+    """Effective-dated Wally roster moves
+    
+    rosters.json only says who is on which team now. The ledger keeps the
+    roster as of the last run and every move detected since, each effective
+    from a date: games before it stay with the old team. It lives in
+    db/roster_moves.json; the first run only records the roster.
+    """
+
+    def __init__(self):
+        self.path = f"{config.WORKSPACE_PATH}/db/roster_moves.json"
+        self.roster: Optional[Dict] = None
+        self.moves: List[Dict] = []
+        self.unsaved = False
+        if os.path.exists(self.path):
+            try:
+                ledger = load_json_file(self.path)
+                self.roster, self.moves = ledger['roster'], ledger['moves']
+            except (ValueError, KeyError):
+                pass
+
+    def update(self, rosters: Dict, effective: Optional[str] = None) -> List[Dict]:
+        """Apply the moves since the last recorded roster (effective from the given date, if any); returns them
+
+        Nothing is written until save(), so commands that only read can see
+        today's roster without recording it.
+        """
+        if rosters == self.roster:
+            return []
+        moves = diff_rosters(self.roster, rosters, effective) if self.roster is not None else []
+        self.moves.extend(moves)
+        self.roster = rosters
+        self.unsaved = True
+        return moves
+
+    def date_moves(self, last_played: Optional[str]) -> int:
+        """Date undated moves from the day after last_played, the last game already played; returns how many
+
+        A change to rosters.json is only noticed by the next run, so games
+        played before it stay with the old team. Without any played game the
+        moves take effect today.
+        """
+        effective = ordinal_to_date(date_to_ordinal(last_played) + 1) if last_played \
+            else datetime.now().strftime('%Y-%m-%d')
+        undated = [move for move in self.moves if move['effective'] is None]
+        for move in undated:
+            move['effective'] = effective
+        return len(undated)
+
+    def save(self) -> bool:
+        """Write the ledger if update() changed it; returns whether it did"""
+        if not self.unsaved:
+            return False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        dump_json_file({"roster": self.roster, "moves": self.moves}, self.path, indent=False)
+        self.unsaved = False
+        return True
+
+    def timelines(self) -> Dict[str, List[tuple]]:
+        """Player name -> [(from_ordinal, team), ...] in date order for every player with a move"""
+        timelines = {}
+        for move in sorted(self.moves, key=lambda move: move['effective']):
+            timeline = timelines.setdefault(move['name'], [(0, move['from'])])
+            timeline.append((date_to_ordinal(move['effective']), move['to']))
+        return timelines
@@ -0,0 +1,393 @@
+"""League scoring rules, roto ranking, what-if scenarios, leaderboards and player profiles"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from operator import itemgetter
+from typing import Dict, List, Optional
+
+from records import GameStatTable, strip_diacritics
+
+# League scoring; a workspace scoring.json overrides any of the top-level keys
+DEFAULT_SCORING = {
+    # Daily recap fantasy points: weight per game-log stat
+    "fantasy_points": {
+        "skater": {"goals": 6, "assists": 4, "plus_minus": 2, "pim": -0.5},
+        "goalie": {"wins": 4, "saves": 0.25},
+    },
+    # Roto categories in display order. A category sums one stat, or divides two
+    # summed stats; "qualify" ranks it only for teams with at least "min" of a
+    # stat, and records that as "flag" in the team totals.
+    "categories": [
+        {"name": "goals", "stat": "goals"},
+        {"name": "assists", "stat": "assists"},
+        {"name": "plus_minus", "stat": "plus_minus"},
+        {"name": "pim", "stat": "pim"},
+        {"name": "goalie_wins", "stat": "wins"},
+        {"name": "save_pct", "ratio": ["saves", "shots_against"],
+         "qualify": {"stat": "shots_against", "min": 20, "flag": "sv_qualified"}},
+    ],
+    # Tied teams share the best rank; "split" averages the points of the
+    # positions they span, "best" gives each of them the top position's points
+    "ties": "split",
+}
+
+class ScoringRules:
+    """A league's scoring config, validated and compiled once
+
+    team_totals() evaluates every category for one team's summed stats, and
+    fantasy_points() applies the per-stat weights column by column over a batch
+    of game-table rows: each stat's column slice is gathered at once and
+    weighted as a whole. Config errors raise ValueError naming the bad entry.
+    """
+
+    TIE_RULES = ('split', 'best')
+
+    def __init__(self, config: Optional[Dict] = None):
+        self.config = {**DEFAULT_SCORING, **(config or {})}
+        stats = GameStatTable.STAT_COLUMNS
+
+        def check_stat(stat, where: str) -> str:
+            if stat not in stats:
+                raise ValueError(f"scoring: unknown stat '{stat}' in {where} (expected one of {', '.join(stats)})")
+            return stat
+
+        self.fantasy = {}
+        for kind in ('skater', 'goalie'):
+            weights = self.config['fantasy_points'].get(kind, {})
+            self.fantasy[kind] = tuple((check_stat(stat, f"fantasy_points.{kind}"), weight)
+                                       for stat, weight in weights.items())
+
+        self.ties = self.config['ties']
+        if self.ties not in self.TIE_RULES:
+            raise ValueError(f"scoring: unknown tie rule '{self.ties}' (expected one of {', '.join(self.TIE_RULES)})")
+
+        self.qualifiers: Dict[str, str] = {}
+        self.marginal_deltas: Dict[str, Dict[str, int]] = {}
+        evaluators = []
+        for category in self.config['categories']:
+            name = category.get('name')
+            if not name:
+                raise ValueError(f"scoring: category without a name: {category}")
+            if 'ratio' in category:
+                if len(category['ratio']) != 2:
+                    raise ValueError(f"scoring: ratio in {name} needs two stats, got {category['ratio']}")
+                num, den = (check_stat(stat, name) for stat in category['ratio'])
+                value = lambda sums, num=num, den=den: sums[num] / sums[den] if sums[den] else 0
+                self.marginal_deltas[name] = {num: 1, den: 1}
+            else:
+                stat = check_stat(category.get('stat'), name)
+                value = lambda sums, stat=stat: sums[stat]
+                self.marginal_deltas[name] = {stat: 1}
+            qualify = category.get('qualify')
+            if qualify:
+                missing = [key for key in ('stat', 'min', 'flag') if key not in qualify]
+                if missing:
+                    raise ValueError(f"scoring: qualify in {name} is missing {', '.join(missing)}")
+                self.qualifiers[name] = qualify['flag']
+                qualify = (check_stat(qualify['stat'], name), qualify['min'], qualify['flag'])
+            evaluators.append((name, value, qualify))
+        self.categories = tuple(name for name, _, _ in evaluators)
+        self._evaluators = evaluators
+
+    def team_totals(self, sums: Dict[str, int]) -> Dict:
+        """Roto category totals (and qualification flags) for a Wally team from its summed stats"""
+        totals = {}
+        for name, value, qualify in self._evaluators:
+            if qualify is None:
+                totals[name] = value(sums)
+                continue
+            stat, minimum, flag = qualify
+            qualified = sums[stat] >= minimum
+            totals[name] = value(sums) if qualified else 0
+            totals[flag] = qualified
+        return totals
+
+    def fantasy_points(self, table: 'GameStatTable', rows: List[int], goalie: List[bool]) -> List[float]:
+        """Fantasy points for each of rows (goalie[j] says which weights row j uses)"""
+        points = [0.0] * len(rows)
+        for kind, is_goalie in (('skater', False), ('goalie', True)):
+            positions = [j for j, flag in enumerate(goalie) if flag == is_goalie]
+            batch = [rows[j] for j in positions]
+            # itemgetter returns a bare value, not a tuple, for a single row
+            gather = itemgetter(*batch) if len(batch) > 1 else lambda column: [column[row] for row in batch]
+            totals = [0.0] * len(batch)
+            for stat, weight in self.fantasy[kind]:
+                totals = [total + value * weight for total, value in zip(totals, gather(table[stat]))]
+            for j, total in zip(positions, totals):
+                points[j] = total
+        return points
+
+DEFAULT_SCORING_RULES = ScoringRules()
+
+class RotoEngine:
+    """Ranks teams in each roto category and converts ranks to points
+    
+    Teams are sorted once per category and walked in tie groups: a group
+    shares the best rank and, under the default "split" tie rule, the average
+    of the points for the positions it spans. Points are n + 1 - position for
+    n teams. Categories, qualification flags and the tie rule come from the
+    ScoringRules. A category with a qualification flag (save_pct needs
+    sv_qualified) ranks only qualified teams; the rest tie for the positions
+    after them with a value of 0.
+    
+    score() works on plain value columns for callers that need to rate many
+    hypothetical standings; standings() builds the published rows.
+    """
+
+    def __init__(self, rules: Optional[ScoringRules] = None):
+        self.rules = rules or DEFAULT_SCORING_RULES
+        self.categories = self.rules.categories
+        self.qualifiers = self.rules.qualifiers
+        self.team_totals = self.rules.team_totals
+
+    def rank_category(self, values: List[float], eligible: Optional[List[bool]] = None):
+        """Ranks and roto points for one category column (higher is better)"""
+        n = len(values)
+        order = sorted(range(n) if eligible is None else [i for i in range(n) if eligible[i]],
+                       key=values.__getitem__, reverse=True)
+        ranks = [0] * n
+        points = [0] * n
+        base = n + 1
+        
+        def assign(group: List[int], start: int) -> None:
+            # Positions start+1 .. start+len(group) share their averaged points
+            if len(group) == 1 or self.rules.ties == 'best':
+                pts = base - start - 1
+            else:
+                pts = base - (2 * start + len(group) + 1) / 2
+            for i in group:
+                ranks[i] = start + 1
+                points[i] = pts
+        
+        start = 0
+        while start < len(order):
+            end = start + 1
+            value = values[order[start]]
+            while end < len(order) and values[order[end]] == value:
+                end += 1
+            assign(order[start:end], start)
+            start = end
+        if len(order) < n:
+            assign([i for i in range(n) if not eligible[i]], len(order))
+        return ranks, points
+
+    def score(self, columns: Dict[str, List[float]], qualified: Optional[Dict[str, List[bool]]] = None) -> List[float]:
+        """Total roto points per team for category value columns (teams in column order)"""
+        totals = None
+        for category in self.categories:
+            eligible = qualified.get(category) if qualified else None
+            _, points = self.rank_category(columns[category], eligible)
+            totals = points if totals is None else [t + p for t, p in zip(totals, points)]
+        return totals or []
+
+    def standings(self, team_totals: Dict[str, Dict]) -> List[Dict]:
+        """Standings rows (categories with value/rank/roto_points, total and final rank), best first"""
+        teams = list(team_totals)
+        totals = [team_totals[team] for team in teams]
+        rows = [{'team': team, 'categories': {}, 'total_roto_points': 0, 'rank': 0} for team in teams]
+        for category in self.categories:
+            flag = self.qualifiers.get(category)
+            eligible = [bool(t[flag]) for t in totals] if flag else None
+            values = [t[category] for t in totals]
+            ranks, points = self.rank_category(values, eligible)
+            for i, row in enumerate(rows):
+                entry = {'value': values[i] if eligible is None or eligible[i] else 0, 'rank': ranks[i]}
+                if flag:
+                    entry['qualified'] = eligible[i]
+                entry['roto_points'] = points[i]
+                row['categories'][category] = entry
+                row['total_roto_points'] += points[i]
+        
+        rows.sort(key=lambda row: row['total_roto_points'], reverse=True)
+        for i, row in enumerate(rows):
+            row['rank'] = i + 1
+        return rows
+
+SCENARIO_STATS = ('goals', 'assists', 'plus_minus', 'pim', 'wins', 'saves', 'shots_against')
+SCENARIO_ALIASES = {'goalie_wins': 'wins', 'sa': 'shots_against', 'pm': 'plus_minus'}
+
+class ScenarioEngine:
+    """What-if roto standings from hypothetical stat deltas
+    
+    Keeps each Wally team's summed stats and the current category columns and
+    points. A scenario re-derives totals only for the teams it touches and
+    re-ranks only the categories whose values move; every other category
+    keeps its base points.
+    """
+
+    def __init__(self, team_sums: Dict[str, Dict[str, int]], player_teams: Dict[str, str],
+                 roto: Optional[RotoEngine] = None):
+        self.roto = roto or RotoEngine()
+        self.teams = list(team_sums)
+        self.team_index = {team: i for i, team in enumerate(self.teams)}
+        self.sums = [dict(team_sums[team]) for team in self.teams]
+        self.player_teams = player_teams
+        
+        totals = [self.roto.team_totals(sums) for sums in self.sums]
+        self.columns = {c: [t[c] for t in totals] for c in self.roto.categories}
+        self.eligible = {c: [bool(t[flag]) for t in totals] for c, flag in self.roto.qualifiers.items()
+                         if c in self.columns}
+        self.base_points = {c: self.roto.rank_category(self.columns[c], self.eligible.get(c))[1]
+                            for c in self.roto.categories}
+        self.base_totals = [0] * len(self.teams)
+        for c in self.roto.categories:
+            self.base_totals = [total + p for total, p in zip(self.base_totals, self.base_points[c])]
+
+    def _team_changes(self, player_deltas: Optional[Dict[str, Dict[str, int]]],
+                      team_deltas: Optional[Dict[str, Dict[str, int]]]) -> Dict[int, Dict[str, int]]:
+        """Fold player and team deltas into summed stat deltas per team index"""
+        changes: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        targets = [(self.player_teams.get(p), d, p) for p, d in (player_deltas or {}).items()]
+        targets += [(t, d, t) for t, d in (team_deltas or {}).items()]
+        for team, deltas, label in targets:
+            if team not in self.team_index:
+                raise ValueError(f"{label} is not a Wally team or rostered player")
+            for stat, value in deltas.items():
+                stat = SCENARIO_ALIASES.get(stat, stat)
+                if stat not in SCENARIO_STATS:
+                    raise ValueError(f"unknown scenario stat '{stat}' (expected one of {', '.join(SCENARIO_STATS)})")
+                changes[self.team_index[team]][stat] += value
+        return changes
+
+    def _rerank(self, changes: Dict[int, Dict[str, int]]):
+        """New sums for the changed teams, re-ranked columns/points for moved categories, and total scores"""
+        new_sums = {}
+        new_totals = {}
+        for i, deltas in changes.items():
+            sums = dict(self.sums[i])
+            for stat, value in deltas.items():
+                sums[stat] += value
+            new_sums[i] = sums
+            new_totals[i] = self.roto.team_totals(sums)
+        
+        reranked = {}
+        scores = list(self.base_totals)
+        for c in self.roto.categories:
+            flag = self.roto.qualifiers.get(c)
+            moved = [i for i, t in new_totals.items()
+                     if t[c] != self.columns[c][i] or (flag and t[flag] != self.eligible[c][i])]
+            if not moved:
+                continue
+            values = list(self.columns[c])
+            eligible = list(self.eligible[c]) if flag else None
+            for i in moved:
+                values[i] = new_totals[i][c]
+                if flag:
+                    eligible[i] = new_totals[i][flag]
+            _, points = self.roto.rank_category(values, eligible)
+            reranked[c] = (values, eligible, points)
+            scores = [s - b + p for s, b, p in zip(scores, self.base_points[c], points)]
+        return new_sums, reranked, scores
+
+    def _scores(self, changes: Dict[int, Dict[str, int]]) -> List[float]:
+        return self._rerank(changes)[2]
+
+    def apply(self, team_deltas: Dict[str, Dict[str, int]]) -> None:
+        """Commit stat deltas per team into the base standings"""
+        new_sums, reranked, scores = self._rerank(self._team_changes(None, team_deltas))
+        for i, sums in new_sums.items():
+            self.sums[i] = sums
+        for c, (values, eligible, points) in reranked.items():
+            self.columns[c] = values
+            if eligible is not None:
+                self.eligible[c] = eligible
+            self.base_points[c] = points
+        self.base_totals = scores
+
+    def ranking(self) -> List[Dict]:
+        """Current base standings as snapshot rows (team, roto_points, rank), best first"""
+        order = sorted(range(len(self.teams)), key=lambda i: self.base_totals[i], reverse=True)
+        return [{"team": self.teams[i], "roto_points": self.base_totals[i], "rank": rank}
+                for rank, i in enumerate(order, 1)]
+
+    def score(self, player_deltas: Optional[Dict[str, Dict[str, int]]] = None,
+              team_deltas: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, float]:
+        """Total roto points per team under a scenario"""
+        scores = self._scores(self._team_changes(player_deltas, team_deltas))
+        return dict(zip(self.teams, scores))
+
+    def standings(self, player_deltas: Optional[Dict[str, Dict[str, int]]] = None,
+                  team_deltas: Optional[Dict[str, Dict[str, int]]] = None) -> List[Dict]:
+        """Full standings rows (as calculate_roto_rankings) under a scenario"""
+        changes = self._team_changes(player_deltas, team_deltas)
+        team_totals = {}
+        for i, team in enumerate(self.teams):
+            sums = dict(self.sums[i])
+            for stat, value in changes.get(i, {}).items():
+                sums[stat] += value
+            team_totals[team] = self.roto.team_totals(sums)
+        return self.roto.standings(team_totals)
+
+    def marginal_points(self) -> Dict[str, Dict[str, float]]:
+        """Roto points each team gains from +1 in each category (a save counts as +1 shot against)"""
+        table = {}
+        for i, team in enumerate(self.teams):
+            table[team] = {c: self._scores({i: self.roto.rules.marginal_deltas[c]})[i] - self.base_totals[i]
+                           for c in self.roto.categories}
+        return table
+
+def parse_scenario(specs: List[str]) -> Dict[str, Dict[str, int]]:
+    """Parse 'TARGET:stat=value,...' what-if specs into deltas per team or player name"""
+    deltas: Dict[str, Dict[str, int]] = defaultdict(dict)
+    for spec in specs:
+        target, sep, changes = spec.rpartition(':')
+        if not sep or not target.strip():
+            raise ValueError(f"what-if spec '{spec}' should look like 'Name:goals=1,assists=2'")
+        for change in changes.split(','):
+            stat, sep, value = change.partition('=')
+            try:
+                deltas[target.strip()][stat.strip()] = int(value)
+            except ValueError:
+                raise ValueError(f"what-if change '{change}' should look like stat=integer")
+    return dict(deltas)
+
+LEADERBOARD_SIZE = 10
+# Leaderboard -> (positions ranked, value for a PlayerRecord who has played; None leaves them off)
+LEADERBOARDS = {
+    'player_value': ('all', lambda p: p.zscore),
+    'goals': ('skaters', lambda p: p.stats['goals']),
+    'assists': ('skaters', lambda p: p.stats['assists']),
+    'points': ('skaters', lambda p: p.stats['goals'] + p.stats['assists']),
+    'plus_minus': ('skaters', lambda p: p.stats['plus_minus']),
+    'pim': ('skaters', lambda p: p.stats['pim']),
+    'goalie_wins': ('goalies', lambda p: p.stats.get('wins', 0)),
+    'saves': ('goalies', lambda p: p.stats.get('saves', 0)),
+    'save_pct': ('goalies', lambda p: p.stats['saves'] / p.stats['shots_against'] if p.stats.get('shots_against') else None),
+}
+
+# Stats profiled per kind of player; every one but save_pct also gets a per-game rate
+PROFILE_STATS = {
+    'skater': ('goals', 'assists', 'points', 'plus_minus', 'pim'),
+    'goalie': ('wins', 'saves', 'save_pct'),
+}
+RATE_STATS = ('save_pct',)  # Already a rate, no per-game version
+
+def profile_stat(stats: Dict, stat: str) -> Optional[float]:
+    """A profiled stat from a player's season stats; None if it isn't defined for them"""
+    if stat == 'points':
+        return stats['goals'] + stats['assists']
+    if stat == 'save_pct':
+        return stats.get('saves', 0) / stats['shots_against'] if stats.get('shots_against') else None
+    return stats.get(stat, 0)
+
+def percentile_ranks(values: List[float]) -> List[float]:
+    """Mid-rank percentile (0-100) of each value within values: one sort, then two bisects per value"""
+    ordered = sorted(values)
+    n = len(ordered)
+    return [50.0 * (bisect_left(ordered, v) + bisect_right(ordered, v)) / n for v in values]
+
+# Sortable columns of the players page -> sort key over a players view row
+PLAYERS_VIEW_COLUMNS = {
+    'rank': lambda row: row['rank'],
+    'name': lambda row: strip_diacritics(row['name']).casefold(),
+    'country': lambda row: row['country'] or '',
+    'pos': lambda row: row['pos'],
+    'gp': lambda row: row['stats']['gp'],
+    'goals': lambda row: row['stats']['goals'],
+    'assists': lambda row: row['stats']['assists'],
+    'plus_minus': lambda row: row['stats']['plus_minus'],
+    'pim': lambda row: row['stats']['pim'],
+    'wins': lambda row: row['stats'].get('wins', 0),
+    'save_pct': lambda row: (row['stats'].get('saves', 0) / row['stats']['shots_against']
+                             if row['stats'].get('shots_against') else 0),
+}
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Local stand-ins for the NHL API, for trying the fetcher without real games
+
+`faults` serves the games cache with injected failures (see "Network
+failures" in README.md); `replay` serves cached games as if they were being
+played now, for live mode (see "Live mode").
+"""
+
+import argparse
+import gzip
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+import config
+from games_db import load_cached_boxscore, raw_boxscore_path
+from jsonio import json_dumps, load_json_file
+from live import play_clock_seconds, seconds_to_toi
+
+def recorded_boxscore(game_id: int) -> Optional[bytes]:
+    """A cached game's boxscore payload for the local stand-ins (raw archive if kept)"""
+    raw_path = raw_boxscore_path(game_id)
+    if os.path.exists(raw_path):
+        with gzip.open(raw_path, 'rb') as f:
+            return f.read()
+    cached = load_cached_boxscore(game_id)
+    return json_dumps(cached) if cached else None
+
+FAULT_KINDS = ('error', 'throttle', 'slow', 'drop', 'notfound')
+
+def fault_standin(port: int = 0, fault_rate: float = 0.3, faults=FAULT_KINDS, slow_seconds: float = 15.0,
+                  seed: Optional[int] = None, boxscore: Callable[[int], Optional[bytes]] = recorded_boxscore):
+    """Build (without starting) the fault stand-in's server
+    
+    Each request fails with probability fault_rate using one of the given fault
+    kinds (500, 429 with Retry-After, a response slower than the client timeout,
+    a dropped connection or a 404); a fault_rate of 1 simulates an outage.
+    Payloads come from boxscore(game_id), the games cache by default. The
+    server's fault_rate and faults can be changed while it runs, its base_url
+    is what WALLY_BASE_URL should be set to (port 0 picks a free port), and
+    every request is appended to its log as (game_id, status, retry_after),
+    with status 'drop' for a dropped connection.
+    """
+    rng = random.Random(seed)
+    
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: bytes = b'', headers: Optional[Dict[str, str]] = None) -> None:
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def do_GET(self):
+            parts = self.path.strip('/').split('/')
+            if len(parts) != 4 or parts[:2] != ['v1', 'gamecenter'] or parts[3] != 'boxscore' or not parts[2].isdigit():
+                return self._send(404)
+            game_id = int(parts[2])
+            
+            with lock:
+                fault = rng.choice(server.faults) if server.faults and rng.random() < server.fault_rate else None
+                retry_after = rng.randint(1, 3) if fault == 'throttle' else None
+            if fault == 'error':
+                server.log.append((game_id, 500, None))
+                return self._send(500, b'{"error":"injected"}')
+            if fault == 'throttle':
+                server.log.append((game_id, 429, retry_after))
+                return self._send(429, b'{"error":"slow down"}', {'Retry-After': str(retry_after)})
+            if fault == 'slow':
+                time.sleep(slow_seconds)
+            if fault == 'drop':
+                server.log.append((game_id, 'drop', None))
+                self.close_connection = True
+                return
+            body = None if fault == 'notfound' else boxscore(game_id)
+            server.log.append((game_id, 404 if body is None else 200, None))
+            if body is None:
+                return self._send(404)
+            self._send(200, body)
+        
+        def log_message(self, format, *args):
+            if not server.quiet:
+                print(f"🧪 {self.address_string()} {format % args}")
+    
+    lock = threading.Lock()
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.fault_rate = fault_rate
+    server.faults = tuple(faults)
+    server.log = []
+    server.quiet = False
+    return server
+
+def serve_fault_standin(port: int = 8765, fault_rate: float = 0.3, faults=FAULT_KINDS,
+                        slow_seconds: float = 15.0, seed: Optional[int] = None) -> None:
+    """Serve the games cache as a local stand-in for the NHL API, injecting faults (see fault_standin)
+    
+    Point the fetcher at it with WALLY_BASE_URL=http://127.0.0.1:<port>/v1.
+    """
+    server = fault_standin(port, fault_rate, faults, slow_seconds, seed)
+    print(f"🧪 Fault stand-in serving {config.GAMES_DB_PATH} on {server.base_url} "
+          f"(fault rate {fault_rate:.0%}: {', '.join(faults) or 'none'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def synthesize_play_by_play(game_id: int, boxscore: Dict) -> Dict:
+    """Build a plausible play-by-play recording from a FINAL boxscore projection
+    
+    Goals (with assists from teammates' assist totals), penalties and shots on
+    goal are scattered over 60 minutes so that replaying every play reproduces
+    the boxscore's goals, assists, PIM, shots against and saves.
+    """
+    rng = random.Random(game_id)
+    stats = boxscore.get('playerByGameStats', {})
+    team_ids = {'homeTeam': 1, 'awayTeam': 2}
+    spots = []
+    plays = []
+    
+    def event(kind: str, details: Dict) -> None:
+        plays.append((rng.randrange(60 * 60), kind, details))
+    
+    for side, team_id in team_ids.items():
+        groups = stats.get(side, {})
+        for pos, group in (('F', 'forwards'), ('D', 'defense'), ('G', 'goalies')):
+            for player in groups.get(group, []):
+                first, _, last = player.get('name', {}).get('default', '').partition('. ')
+                spots.append({'teamId': team_id, 'playerId': player.get('playerId'), 'positionCode': pos,
+                              'firstName': {'default': first}, 'lastName': {'default': last}})
+    
+    for side, team_id in team_ids.items():
+        other = 'awayTeam' if side == 'homeTeam' else 'homeTeam'
+        skaters = stats.get(side, {}).get('forwards', []) + stats.get(side, {}).get('defense', [])
+        opposing = [[g.get('playerId'), g.get('shotsAgainst', 0) - g.get('saves', 0)]
+                    for g in stats.get(other, {}).get('goalies', [])]
+        assists_left = {p.get('playerId'): p.get('assists', 0) for p in skaters}
+        for player in skaters:
+            for _ in range(player.get('goals', 0)):
+                # Credit the teammates with the most assists still to hand out
+                candidates = [pid for pid, left in assists_left.items() if left and pid != player.get('playerId')]
+                rng.shuffle(candidates)
+                helpers = sorted(candidates, key=lambda pid: -assists_left[pid])[:2]
+                for assister in helpers:
+                    assists_left[assister] -= 1
+                goalie = next((g for g in opposing if g[1] > 0), None)
+                if goalie:
+                    goalie[1] -= 1
+                details = {'eventOwnerTeamId': team_id, 'scoringPlayerId': player.get('playerId'),
+                           'goalieInNetId': goalie[0] if goalie else None}
+                for n, assister in enumerate(helpers, 1):
+                    details[f'assist{n}PlayerId'] = assister
+                event('goal', details)
+            pim = player.get('pim', 0)
+            while pim > 0:
+                duration = 2 if pim >= 2 and pim not in (5, 10) else pim
+                event('penalty', {'eventOwnerTeamId': team_id, 'committedByPlayerId': player.get('playerId'), 'duration': duration})
+                pim -= duration
+        for goalie in stats.get(other, {}).get('goalies', []):
+            for _ in range(goalie.get('saves', 0)):
+                event('shot-on-goal', {'eventOwnerTeamId': team_id, 'goalieInNetId': goalie.get('playerId')})
+    
+    plays.sort(key=lambda play: play[0])
+    return {
+        'id': game_id,
+        'gameDate': boxscore.get('gameDate', ''),
+        'startTimeUTC': boxscore.get('startTimeUTC', ''),
+        'homeTeam': {'id': 1, 'abbrev': boxscore.get('homeTeam', {}).get('abbrev', 'HOME')},
+        'awayTeam': {'id': 2, 'abbrev': boxscore.get('awayTeam', {}).get('abbrev', 'AWAY')},
+        'rosterSpots': spots,
+        'plays': [{'eventId': i + 1, 'sortOrder': (i + 1) * 10, 'typeDescKey': kind, 'details': details,
+                   'periodDescriptor': {'number': t // 1200 + 1}, 'timeInPeriod': seconds_to_toi(t % 1200)}
+                  for i, (t, kind, details) in enumerate(plays)]
+    }
+
+def serve_replay_standin(port: int = 8766, speed: float = 60.0) -> None:
+    """Serve cached games as if they were being played now, for testing live mode
+    
+    A game's clock starts on its first request and runs at `speed` game seconds
+    per second. The play-by-play endpoint reveals the plays recorded so far:
+    db/games/pbp/{id}.json if present, else a recording synthesized from the
+    FINAL boxscore. The boxscore endpoint returns a LIVE shell until the game
+    ends, then the recorded boxscore. Point the fetcher at it with
+    WALLY_BASE_URL=http://127.0.0.1:<port>/v1 and run --live.
+    """
+    recordings: Dict[int, Dict] = {}
+    started: Dict[int, float] = {}
+    
+    def recording(game_id: int) -> Optional[Dict]:
+        if game_id not in recordings:
+            pbp_path = f"{config.GAMES_DB_PATH}/pbp/{game_id}.json"
+            if os.path.exists(pbp_path):
+                recordings[game_id] = load_json_file(pbp_path)
+            else:
+                boxscore = load_cached_boxscore(game_id)
+                if not boxscore or boxscore.get('gameState') not in ('FINAL', 'OFF'):
+                    return None
+                recordings[game_id] = synthesize_play_by_play(game_id, boxscore)
+            started[game_id] = time.time()
+        return recordings[game_id]
+    
+    def snapshot(game_id: int) -> Optional[Dict]:
+        """The recording as of now: plays so far, score, period and clock"""
+        rec = recording(game_id)
+        if rec is None:
+            return None
+        clock = (time.time() - started[game_id]) * speed
+        length = max([60 * 60] + [play_clock_seconds(play) + 1 for play in rec.get('plays', [])])
+        plays = [play for play in rec.get('plays', []) if play_clock_seconds(play) <= clock]
+        scores = defaultdict(int)
+        for play in plays:
+            if play.get('typeDescKey') == 'goal':
+                scores[play.get('details', {}).get('eventOwnerTeamId')] += 1
+        period = min(int(clock) // 1200 + 1, (length - 1) // 1200 + 1)
+        return dict(rec,
+                    gameState='OFF' if clock >= length else 'LIVE',
+                    startTimeUTC=datetime.fromtimestamp(started[game_id], timezone.utc).isoformat().replace('+00:00', 'Z'),
+                    homeTeam=dict(rec['homeTeam'], score=scores[rec['homeTeam'].get('id')]),
+                    awayTeam=dict(rec['awayTeam'], score=scores[rec['awayTeam'].get('id')]),
+                    periodDescriptor={'number': period},
+                    clock={'timeRemaining': seconds_to_toi(max(0, period * 1200 - int(clock)))},
+                    plays=plays)
+    
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: bytes = b'') -> None:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def do_GET(self):
+            parts = self.path.strip('/').split('/')
+            if len(parts) != 4 or parts[:2] != ['v1', 'gamecenter'] or not parts[2].isdigit():
+                return self._send(404)
+            game_id = int(parts[2])
+            live = snapshot(game_id)
+            if live is None:
+                return self._send(404)
+            if parts[3] == 'play-by-play':
+                return self._send(200, json_dumps(live))
+            if parts[3] == 'boxscore':
+                if live['gameState'] == 'OFF':
+                    return self._send(200, recorded_boxscore(game_id))
+                shell = {key: live[key] for key in ('gameDate', 'gameState', 'startTimeUTC', 'homeTeam', 'awayTeam',
+                                                    'periodDescriptor', 'clock')}
+                return self._send(200, json_dumps(shell))
+            self._send(404)
+        
+        def log_message(self, format, *args):
+            print(f"🧪 {self.address_string()} {format % args}")
+    
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    print(f"🧪 Replay stand-in serving {config.GAMES_DB_PATH} on http://127.0.0.1:{port}/v1 at {speed:g}x")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the games cache as a local stand-in for the NHL API")
+    standins = parser.add_subparsers(dest="standin", required=True, metavar="{faults,replay}")
+    faults = standins.add_parser("faults", help="serve the games cache with injected faults")
+    faults.add_argument("--port", type=int, default=8765, help="port to listen on (default 8765)")
+    faults.add_argument("--fault-rate", type=float, default=0.3, help="fraction of requests that fail")
+    faults.add_argument("--faults", default=",".join(FAULT_KINDS), help=f"comma-separated fault kinds ({', '.join(FAULT_KINDS)})")
+    faults.add_argument("--seed", type=int, help="seed for reproducible fault sequences")
+    replay = standins.add_parser("replay", help="replay cached games as live games, for --live")
+    replay.add_argument("--port", type=int, default=8766, help="port to listen on (default 8766)")
+    replay.add_argument("--speed", type=float, default=60.0, help="game seconds per second")
+    args = parser.parse_args()
+    
+    if args.standin == 'replay':
+        serve_replay_standin(args.port, args.speed)
+        return
+    kinds = tuple(kind for kind in args.faults.split(',') if kind)
+    unknown = set(kinds) - set(FAULT_KINDS)
+    if unknown:
+        parser.error(f"unknown fault kinds: {', '.join(sorted(unknown))}")
+    serve_fault_standin(args.port, args.fault_rate, kinds, seed=args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2079 @@
+"""StatsFetcher: fetches boxscores into the games cache and computes Wally Cup standings and analytics
+
+fetch-stats.py is its command line; the query API and the tools in this
+directory drive it directly.
+"""
+
+import heapq
+import os
+import statistics
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Any, Optional
+
+import config
+import jsonio
+from config import COUNTRY_INFO, GAME_ID_START, OLYMPIC_START_DATE
+from fetch_layer import CircuitOpenError, HTTPTransport, ResilientFetcher, TransientFetchError
+from games_db import RevalidationSchedule, archive_raw_boxscore, boxscore_hash, boxscore_stat_deltas, cache_projection, \
+    clear_negative_cache, decode_boxscore, load_cached_boxscore, read_negative_cache, store_boxscore, write_negative_cache
+from jsonio import JSONArrayStream, JSONObjectStream, RawJSON, atomic_write, dump_json_file, file_version, \
+    load_json_file, set_json_backend
+from live import LiveFeed
+from locks import GAME_LOCK_TIMEOUT, FileLock, LockHeld, run_lock
+from pipeline import PublishManifest, Stage, StageScheduler, snapshot_files, stage_fingerprint, timed
+from records import GOALIE_LOG_STATS, SKATER_LOG_STATS, GameLogRow, GameStatTable, GoalieLine, PlayerRecord, \
+    date_to_ordinal, strip_diacritics, toi_to_seconds
+from rosters import ROSTER_MOVE_FIELDS, RosterLedger, build_player_lookups, load_roster_inputs
+from scoring import LEADERBOARD_SIZE, LEADERBOARDS, PLAYERS_VIEW_COLUMNS, PROFILE_STATS, RATE_STATS, SCENARIO_STATS, \
+    RotoEngine, ScenarioEngine, ScoringRules, parse_scenario, percentile_ranks, profile_stat
+
+# Analyst export formats -> file extension
+EXPORT_FORMATS = {'parquet': 'parquet', 'arrow': 'arrow'}
+MILESTONES_LISTED = 50  # /milestones and standings.json keep only the most recent
+
+def import_pyarrow():
+    """pyarrow, imported on first use so other commands don't pay for it"""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ValueError("exporting needs pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+class StatsFetcher:
+    def __init__(self, live_feed: Optional[LiveFeed] = None, transport=None):
+        self.transport = transport or HTTPTransport()
+        self.http = ResilientFetcher(self.transport)
+        self.live_feed = live_feed
+        self.revalidation = RevalidationSchedule()
+        self.revalidate_due = set()
+        
+        # Ensure games db directory exists
+        os.makedirs(config.GAMES_DB_PATH, exist_ok=True)
+        
+        # Ensure snapshots directory exists
+        os.makedirs(config.SNAPSHOTS_PATH, exist_ok=True)
+        
+        # Load rosters, name overrides for abbreviated names, player IDs and the lookups derived from them
+        inputs = load_roster_inputs()
+        self.rosters = inputs['rosters']
+        self.name_overrides = inputs['name_overrides']
+        if self.name_overrides:
+            print(f"📝 Loaded {len(self.name_overrides)} name overrides")
+        self.player_ids = inputs['player_ids']
+        if self.player_ids:
+            print(f"📸 Loaded {len(self.player_ids)} player ID mappings")
+        # Player lookup by name -> (team, country, pos), and abbreviated names -> full name
+        self.player_lookup = inputs['player_lookup']
+        self.abbreviated_lookup = inputs['abbreviated_lookup']
+        
+        # Roster moves since the last run; unless the roster entry gives a date, fetch_games dates them
+        # after the last game already played (recorded by compute)
+        self.roster_ledger = RosterLedger()
+        self.roster_moves = self.roster_ledger.update(self.rosters)
+        self.roster_timelines: Dict[str, List[tuple]] = {}  # filled by fetch_games once moves are dated
+        # Players dropped from every roster still need matching for the games they played for a team
+        former = {move['name']: {"name": move['name'], **{field: move[field] for field in ROSTER_MOVE_FIELDS}}
+                  for move in self.roster_ledger.moves if move['name'] not in self.player_lookup}
+        if former:
+            former_lookup, former_abbreviated = build_player_lookups({None: list(former.values())})
+            self.player_lookup = {**self.player_lookup, **former_lookup}
+            self.abbreviated_lookup = {**former_abbreviated, **self.abbreviated_lookup}
+        
+        # Load the league's scoring rules (defaults unless the workspace overrides them)
+        scoring_path = f"{config.WORKSPACE_PATH}/scoring.json"
+        scoring = None
+        if os.path.exists(scoring_path):
+            scoring = load_json_file(scoring_path)
+            print(f"🧮 Loaded scoring rules overriding {', '.join(scoring)}")
+        self.roto = RotoEngine(ScoringRules(scoring))
+        
+        # Track ALL Olympic players (not just Wally Cup rosters)
+        self.all_olympic_players: Dict[str, PlayerRecord] = {}  # keyed by "name|country_abbrev"
+        self.player_keys: List[str] = []  # player_idx -> "name|country_abbrev"
+        self.player_index: Dict[str, int] = {}
+        
+        # Per-game stat rows; every aggregate below is derived from this table
+        self.game_table = GameStatTable()
+        self.team_names = list(self.rosters.keys())
+        self.team_index = {team: i for i, team in enumerate(self.team_names)}
+        self.game_dates: Dict[int, str] = {}  # FINAL game_id -> YYYY-MM-DD
+        self.game_starts: Dict[int, str] = {}  # FINAL game_id -> startTimeUTC
+        self.live_games = set()  # games in progress as of the last fetch
+        self.stage_fingerprints: Dict[str, str] = {}  # stage name -> fingerprint, as of the last compute
+        
+        # Initialize team stats
+        self.team_stats = {team: {
+            "players": [],
+            "goalie_stats": {"aggregate": GoalieLine()},
+            "totals": self.roto.team_totals(dict.fromkeys(GameStatTable.STAT_COLUMNS, 0))
+        } for team in self.rosters.keys()}
+        self.team_sums: Dict[str, Dict[str, int]] = {}  # filled by calculate_team_totals
+        
+        # Seed all roster players so they appear even if they haven't played
+        seeds = [(team_name, player, None) for team_name, players in self.rosters.items() for player in players]
+        # Players who moved off a team stay listed there, holding the stats from their time on it
+        moved_teams: Dict[str, Dict] = {}
+        for move in self.roster_ledger.moves:
+            moved_teams.setdefault(move['name'], {}).update(dict.fromkeys((move['from'], move['to'])))
+        for name, teams in moved_teams.items():
+            info = self.player_lookup[name]
+            for team_name in teams:
+                if team_name in self.team_stats and team_name != info['team'] and info['country']:
+                    seeds.append((team_name, {"name": name, "olympic_country": info['country'], "pos": info['pos']},
+                                  "former"))
+        for team_name, player, seeded_status in seeds:
+            country = player.get("olympic_country")
+            pos = player.get("pos", "F")
+            status = seeded_status or ("not_in_olympics" if not country else "active")
+            if pos == "G":
+                self.team_stats[team_name]["players"].append({
+                    "name": player["name"], "country": country, "pos": pos, "status": status,
+                    "stats": {"gp": 0, "wins": 0, "saves": 0, "shots_against": 0, "save_pct": 0}
+                })
+            else:
+                self.team_stats[team_name]["players"].append({
+                    "name": player["name"], "country": country, "pos": pos, "status": status,
+                    "stats": {"gp": 0, "goals": 0, "assists": 0, "plus_minus": 0, "pim": 0}
+                })
+
+    def fetch_game_boxscore(self, game_id: int) -> Optional[Dict]:
+        """Fetch boxscore for a game, with caching
+        
+        Transient failures and an open circuit fall back to whatever is cached
+        for the game (even if not FINAL), so a flaky upstream never drops a game
+        from the standings. Non-retryable statuses are negatively cached with a TTL.
+        """
+        # Try to load from cache first (only use cache for FINAL games)
+        cached = None
+        try:
+            cached = load_cached_boxscore(game_id)
+            # Only use cache if game is FINAL — live/future games need fresh data
+            if cached and cached.get('gameState') in ('FINAL', 'OFF'):
+                if game_id in self.revalidate_due:
+                    return self.revalidate_game(game_id, cached)
+                return cached
+            # Non-final cached data is stale, re-fetch below
+        except:
+            pass  # If cache is corrupted, fetch fresh
+        cache_version = file_version(f"{config.GAMES_DB_PATH}/{game_id}.json")
+        stale = cached or {}
+        
+        if read_negative_cache(game_id) or self.http.breaker.blocked:
+            return stale
+        
+        # One run fetches a game at a time; the others wait and take its result
+        lock = FileLock(f"{config.GAMES_DB_PATH}/locks/{game_id}.lock", remove=True)
+        if not lock.acquire():
+            print(f"⏳ Game {game_id} is being fetched by another run, waiting for it...")
+            if not lock.acquire(GAME_LOCK_TIMEOUT):
+                lock = None  # Waited long enough; fetch it ourselves
+        if lock and file_version(f"{config.GAMES_DB_PATH}/{game_id}.json") != cache_version:
+            # Another run fetched it since we read the cache
+            lock.release()
+            return load_cached_boxscore(game_id)
+        if lock and read_negative_cache(game_id):
+            lock.release()
+            return stale
+        try:
+            return self._fetch_boxscore(game_id, stale)
+        finally:
+            if lock:
+                lock.release()
+
+    def _fetch_boxscore(self, game_id: int, stale: Dict) -> Optional[Dict]:
+        """Fetch a game from the API and cache it; stale is returned on failure"""
+        url = config.BASE_URL.format(game_id)
+        try:
+            print(f"Fetching {url}...")
+            response = self.http.get(url)
+        except CircuitOpenError:
+            return stale
+        except TransientFetchError as e:
+            print(f"✗ Error fetching game {game_id}: {e}{' (using cached data)' if stale else ''}")
+            return stale
+        
+        if response.status_code == 200:
+            try:
+                # Cache the projection (and the compressed raw payload)
+                boxscore = store_boxscore(game_id, response.content)
+            except ValueError as e:
+                print(f"✗ Game {game_id} returned an unreadable payload: {e}")
+                return stale
+            clear_negative_cache(game_id)
+            if boxscore.get('gameState') in ('FINAL', 'OFF'):
+                self.revalidation.track(game_id, boxscore)
+            print(f"✓ Game {game_id} fetched successfully")
+            return boxscore
+        
+        print(f"✗ Game {game_id} returned status {response.status_code}")
+        # Remember the miss for a while to avoid refetching
+        write_negative_cache(game_id, response.status_code)
+        return stale
+
+    def revalidate_game(self, game_id: int, cached: Dict) -> Dict:
+        """Re-fetch a FINAL game to pick up stat corrections; only that game's cache entry changes"""
+        self.revalidate_due.discard(game_id)
+        if self.http.breaker.blocked:
+            return cached
+        try:
+            response = self.http.get(config.BASE_URL.format(game_id))
+        except (CircuitOpenError, TransientFetchError):
+            return cached  # Still due; retried next run
+        
+        boxscore = cached
+        if response.status_code == 200:
+            try:
+                fresh = decode_boxscore(response.content)
+            except ValueError:
+                fresh = None
+            if fresh and fresh.get('gameState') in ('FINAL', 'OFF'):
+                boxscore = fresh
+        # Only a readable FINAL payload replaces the cached game; errors and LIVE payloads leave it alone
+        if self.revalidation.checked(game_id, boxscore_hash(boxscore)) and boxscore is not cached:
+            archive_raw_boxscore(game_id, response.content)
+            cache_projection(game_id, boxscore)
+            changes = boxscore_stat_deltas(cached, boxscore)
+            print(f"📝 Stat correction in game {game_id}: " + (", ".join(
+                f"{name} " + " ".join(f"{stat} {delta:+d}" for stat, delta in stats.items())
+                for name, stats in sorted(changes.items())) or "non-stat fields changed"))
+        return boxscore
+
+    def process_game_boxscore(self, game_id: int, boxscore: Dict):
+        """Process boxscore data and append per-player rows to the game table"""
+        if boxscore and 'gameDate' in boxscore and boxscore.get('gameState') in ('FINAL', 'OFF'):
+            self.game_dates[game_id] = boxscore['gameDate'][:10]
+            self.game_starts[game_id] = boxscore.get('startTimeUTC', '')
+        
+        if not boxscore or 'playerByGameStats' not in boxscore:
+            print(f"No valid data for game {game_id}")
+            return
+        
+        # Extract game date
+        game_date = boxscore.get('gameDate', '')[:10]  # Extract YYYY-MM-DD format
+        
+        # Determine winning team
+        winning_team_abbrev = None
+        home_score = boxscore.get('homeTeam', {}).get('score', 0)
+        away_score = boxscore.get('awayTeam', {}).get('score', 0)
+        # Game is finished if it has a gameOutcome with lastPeriodType OR if scores are non-zero
+        has_outcome = 'gameOutcome' in boxscore and boxscore['gameOutcome'].get('lastPeriodType')
+        if has_outcome or (home_score + away_score > 0):
+            if home_score > away_score:
+                winning_team_abbrev = boxscore.get('homeTeam', {}).get('abbrev')
+            elif away_score > home_score:
+                winning_team_abbrev = boxscore.get('awayTeam', {}).get('abbrev')
+        
+        # Process skater stats
+        for team_type in ['homeTeam', 'awayTeam']:
+            if team_type not in boxscore['playerByGameStats']:
+                continue
+                
+            team_data = boxscore['playerByGameStats'][team_type]
+            # Get team abbreviation from the main boxscore data
+            team_abbrev = boxscore.get(team_type, {}).get('abbrev', 'UNK')
+            
+            # Process forwards and defensemen
+            for position in ['forwards', 'defense']:
+                if position in team_data:
+                    pos_label = "F" if position == "forwards" else "D"
+                    for player_data in team_data[position]:
+                        self._process_skater(player_data, team_abbrev, pos_label, game_id, game_date)
+            
+            # Process goalies
+            if 'goalies' in team_data:
+                for goalie_data in team_data['goalies']:
+                    is_winner = (team_abbrev == winning_team_abbrev)
+                    self._process_goalie(goalie_data, team_abbrev, is_winner, game_id, game_date)
+
+    def _player_idx(self, name: str, country: str, pos: str, wally_team: str = None) -> int:
+        """Return the player dimension index for name|country, creating the player on first sight"""
+        key = f"{name}|{country}"
+        idx = self.player_index.get(key)
+        if idx is not None:
+            p = self.all_olympic_players[key]
+            if wally_team and not p.wally_team:
+                p.wally_team = wally_team
+            return idx
+        
+        # Apply name override if available (e.g., "E. Luostarinen" -> "Eetu Luostarinen")
+        display_name = self.name_overrides.get(name, name)
+        
+        # Get player ID and headshot URL from mapping
+        player_id = None
+        headshot_url = None
+        
+        # Try to find player ID using different name formats
+        # Priority: original name (abbreviated) > display name (full) > ASCII normalized versions
+        player_data = None
+        search_names = [name, display_name]
+        
+        # Also try ASCII-normalized versions
+        ascii_name = strip_diacritics(name)
+        ascii_display = strip_diacritics(display_name)
+        if ascii_name != name:
+            search_names.append(ascii_name)
+        if ascii_display != display_name:
+            search_names.append(ascii_display)
+            
+        for search_name in search_names:
+            if search_name in self.player_ids:
+                player_data = self.player_ids[search_name]
+                break
+        
+        if player_data:
+            player_id = player_data.get('player_id')
+            headshot_url = player_data.get('headshot_url')
+        
+        # Use the full name for display
+        self.all_olympic_players[key] = PlayerRecord(display_name, country, pos, wally_team, player_id, headshot_url)
+        idx = len(self.player_keys)
+        self.player_keys.append(key)
+        self.player_index[key] = idx
+        return idx
+
+    def _track_all_player(self, name: str, country: str, pos: str, stats: Dict, wally_team: str = None, game_id: int = None, game_date: str = None, toi: str = None):
+        """Track a player in the all_olympic_players dimension and record their game row"""
+        player_idx = self._player_idx(name, country, pos, wally_team)
+        
+        # Only roster players with an Olympic country count toward a Wally team
+        player_info = self.player_lookup.get(name)
+        team_idx = -1
+        if wally_team and player_info and player_info['country']:
+            team_idx = self.team_index[player_info['team']]
+        
+        self.game_table.append(
+            game_id or 0, date_to_ordinal(game_date), player_idx, team_idx,
+            1 if stats.get('gp') else 0,
+            stats.get('goals', 0), stats.get('assists', 0), stats.get('plus_minus', 0), stats.get('pim', 0),
+            stats.get('wins', 0), stats.get('saves', 0), stats.get('shots_against', 0),
+            toi_to_seconds(toi)
+        )
+
+    def _resolve_name(self, abbreviated_name: str) -> str:
+        """Match an abbreviated boxscore name to a roster full name (with diacritic normalization)"""
+        if abbreviated_name in self.abbreviated_lookup:
+            return self.abbreviated_lookup[abbreviated_name]
+        ascii_name = strip_diacritics(abbreviated_name)
+        if ascii_name in self.abbreviated_lookup:
+            return self.abbreviated_lookup[ascii_name]
+        return abbreviated_name
+
+    def _process_skater(self, player_data: Dict, team_abbrev: str, pos_label: str = "F", game_id: int = None, game_date: str = None):
+        """Process individual skater stats"""
+        abbreviated_name = player_data.get('name', {}).get('default', '')
+        
+        # Extract stats for all-player tracking
+        raw_stats = {
+            'gp': 0 if player_data.get('toi') == '0:00' else 1,  # Present in boxscore = played (missing toi field is OK)
+            'goals': player_data.get('goals', 0),
+            'assists': player_data.get('assists', 0),
+            'plus_minus': player_data.get('plusMinus', 0),
+            'pim': player_data.get('pim', 0)
+        }
+        toi = player_data.get('toi')
+        
+        full_name = self._resolve_name(abbreviated_name)
+        
+        # Track ALL players regardless of Wally membership
+        nhl_to_country = {"CAN":"CAN","USA":"USA","SWE":"SWE","FIN":"FIN","CZE":"CZE","SUI":"SUI","GER":"GER","SVK":"SVK","DEN":"DEN","LAT":"LAT","ITA":"ITA","FRA":"FRA"}
+        country = nhl_to_country.get(team_abbrev, team_abbrev)
+        
+        if full_name in self.player_lookup:
+            player_info = self.player_lookup[full_name]
+            if player_info['country']:
+                self._track_all_player(full_name, player_info['country'], player_info['pos'], raw_stats, player_info['team'], game_id, game_date, toi)
+        else:
+            self._track_all_player(abbreviated_name, country, pos_label, raw_stats, None, game_id, game_date, toi)
+
+    def _process_goalie(self, goalie_data: Dict, team_abbrev: str, is_winner: bool, game_id: int = None, game_date: str = None):
+        """Process individual goalie stats"""
+        abbreviated_name = goalie_data.get('name', {}).get('default', '')
+        full_name = self._resolve_name(abbreviated_name)
+        
+        # Extract goalie stats
+        toi = goalie_data.get('toi', '0:00')
+        played = toi != '0:00'
+        shots_against = goalie_data.get('shotsAgainst', 0)
+        saves = goalie_data.get('saves', 0)
+        wins = 1 if (played and is_winner) else 0
+        
+        # Track ALL goalies
+        nhl_to_country = {"CAN":"CAN","USA":"USA","SWE":"SWE","FIN":"FIN","CZE":"CZE","SUI":"SUI","GER":"GER","SVK":"SVK","DEN":"DEN","LAT":"LAT","ITA":"ITA","FRA":"FRA"}
+        country = nhl_to_country.get(team_abbrev, team_abbrev)
+        wally_team = None
+        
+        if full_name in self.player_lookup:
+            player_info = self.player_lookup[full_name]
+            if player_info['country']:
+                country = player_info['country']
+                wally_team = player_info['team']
+        
+        goalie_all_stats = {'gp': 1 if played else 0, 'wins': wins, 'saves': saves, 'shots_against': shots_against}
+        self._track_all_player(full_name if full_name in self.player_lookup else abbreviated_name, country, "G", goalie_all_stats, wally_team, game_id, game_date, toi)
+
+    def _game_log(self, idx: int, rows: List[int]) -> List['GameLogRow']:
+        """Materialize one player's game log rows in (date, game_id) order"""
+        is_goalie = self.all_olympic_players[self.player_keys[idx]].pos == 'G'
+        game_log = [GameLogRow.from_table(self.game_table, i, is_goalie) for i in rows]
+        game_log.sort(key=lambda game: (game.date, game.game_id))
+        return game_log
+
+    def calculate_player_totals(self):
+        """Aggregate per-player tournament totals from the game table"""
+        sums = self.game_table.group_sum('player_idx')
+        for idx, key in enumerate(self.player_keys):
+            player = self.all_olympic_players[key]
+            totals = sums.get(idx)
+            if totals is None:
+                continue
+            stats = {stat: totals[stat] for stat in SKATER_LOG_STATS}
+            if player.pos == 'G':
+                stats.update({stat: totals[stat] for stat in GOALIE_LOG_STATS[1:]})
+            player.stats = stats
+
+    def calculate_team_totals(self):
+        """Calculate per-player Wally stats and team totals from the game table"""
+        table = self.game_table
+        rostered = [i for i in range(len(table)) if table['team_idx'][i] >= 0]
+        team_sums = table.group_sum('team_idx', rows=rostered)
+        
+        # Per-player sums within each Wally team, keyed by roster name
+        player_sums: Dict[int, Dict[str, Dict[str, int]]] = defaultdict(dict)
+        for team_idx, rows in table.group_rows('team_idx', rostered).items():
+            for player_idx, sums in table.group_sum('player_idx', rows=rows).items():
+                name = self.player_keys[player_idx].rsplit('|', 1)[0]
+                player_sums[team_idx][name] = sums
+        
+        for team_name, team_data in self.team_stats.items():
+            team_idx = self.team_index[team_name]
+            sums_by_name = player_sums.get(team_idx, {})
+            
+            for player in team_data['players']:
+                sums = sums_by_name.get(player['name'])
+                if sums is None:
+                    continue
+                if player['pos'] == 'G':
+                    sa = sums['shots_against']
+                    player['stats'] = {
+                        'gp': sums['gp'], 'wins': sums['wins'], 'saves': sums['saves'], 'shots_against': sa,
+                        'save_pct': (sums['saves'] / sa) if sa > 0 else 0
+                    }
+                else:
+                    player['stats'] = {stat: sums[stat] for stat in SKATER_LOG_STATS}
+            
+            sums = team_sums.get(team_idx, dict.fromkeys(GameStatTable.STAT_COLUMNS, 0))
+            self.team_sums[team_name] = sums
+            
+            # Category totals, including team save percentage and qualification
+            totals = self.roto.team_totals(sums)
+            team_data['totals'] = totals
+            team_data['goalie_stats']['aggregate'] = GoalieLine(
+                sums['wins'], sums['saves'], sums['shots_against'], totals.get('save_pct', 0),
+                totals.get('sv_qualified', False)
+            )
+
+    def compute_zscore_rankings(self):
+        """Compute z-score fantasy points for all Olympic players"""
+        print("📊 Computing z-score rankings...")
+        
+        # Separate skaters and goalies who have played
+        skaters = []
+        goalies = []
+        
+        for player in self.all_olympic_players.values():
+            if player.stats['gp'] > 0:
+                if player.pos == 'G':
+                    goalies.append(player)
+                else:
+                    skaters.append(player)
+        
+        # Compute z-scores using RAW TOTALS (more GP = higher rank, by design)
+        if len(skaters) > 1:
+            skater_stats = ['goals', 'assists', 'plus_minus', 'pim']
+            stat_means = {}
+            stat_stdevs = {}
+            for stat in skater_stats:
+                values = [p.stats[stat] for p in skaters]
+                stat_means[stat] = statistics.mean(values)
+                stat_stdevs[stat] = statistics.stdev(values) if len(values) > 1 else 0
+            
+            for player in skaters:
+                zscore = 0
+                for stat in skater_stats:
+                    if stat_stdevs[stat] > 0:
+                        z = (player.stats[stat] - stat_means[stat]) / stat_stdevs[stat]
+                        zscore += z
+                player.zscore = round(zscore, 2)
+        
+        # Compute z-scores for goalies
+        if len(goalies) > 1:
+            for goalie in goalies:
+                sa = goalie.stats.get('shots_against', 0)
+                saves = goalie.stats.get('saves', 0)
+                goalie.stats['save_pct'] = (saves / sa) if sa > 0 else 0
+            
+            # Goalie z-score: z(wins) + z(SV%) — simple quality-based ranking
+            # Only include goalies with SA > 0 in SV% z-score computation (exclude bench warmers)
+            active_goalies = [g for g in goalies if g.stats.get('shots_against', 0) > 0]
+            bench_goalies = [g for g in goalies if g.stats.get('shots_against', 0) == 0]
+            
+            if len(active_goalies) > 1:
+                # Compute means/stdevs from active goalies only
+                wins_vals = [g.stats['wins'] for g in active_goalies]
+                svpct_vals = [g.stats['save_pct'] for g in active_goalies]
+                w_mean, w_std = statistics.mean(wins_vals), statistics.stdev(wins_vals)
+                sv_mean, sv_std = statistics.mean(svpct_vals), statistics.stdev(svpct_vals)
+                
+                for player in active_goalies:
+                    z_wins = (player.stats['wins'] - w_mean) / w_std if w_std > 0 else 0
+                    z_svpct = (player.stats['save_pct'] - sv_mean) / sv_std if sv_std > 0 else 0
+                    zscore = z_wins + z_svpct
+                    # Scale by 2x to normalize against skaters (4 components vs 2)
+                    player.zscore = round(zscore * 2, 2)
+            
+            # Bench goalies (SA=0) get z-score based on wins only
+            if bench_goalies and len(active_goalies) > 1:
+                for player in bench_goalies:
+                    z_wins = (player.stats['wins'] - w_mean) / w_std if w_std > 0 else 0
+                    # Penalize slightly for no SV% data — put them at mean SV% (z=0)
+                    player.zscore = round(z_wins * 2, 2)
+        
+        # Set z-score to 0 for players without enough data
+        for player in self.all_olympic_players.values():
+            if player.zscore is None:
+                player.zscore = 0
+        
+        # Calculate rankings
+        players_with_scores = [(player, player.zscore) for player in self.all_olympic_players.values()]
+        players_with_scores.sort(key=lambda x: x[1], reverse=True)
+        
+        # Assign ranks (handle ties)
+        current_rank = 1
+        for i, (player, score) in enumerate(players_with_scores):
+            if i > 0 and score < players_with_scores[i-1][1]:
+                current_rank = i + 1
+            player.zscore_rank = current_rank
+
+    def _recent_window(self):
+        """Return (cutoff, most_recent) date ordinals of the 72-hour window ending on the latest FINAL game"""
+        if not self.game_dates:
+            return None
+        most_recent_date = max(self.game_dates.values())
+        most_recent_dt = datetime.strptime(most_recent_date, '%Y-%m-%d')
+        cutoff_dt = most_recent_dt - timedelta(hours=72)
+        return cutoff_dt.toordinal(), most_recent_dt.toordinal()
+
+    def _window_stats(self, cutoff: int, most_recent: int) -> Dict[int, Dict[str, int]]:
+        """Per-player stat sums over logged games dated within [cutoff, most_recent]"""
+        dates = self.game_table['date']
+        rows = [i for i in self.game_table.logged_rows() if cutoff <= dates[i] <= most_recent]
+        return self.game_table.group_sum('player_idx', rows=rows)
+
+    def compute_hot_players(self):
+        """Compute hot players over the last 72 hours"""
+        print("🔥 Computing hot players...")
+        
+        window = self._recent_window()
+        if not window:
+            print("No recent games found for hot players calculation")
+            for player in self.all_olympic_players.values():
+                player.hot_zscore = 0
+                player.is_hot = False
+            return []
+        
+        # Sum stats over the hot window
+        window_sums = self._window_stats(*window)
+        hot_players = []
+        
+        for idx, key in enumerate(self.player_keys):
+            player = self.all_olympic_players[key]
+            hot_stats = window_sums.get(idx)
+            if hot_stats is None:
+                player.hot_zscore = 0
+                player.is_hot = False
+                continue
+            
+            # Calculate save percentage for goalies
+            if player.pos == 'G' and hot_stats['shots_against'] > 0:
+                hot_stats['save_pct'] = hot_stats['saves'] / hot_stats['shots_against']
+            else:
+                hot_stats['save_pct'] = 0
+            
+            player.hot_72h_stats = hot_stats
+            hot_players.append(player)
+        
+        # Separate hot skaters and goalies who played in the window
+        hot_skaters = [p for p in hot_players if p.pos != 'G' and p.hot_72h_stats['gp'] > 0]
+        hot_goalies = [p for p in hot_players if p.pos == 'G' and p.hot_72h_stats['gp'] > 0]
+        
+        # Compute z-scores for hot skaters
+        if len(hot_skaters) > 1:
+            skater_stats = ['goals', 'assists', 'plus_minus', 'pim']
+            stat_means = {}
+            stat_stdevs = {}
+            
+            for stat in skater_stats:
+                values = [p.hot_72h_stats[stat] for p in hot_skaters]
+                stat_means[stat] = statistics.mean(values)
+                stat_stdevs[stat] = statistics.stdev(values) if len(values) > 1 else 0
+            
+            for player in hot_skaters:
+                zscore = 0
+                for stat in skater_stats:
+                    if stat_stdevs[stat] > 0:
+                        z = (player.hot_72h_stats[stat] - stat_means[stat]) / stat_stdevs[stat]
+                        zscore += z
+                player.hot_zscore = zscore
+        
+        # Compute z-scores for hot goalies: z(wins) + z(SV%) — matches overall goalie formula
+        # Only include goalies with SA > 0 in SV% computation
+        active_hot_goalies = [g for g in hot_goalies if g.hot_72h_stats.get('shots_against', 0) > 0]
+        if len(active_hot_goalies) > 1:
+            wins_vals = [g.hot_72h_stats['wins'] for g in active_hot_goalies]
+            svpct_vals = [g.hot_72h_stats['save_pct'] for g in active_hot_goalies]
+            w_mean, w_std = statistics.mean(wins_vals), statistics.stdev(wins_vals)
+            sv_mean, sv_std = statistics.mean(svpct_vals), statistics.stdev(svpct_vals)
+            
+            for player in active_hot_goalies:
+                z_wins = (player.hot_72h_stats['wins'] - w_mean) / w_std if w_std > 0 else 0
+                z_svpct = (player.hot_72h_stats['save_pct'] - sv_mean) / sv_std if sv_std > 0 else 0
+                player.hot_zscore = (z_wins + z_svpct) * 2  # Scale by 2x to match skater 4-component
+        
+        # Bench goalies in hot window get wins-only z-score
+        bench_hot_goalies = [g for g in hot_goalies if g.hot_72h_stats.get('shots_against', 0) == 0]
+        if bench_hot_goalies and len(active_hot_goalies) > 1:
+            for player in bench_hot_goalies:
+                z_wins = (player.hot_72h_stats['wins'] - w_mean) / w_std if w_std > 0 else 0
+                player.hot_zscore = z_wins * 2
+        
+        # Set hot_zscore to 0 for players not computed above
+        for player in self.all_olympic_players.values():
+            if player.hot_zscore is None:
+                player.hot_zscore = 0
+        
+        # Get top 10 hot players
+        all_hot = [p for p in hot_players if p.hot_zscore != 0]
+        all_hot.sort(key=lambda x: x.hot_zscore, reverse=True)
+        top_10_hot = all_hot[:10]
+        
+        # Mark top 10 as hot
+        for player in self.all_olympic_players.values():
+            player.is_hot = player in top_10_hot
+        
+        # Create hot players summary for JSON output
+        hot_players_summary = []
+        for player in top_10_hot:
+            hot_stats = player.hot_72h_stats
+            summary = {
+                'name': player.name,
+                'country': player.country,
+                'wally_team': player.wally_team,
+                'pos': player.pos,
+                'hot_zscore': player.hot_zscore,
+                'hot_72h_stats': hot_stats
+            }
+            hot_players_summary.append(summary)
+        
+        return hot_players_summary
+
+    def compute_cold_players(self):
+        """Compute cold players over the last 72 hours (bottom 50)"""
+        print("❄️ Computing cold players...")
+        
+        window = self._recent_window()
+        if not window:
+            print("No recent games found for cold players calculation")
+            for player in self.all_olympic_players.values():
+                player.cold_zscore = 0
+                player.is_cold = False
+            return []
+        
+        # Sum stats over the cold window (same as hot window)
+        window_sums = self._window_stats(*window)
+        cold_players = []
+        
+        for idx, key in enumerate(self.player_keys):
+            player = self.all_olympic_players[key]
+            cold_stats = window_sums.get(idx)
+            if cold_stats is None:
+                player.cold_zscore = 0
+                player.is_cold = False
+                continue
+            
+            # Calculate save percentage for goalies
+            if player.pos == 'G' and cold_stats['shots_against'] > 0:
+                cold_stats['save_pct'] = cold_stats['saves'] / cold_stats['shots_against']
+            else:
+                cold_stats['save_pct'] = 0
+            
+            player.cold_72h_stats = cold_stats
+            cold_players.append(player)
+        
+        # Separate cold skaters and goalies who played in the window
+        cold_skaters = [p for p in cold_players if p.pos != 'G' and p.cold_72h_stats['gp'] > 0]
+        cold_goalies = [p for p in cold_players if p.pos == 'G' and p.cold_72h_stats['gp'] > 0]
+        
+        # Compute z-scores for cold skaters (reuse the same logic as hot players)
+        if len(cold_skaters) > 1:
+            skater_stats = ['goals', 'assists', 'plus_minus', 'pim']
+            stat_means = {}
+            stat_stdevs = {}
+            
+            for stat in skater_stats:
+                values = [p.cold_72h_stats[stat] for p in cold_skaters]
+                stat_means[stat] = statistics.mean(values)
+                stat_stdevs[stat] = statistics.stdev(values) if len(values) > 1 else 0
+            
+            for player in cold_skaters:
+                zscore = 0
+                for stat in skater_stats:
+                    if stat_stdevs[stat] > 0:
+                        z = (player.cold_72h_stats[stat] - stat_means[stat]) / stat_stdevs[stat]
+                        zscore += z
+                player.cold_zscore = zscore
+        
+        # Compute z-scores for cold goalies: z(wins) + z(SV%) — matches overall goalie formula
+        active_cold_goalies = [g for g in cold_goalies if g.cold_72h_stats.get('shots_against', 0) > 0]
+        if len(active_cold_goalies) > 1:
+            wins_vals = [g.cold_72h_stats['wins'] for g in active_cold_goalies]
+            svpct_vals = [g.cold_72h_stats['save_pct'] for g in active_cold_goalies]
+            w_mean, w_std = statistics.mean(wins_vals), statistics.stdev(wins_vals)
+            sv_mean, sv_std = statistics.mean(svpct_vals), statistics.stdev(svpct_vals)
+            
+            for player in active_cold_goalies:
+                z_wins = (player.cold_72h_stats['wins'] - w_mean) / w_std if w_std > 0 else 0
+                z_svpct = (player.cold_72h_stats['save_pct'] - sv_mean) / sv_std if sv_std > 0 else 0
+                player.cold_zscore = (z_wins + z_svpct) * 2
+        
+        bench_cold_goalies = [g for g in cold_goalies if g.cold_72h_stats.get('shots_against', 0) == 0]
+        if bench_cold_goalies and len(active_cold_goalies) > 1:
+            for player in bench_cold_goalies:
+                z_wins = (player.cold_72h_stats['wins'] - w_mean) / w_std if w_std > 0 else 0
+                player.cold_zscore = z_wins * 2
+        
+        # Set cold_zscore to 0 for players not computed above
+        for player in self.all_olympic_players.values():
+            if player.cold_zscore is None:
+                player.cold_zscore = 0
+        
+        # Get bottom 50 cold players (lowest z-scores)
+        all_cold = [p for p in cold_players if p.cold_zscore != 0]
+        all_cold.sort(key=lambda x: x.cold_zscore, reverse=False)  # ascending order for lowest scores
+        bottom_50_cold = all_cold[:50]  # bottom 50
+        bottom_10_cold = all_cold[:10]   # bottom 10 for the cold_players array
+        
+        # Mark bottom 50 as cold
+        for player in self.all_olympic_players.values():
+            player.is_cold = player in bottom_50_cold
+        
+        # Create cold players summary for JSON output (bottom 10)
+        cold_players_summary = []
+        for player in bottom_10_cold:
+            cold_stats = player.cold_72h_stats
+            summary = {
+                'name': player.name,
+                'country': player.country,
+                'wally_team': player.wally_team,
+                'pos': player.pos,
+                'cold_zscore': player.cold_zscore,
+                'cold_72h_stats': cold_stats
+            }
+            cold_players_summary.append(summary)
+        
+        return cold_players_summary
+
+    def compute_milestones(self) -> List[Dict]:
+        """Compute milestones from game logs and current stats"""
+        print("🏆 Computing milestones...")
+        
+        milestones = []
+        
+        # Get all players and track first goals across entire tournament
+        all_first_goals = set()
+        
+        # Track leaders for "new leader" detection
+        current_leaders = {
+            'goals': {'player': None, 'value': 0},
+            'assists': {'player': None, 'value': 0}, 
+            'points': {'player': None, 'value': 0}
+        }
+        
+        # Find current leaders
+        for key, player in self.all_olympic_players.items():
+            stats = player.stats
+            if not stats:
+                continue
+                
+            goals = stats.get('goals', 0)
+            assists = stats.get('assists', 0)
+            points = goals + assists
+            
+            if goals > current_leaders['goals']['value']:
+                current_leaders['goals'] = {'player': player, 'key': key, 'value': goals}
+            if assists > current_leaders['assists']['value']:
+                current_leaders['assists'] = {'player': player, 'key': key, 'value': assists}
+            if points > current_leaders['points']['value']:
+                current_leaders['points'] = {'player': player, 'key': key, 'value': points}
+        
+        # Each player's logged rows; game logs are materialized one player at a time
+        player_rows = self.game_table.group_rows('player_idx', self.game_table.logged_rows())
+        
+        # Process each player's game log for milestones
+        for idx, key in enumerate(self.player_keys):
+            player = self.all_olympic_players[key]
+            player_name = player.name
+            country = player.country
+            pos = player.pos
+            wally_team = player.wally_team
+            
+            # Track cumulative stats to detect milestones
+            cumulative_goals = 0
+            cumulative_assists = 0
+            cumulative_points = 0
+            has_first_goal = False
+            
+            for game in self._game_log(idx, player_rows.get(idx, [])):
+                game_id = game.game_id
+                date = game.date
+                
+                if game.gp == 0:
+                    continue
+                
+                # Update cumulative stats BEFORE this game
+                prev_goals = cumulative_goals
+                prev_assists = cumulative_assists
+                prev_points = cumulative_points
+                
+                # Update cumulative stats WITH this game
+                game_goals = game.goals
+                game_assists = game.assists
+                game_points = game_goals + game_assists
+                
+                cumulative_goals += game_goals
+                cumulative_assists += game_assists
+                cumulative_points += game_points
+                
+                # 1. First goal of tournament for player
+                if game_goals > 0 and not has_first_goal and pos != 'G':
+                    has_first_goal = True
+                    all_first_goals.add(player_name)
+                    milestones.append({
+                        "type": "first_goal",
+                        "player": player_name,
+                        "country": country,
+                        "wally_team": wally_team,
+                        "game_id": game_id,
+                        "date": date,
+                        "description": f"{player_name} scores their first goal of the Olympics"
+                    })
+                
+                # 2. Hat trick (3+ goals in single game)
+                if game_goals >= 3 and pos != 'G':
+                    milestones.append({
+                        "type": "hat_trick",
+                        "player": player_name,
+                        "country": country,
+                        "wally_team": wally_team,
+                        "game_id": game_id,
+                        "date": date,
+                        "description": f"{player_name} records a hat trick with {game_goals} goals"
+                    })
+                
+                # 3. Shutout (goalie with 0 goals against, full game played)
+                if pos == 'G':
+                    shots_against = game.shots_against
+                    saves = game.saves
+                    
+                    # Shutout: saves == shots_against AND shots_against > 0 (actually faced shots)
+                    if shots_against > 0 and saves == shots_against:
+                        milestones.append({
+                            "type": "shutout",
+                            "player": player_name,
+                            "country": country,
+                            "wally_team": wally_team,
+                            "game_id": game_id,
+                            "date": date,
+                            "description": f"{player_name} records a shutout with {saves} saves"
+                        })
+                
+                # 4. 5+ point game
+                if game_points >= 5 and pos != 'G':
+                    milestones.append({
+                        "type": "big_game",
+                        "player": player_name,
+                        "country": country,
+                        "wally_team": wally_team,
+                        "game_id": game_id,
+                        "date": date,
+                        "description": f"{player_name} records {game_points} points ({game_goals}G, {game_assists}A)"
+                    })
+                
+                # 5. Player reaches 5 goals or 10 points milestone
+                if prev_goals < 5 and cumulative_goals >= 5 and pos != 'G':
+                    milestones.append({
+                        "type": "milestone_goals",
+                        "player": player_name,
+                        "country": country,
+                        "wally_team": wally_team,
+                        "game_id": game_id,
+                        "date": date,
+                        "description": f"{player_name} reaches 5 goals ({cumulative_goals} total)"
+                    })
+                
+                if prev_points < 10 and cumulative_points >= 10 and pos != 'G':
+                    milestones.append({
+                        "type": "milestone_points",
+                        "player": player_name,
+                        "country": country,
+                        "wally_team": wally_team,
+                        "game_id": game_id,
+                        "date": date,
+                        "description": f"{player_name} reaches 10 points ({cumulative_points} total)"
+                    })
+        
+        # 6. New leader detection - check if current leaders achieved their position in this latest data
+        for stat_type, leader_info in current_leaders.items():
+            if leader_info['player'] and leader_info['value'] > 0:
+                player = leader_info['player']
+                value = leader_info['value']
+                
+                # Find the game where they first reached this value
+                cumulative = 0
+                idx = self.player_index[leader_info['key']]
+                for game in self._game_log(idx, player_rows.get(idx, [])):
+                    if game.gp == 0:
+                        continue
+                    
+                    if stat_type == 'goals':
+                        cumulative += game.goals
+                    elif stat_type == 'assists':
+                        cumulative += game.assists
+                    elif stat_type == 'points':
+                        cumulative += game.goals + game.assists
+                    
+                    # If this game pushed them to current total, they became leader
+                    if cumulative == value and cumulative > 0:
+                        stat_label = stat_type.capitalize()
+                        milestones.append({
+                            "type": "new_leader",
+                            "player": player.name,
+                            "country": player.country,
+                            "wally_team": player.wally_team,
+                            "game_id": game.game_id,
+                            "date": game.date,
+                            "description": f"{player.name} takes the {stat_label.lower()} lead with {value} {stat_label.lower()}"
+                        })
+                        break
+        
+        # Sort milestones by date (most recent first) and keep the most recent MILESTONES_LISTED
+        milestones.sort(key=lambda x: (x['date'], x['game_id']), reverse=True)
+        
+        return milestones[:MILESTONES_LISTED]
+
+    def compute_leaderboards(self, size: int = LEADERBOARD_SIZE) -> Dict[str, List[Dict]]:
+        """Top players per LEADERBOARDS category, with competition ranks ('1224') for ties"""
+        played = [p for p in self.all_olympic_players.values() if p.stats['gp'] > 0]
+        pools = {'all': played,
+                 'skaters': [p for p in played if p.pos != 'G'],
+                 'goalies': [p for p in played if p.pos == 'G']}
+        leaderboards = {}
+        for name, (positions, value) in LEADERBOARDS.items():
+            scored = ((value(p), p) for p in pools[positions])
+            top = heapq.nlargest(size, ((v, p) for v, p in scored if v is not None), key=lambda item: item[0])
+            board = []
+            for i, (v, p) in enumerate(top):
+                rank = board[-1]['rank'] if board and board[-1]['value'] == v else i + 1
+                board.append({"rank": rank, "name": p.name, "country": p.country, "pos": p.pos,
+                              "wally_team": p.wally_team, "player_id": p.player_id, "value": v})
+            leaderboards[name] = board
+        return leaderboards
+
+    def compute_profiles(self) -> Dict:
+        """Percentile profiles for every Olympian and Wally team
+
+        Per player, aligned with PROFILE_STATS for their kind: season values'
+        percentiles among all skaters (or goalies) who played and among their
+        own position, per-game rates and the rates' percentiles. Per team, the
+        percentile of each roto category among the teams (save % only among
+        qualified teams). Each population is sorted once per stat, so the cost
+        is O(n log n) per stat however many views read the profiles.
+        """
+        profiles = {}
+        for p in self.all_olympic_players.values():
+            width = len(PROFILE_STATS['goalie' if p.pos == 'G' else 'skater'])
+            profiles[id(p)] = {"name": p.name, "country": p.country, "pos": p.pos, "wally_team": p.wally_team,
+                               "player_id": p.player_id, **{field: [None] * width for field in
+                                                            ('season', 'position', 'per_game', 'per_game_pct')}}
+
+        def rank_into(field: str, index: int, population, value) -> None:
+            scored = [(p, value(p)) for p in population]
+            scored = [(p, v) for p, v in scored if v is not None]
+            if scored:
+                for (p, _), pct in zip(scored, percentile_ranks([v for _, v in scored])):
+                    profiles[id(p)][field][index] = round(pct)
+
+        played = [p for p in self.all_olympic_players.values() if p.stats['gp'] > 0]
+        for kind, stats in PROFILE_STATS.items():
+            group = [p for p in played if (p.pos == 'G') == (kind == 'goalie')]
+            by_position = defaultdict(list)
+            for p in group:
+                by_position[p.pos].append(p)
+            for i, stat in enumerate(stats):
+                season = lambda p, stat=stat: profile_stat(p.stats, stat)
+                rank_into('season', i, group, season)
+                for position_group in by_position.values():
+                    rank_into('position', i, position_group, season)
+                if stat in RATE_STATS:
+                    continue
+                rate = lambda p, stat=stat: profile_stat(p.stats, stat) / p.stats['gp']
+                for p in group:
+                    profiles[id(p)]['per_game'][i] = round(rate(p), 3)
+                rank_into('per_game_pct', i, group, rate)
+
+        categories = self.roto.categories
+        teams = {team: [None] * len(categories) for team in self.team_stats}
+        for i, category in enumerate(categories):
+            qualifier = self.roto.qualifiers.get(category)
+            eligible = [(team, data['totals'][category]) for team, data in self.team_stats.items()
+                        if not qualifier or data['totals'][qualifier]]
+            for (team, _), pct in zip(eligible, percentile_ranks([v for _, v in eligible])):
+                teams[team][i] = round(pct)
+
+        return {
+            "stats": {kind: list(stats) for kind, stats in PROFILE_STATS.items()},
+            "categories": list(categories),
+            "players": [profiles[id(self.all_olympic_players[key])] for key in self.player_keys],
+            "teams": [{"team": team, "percentiles": pcts} for team, pcts in teams.items()],
+        }
+
+    def build_view_models(self, standings: List[Dict]) -> Dict[str, Dict]:
+        """Per-page view models holding only the fields each page renders
+
+        players: one row per Olympian in player-value order (the page's default
+        sort), plus, for every sortable column, the row indexes in ascending
+        and descending order, so changing the sort is a lookup.
+        radar: each team's rank, points and category ranks.
+        """
+        players = sorted(self.all_olympic_players.values(), key=lambda p: p.zscore or 0, reverse=True)
+        rows = [{"name": p.name, "country": p.country, "pos": p.pos, "wally_team": p.wally_team,
+                 "player_id": p.player_id, "rank": p.zscore_rank if p.zscore_rank is not None else 999,
+                 "is_hot": p.is_hot, "is_cold": p.is_cold, "stats": p.stats} for p in players]
+        order = {}
+        for column, key in PLAYERS_VIEW_COLUMNS.items():
+            # Stable sorts both ways, so ties keep player-value order like the page's own sort
+            order[column] = {"asc": sorted(range(len(rows)), key=lambda i: key(rows[i])),
+                             "desc": sorted(range(len(rows)), key=lambda i: key(rows[i]), reverse=True)}
+        return {
+            "players": {"players": rows, "order": order,
+                        "on_wally_teams": sum(1 for row in rows if row['wally_team'])},
+            "radar": {"teams": [{"team": row['team'], "rank": row['rank'], "total_roto_points": row['total_roto_points'],
+                                 "ranks": {c: cat['rank'] for c, cat in row['categories'].items()}}
+                                for row in standings]},
+        }
+
+    def calculate_roto_rankings(self) -> List[Dict]:
+        """Calculate roto rankings and return standings"""
+        return self.roto.standings({team: data['totals'] for team, data in self.team_stats.items()})
+
+    def scenario_engine(self) -> ScenarioEngine:
+        """What-if engine over the current team totals (call after calculate_team_totals)"""
+        player_teams = {}
+        for key, player in self.all_olympic_players.items():
+            if player.wally_team:
+                player_teams[key] = player.wally_team
+                player_teams[player.name] = player.wally_team
+        for team_name, players in self.rosters.items():
+            for player in players:
+                player_teams.setdefault(player['name'], team_name)
+        return ScenarioEngine(self.team_sums, player_teams, self.roto)
+
+    def fetch_olympic_schedule(self) -> Dict:
+        """Fetch/generate Olympic hockey schedule"""
+        # For now, return a basic schedule structure
+        # In a real implementation, this would fetch from NHL API
+        games = []
+        for game_id in range(GAME_ID_START, config.GAME_ID_END + 1):
+            # Try to get game info from cached boxscore
+            cache_file = f"{config.GAMES_DB_PATH}/{game_id}.json"
+            if os.path.exists(cache_file):
+                try:
+                    # Games in progress come from live mode's projection, which never goes into the cache
+                    live = self.live_feed.boxscores.get(game_id) if self.live_feed else None
+                    boxscore = live or load_cached_boxscore(game_id)
+                    
+                    if boxscore and 'gameDate' in boxscore:
+                        game_date = boxscore['gameDate'][:10]  # Extract YYYY-MM-DD
+                        home_team = boxscore.get('homeTeam', {}).get('abbrev', 'HOME')
+                        away_team = boxscore.get('awayTeam', {}).get('abbrev', 'AWAY')
+                        home_score = boxscore.get('homeTeam', {}).get('score', 0)
+                        away_score = boxscore.get('awayTeam', {}).get('score', 0)
+                        
+                        # Determine status
+                        game_state = boxscore.get('gameState', '')
+                        if game_state in ('FINAL', 'OFF'):
+                            status = "FINAL"
+                        elif game_state in ('LIVE', 'CRIT'):
+                            status = "LIVE"
+                        else:
+                            status = "FUT"
+                        
+                        # Live game details
+                        period = boxscore.get('periodDescriptor', {}).get('number', 0)
+                        clock = boxscore.get('clock', {}).get('timeRemaining', '')
+                        start_time = boxscore.get('startTimeUTC', '')
+                        
+                        games.append({
+                            "id": game_id,
+                            "date": game_date,
+                            "time": start_time,
+                            "away": away_team,
+                            "home": home_team,
+                            "status": status,
+                            "away_score": away_score,
+                            "home_score": home_score,
+                            "period": period if status == "LIVE" else None,
+                            "clock": clock if status == "LIVE" else None
+                        })
+                except:
+                    continue
+        
+        return {"games": games}
+
+    def create_country_status(self, schedule: Dict) -> Dict:
+        """Create country status information with next game from schedule"""
+        # Find each country's next upcoming game
+        next_games: Dict[str, Dict] = {}
+        games = schedule.get("games", [])
+        for g in games:
+            if g["status"] != "FUT":
+                continue
+            for side in ["away", "home"]:
+                code = g[side]
+                if code == "TBD" or code in next_games:
+                    continue
+                opp = g["home"] if side == "away" else g["away"]
+                next_games[code] = {
+                    "vs": opp,
+                    "date": g["date"],
+                    "time": g.get("time", "TBD"),
+                }
+
+        country_status = {}
+        for country_code, info in COUNTRY_INFO.items():
+            country_status[country_code] = {
+                "status": "active",
+                "name": info["name"],
+                "flag": info["flag"],
+                "next_game": next_games.get(country_code),
+            }
+        return country_status
+
+    def save_daily_snapshot(self, standings: List[Dict]) -> None:
+        """Save daily snapshot if it doesn't exist or if roto points changed"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        snapshot_file = f"{config.SNAPSHOTS_PATH}/{today}.json"
+        
+        # Create snapshot data
+        snapshot_data = {
+            "date": today,
+            "standings": []
+        }
+        
+        for team in standings:
+            snapshot_data["standings"].append({
+                "team": team["team"],
+                "roto_points": team["total_roto_points"],
+                "rank": team["rank"]
+            })
+        
+        # Check if we should save the snapshot
+        should_save = False
+        
+        if not os.path.exists(snapshot_file):
+            # File doesn't exist, save it
+            should_save = True
+            print(f"📸 Saving new snapshot for {today}")
+        else:
+            # File exists, check if roto points changed
+            try:
+                existing_snapshot = load_json_file(snapshot_file)
+                
+                # Compare roto points for each team
+                existing_teams = {t["team"]: t["roto_points"] for t in existing_snapshot["standings"]}
+                current_teams = {t["team"]: t["roto_points"] for t in snapshot_data["standings"]}
+                
+                if existing_teams != current_teams:
+                    should_save = True
+                    print(f"📸 Updating snapshot for {today} - roto points changed")
+                else:
+                    print(f"📸 Snapshot for {today} unchanged, skipping")
+            except:
+                # Error reading existing file, overwrite it
+                should_save = True
+                print(f"📸 Overwriting corrupted snapshot for {today}")
+        
+        if should_save:
+            dump_json_file(snapshot_data, snapshot_file)
+
+    def load_standings_history(self) -> List[Dict]:
+        """Load all snapshot files and return array of daily snapshots"""
+        history = []
+        
+        # Find all snapshot files
+        if os.path.exists(config.SNAPSHOTS_PATH):
+            for filename in sorted(os.listdir(config.SNAPSHOTS_PATH)):
+                if filename.endswith('.json'):
+                    try:
+                        filepath = os.path.join(config.SNAPSHOTS_PATH, filename)
+                        history.append(load_json_file(filepath))
+                    except Exception as e:
+                        print(f"⚠️ Error loading snapshot {filename}: {e}")
+                        continue
+        
+        return history
+
+    def replay_standings(self) -> List[Dict]:
+        """Rebuild standings after every FINAL game, in start-time order
+        
+        Each game's rostered stat sums are applied to running team totals and
+        only the categories they move are re-ranked. Returns one entry per game
+        (game_id, date, start_time, standings) stamped with the game's own date.
+        """
+        table = self.game_table
+        rostered = [i for i in range(len(table)) if table['team_idx'][i] >= 0 and table['game_id'][i] in self.game_dates]
+        rows_by_game = table.group_rows('game_id', rostered)
+        
+        engine = ScenarioEngine({team: dict.fromkeys(GameStatTable.STAT_COLUMNS, 0) for team in self.team_stats}, {}, self.roto)
+        replay = []
+        for game_id in sorted(self.game_dates, key=lambda g: (self.game_starts.get(g, ''), g)):
+            rows = rows_by_game.get(game_id)
+            if rows:
+                deltas = table.group_sum('team_idx', columns=SCENARIO_STATS, rows=rows)
+                engine.apply({self.team_names[team_idx]: sums for team_idx, sums in deltas.items()})
+            replay.append({
+                "game_id": game_id,
+                "date": self.game_dates[game_id],
+                "start_time": self.game_starts.get(game_id, ''),
+                "standings": engine.ranking()
+            })
+        return replay
+
+    def build_standings_history(self, replay: Optional[List[Dict]] = None) -> List[Dict]:
+        """Daily standings: end-of-day replayed standings for every game day, plus snapshots for other days"""
+        replay = self.replay_standings() if replay is None else replay
+        history = {h["date"]: h for h in self.load_standings_history()}
+        for entry in replay:
+            history[entry["date"]] = {"date": entry["date"], "standings": entry["standings"]}
+        return [history[date] for date in sorted(history)]
+
+    def rebuild_snapshots(self) -> int:
+        """Rewrite daily snapshot files from the replay, filling days a cron run missed"""
+        days = {}
+        for entry in self.replay_standings():
+            days[entry["date"]] = entry["standings"]
+        os.makedirs(config.SNAPSHOTS_PATH, exist_ok=True)
+        for date, standings in days.items():
+            dump_json_file({"date": date, "standings": standings}, f"{config.SNAPSHOTS_PATH}/{date}.json")
+        return len(days)
+
+    def compute_daily_recap(self, schedule: Dict) -> Dict[str, Dict]:
+        """Compute daily recap for each game day with games, top performers, and standings changes"""
+        return dict(self.iter_daily_recaps(schedule, self.build_standings_history()))
+
+    def iter_daily_recaps(self, schedule: Dict, standings_history: List[Dict]):
+        """Yield (date, recap) pairs one game day at a time"""
+        print("📰 Computing daily recaps...")
+        
+        # Group games by date
+        games_by_date = defaultdict(list)
+        for game in schedule.get("games", []):
+            if game["status"] == "FINAL":
+                games_by_date[game["date"]].append(game)
+        
+        # Logged game rows grouped by date ordinal
+        table = self.game_table
+        rows_by_date = table.group_rows('date', table.logged_rows())
+        
+        # Index standings history for comparison
+        history_by_date = {h["date"]: h for h in standings_history}
+        
+        # Process each date with games
+        for date, games in games_by_date.items():
+            if not games:
+                continue
+            
+            recap_data = {
+                "games": [],
+                "top_performers": [],
+                "standings_changes": [],
+                "milestones": [],
+                "recap_text": ""
+            }
+            
+            # Process games for this date
+            for game in games:
+                home_country = COUNTRY_INFO.get(game["home"], {})
+                away_country = COUNTRY_INFO.get(game["away"], {})
+                
+                recap_data["games"].append({
+                    "id": game["id"],
+                    "away": {
+                        "code": game["away"],
+                        "name": away_country.get("name", game["away"]),
+                        "flag": away_country.get("flag", ""),
+                        "score": game["away_score"]
+                    },
+                    "home": {
+                        "code": game["home"],
+                        "name": home_country.get("name", game["home"]),
+                        "flag": home_country.get("flag", ""),
+                        "score": game["home_score"]
+                    },
+                    "final_score": f"{game['away_score']}-{game['home_score']}"
+                })
+            
+            # Find top performers from game logs for this date
+            daily_performances = []
+            
+            player_idx = table['player_idx']
+            rows = sorted(rows_by_date.get(date_to_ordinal(date), []), key=lambda i: (player_idx[i], i))
+            players = [self.all_olympic_players[self.player_keys[player_idx[row]]] for row in rows]
+            # Fantasy points for the day, per the league's scoring weights
+            points = self.roto.rules.fantasy_points(table, rows, [player.pos == 'G' for player in players])
+            for row, player, fantasy_pts in zip(rows, players, points):
+                game = GameLogRow.from_table(table, row, player.pos == 'G')
+                if fantasy_pts > 0 or game.gp > 0:  # Include anyone who played
+                    daily_performances.append({
+                        "name": player.name,
+                        "country": player.country,
+                        "wally_team": player.wally_team,
+                        "pos": player.pos,
+                        "fantasy_points": fantasy_pts,
+                        "stats": game.stats_dict()
+                    })
+            
+            # Sort by fantasy points and take top 10
+            daily_performances.sort(key=lambda x: x['fantasy_points'], reverse=True)
+            recap_data["top_performers"] = daily_performances[:10]
+            
+            # Compute standings changes if we have previous day data
+            previous_date = None
+            current_snapshot = history_by_date.get(date)
+            
+            # Find the most recent previous snapshot
+            sorted_dates = sorted(history_by_date.keys())
+            try:
+                current_index = sorted_dates.index(date)
+                if current_index > 0:
+                    previous_date = sorted_dates[current_index - 1]
+            except ValueError:
+                pass  # Current date not in history yet
+            
+            if previous_date and current_snapshot:
+                previous_snapshot = history_by_date[previous_date]
+                
+                # Create lookup dictionaries
+                prev_standings = {team["team"]: {"roto_points": team["roto_points"], "rank": team["rank"]} 
+                                for team in previous_snapshot["standings"]}
+                curr_standings = {team["team"]: {"roto_points": team["roto_points"], "rank": team["rank"]} 
+                                for team in current_snapshot["standings"]}
+                
+                # Find biggest risers and fallers
+                changes = []
+                for team in curr_standings:
+                    if team in prev_standings:
+                        rank_change = prev_standings[team]["rank"] - curr_standings[team]["rank"]
+                        roto_change = curr_standings[team]["roto_points"] - prev_standings[team]["roto_points"]
+                        
+                        changes.append({
+                            "team": team,
+                            "rank_change": rank_change,
+                            "roto_change": round(roto_change, 2),
+                            "previous_rank": prev_standings[team]["rank"],
+                            "current_rank": curr_standings[team]["rank"],
+                            "previous_roto": round(prev_standings[team]["roto_points"], 2),
+                            "current_roto": round(curr_standings[team]["roto_points"], 2)
+                        })
+                
+                # Sort by rank improvement (positive rank_change = moved up)
+                changes.sort(key=lambda x: x["rank_change"], reverse=True)
+                
+                # Take top 3 risers and bottom 3 fallers
+                risers = [c for c in changes if c["rank_change"] > 0][:3]
+                fallers = [c for c in changes if c["rank_change"] < 0][-3:]
+                
+                recap_data["standings_changes"] = {
+                    "risers": risers,
+                    "fallers": fallers
+                }
+            
+            # Generate recap text
+            game_count = len(games)
+            games_text = f"{game_count} game{'s' if game_count != 1 else ''}"
+            
+            # Highlight the biggest game
+            if games:
+                biggest_game = max(games, key=lambda g: g["away_score"] + g["home_score"])
+                away_name = COUNTRY_INFO.get(biggest_game["away"], {}).get("name", biggest_game["away"])
+                home_name = COUNTRY_INFO.get(biggest_game["home"], {}).get("name", biggest_game["home"])
+                
+                biggest_game_text = f"{away_name} {biggest_game['away_score']}-{biggest_game['home_score']} {home_name}"
+            
+            # Top performer text
+            top_performer_text = ""
+            if recap_data["top_performers"]:
+                top = recap_data["top_performers"][0]
+                country_name = COUNTRY_INFO.get(top["country"], {}).get("name", top["country"])
+                
+                if top["pos"] == "G":
+                    perf_detail = f"{top['stats'].get('wins', 0)} win{'s' if top['stats'].get('wins', 0) != 1 else ''}, {top['stats'].get('saves', 0)} saves"
+                else:
+                    goals = top['stats'].get('goals', 0)
+                    assists = top['stats'].get('assists', 0)
+                    if goals > 0 and assists > 0:
+                        perf_detail = f"{goals}G {assists}A"
+                    elif goals > 0:
+                        perf_detail = f"{goals} goal{'s' if goals != 1 else ''}"
+                    elif assists > 0:
+                        perf_detail = f"{assists} assist{'s' if assists != 1 else ''}"
+                    else:
+                        perf_detail = f"{top['fantasy_points']:.1f} fantasy points"
+                
+                top_performer_text = f"{top['name']} ({country_name}) led the day with {perf_detail}."
+            
+            # Standings change text
+            standings_text = ""
+            if recap_data["standings_changes"]:
+                risers = recap_data["standings_changes"]["risers"]
+                fallers = recap_data["standings_changes"]["fallers"]
+                
+                if risers:
+                    top_riser = risers[0]
+                    move_text = f"moved up {top_riser['rank_change']} spot{'s' if top_riser['rank_change'] != 1 else ''}"
+                    standings_text = f"In Wally Cup standings, {top_riser['team']} {move_text}."
+                
+                if fallers:
+                    top_faller = fallers[0]
+                    drop_text = f"dropped {abs(top_faller['rank_change'])} spot{'s' if abs(top_faller['rank_change']) != 1 else ''}"
+                    if standings_text:
+                        standings_text += f" {top_faller['team']} {drop_text}."
+                    else:
+                        standings_text = f"In Wally Cup standings, {top_faller['team']} {drop_text}."
+            
+            # Combine into recap text
+            recap_parts = [
+                f"Day {(datetime.strptime(date, '%Y-%m-%d') - datetime.strptime(OLYMPIC_START_DATE, '%Y-%m-%d')).days + 1} featured {games_text}."
+            ]
+            
+            if games:
+                recap_parts.append(f"The highest-scoring affair was {biggest_game_text}.")
+            
+            if top_performer_text:
+                recap_parts.append(top_performer_text)
+            
+            if standings_text:
+                recap_parts.append(standings_text)
+            
+            recap_data["recap_text"] = " ".join(recap_parts)
+            
+            yield date, recap_data
+
+    def iter_players_with_game_logs(self):
+        """Yield serialized Olympic players one at a time, with game logs materialized from the game table"""
+        table = self.game_table
+        player_rows = table.group_rows('player_idx', table.logged_rows())
+        for idx, key in enumerate(self.player_keys):
+            player = self.all_olympic_players[key]
+            is_goalie = player.pos == 'G'
+            game_log = [GameLogRow.from_table(table, i, is_goalie).to_dict() for i in player_rows.get(idx, [])]
+            yield player.to_dict(game_log)
+
+    def iter_teams(self):
+        """Yield (team_name, team) pairs in the standings.json teams shape"""
+        for team_name, team_data in self.team_stats.items():
+            # Add non-Olympic players to maintain full roster
+            all_players = []
+            
+            # Add Olympic players with stats
+            for player in team_data['players']:
+                all_players.append(player)
+            
+            # Add non-Olympic players from original rosters
+            for roster_player in self.rosters[team_name]:
+                if roster_player['olympic_country'] is None:
+                    # Check if already added
+                    if not any(p['name'] == roster_player['name'] for p in all_players):
+                        all_players.append({
+                            'name': roster_player['name'],
+                            'country': None,
+                            'pos': roster_player['pos'],
+                            'stats': None,
+                            'status': 'not_in_olympics'
+                        })
+            
+            yield team_name, {
+                'players': all_players,
+                'goalie_stats': {'aggregate': team_data['goalie_stats']['aggregate'].to_dict()},
+                'totals': team_data['totals']
+            }
+
+    def generate_standings_json(self, stream: bool = False) -> Dict:
+        """Generate the complete standings JSON structure
+        
+        With stream=True the teams, daily recaps and players sections are
+        returned as lazy JSONObjectStream/JSONArrayStream wrappers for
+        write_json_streaming instead of being built up front.
+        """
+        standings = self.calculate_roto_rankings()
+        
+        # Generate schedule; recaps compare against the replayed history
+        schedule = self.fetch_olympic_schedule()
+        standings_by_game = self.replay_standings()
+        standings_history = self.build_standings_history(standings_by_game)
+        
+        teams = JSONObjectStream(self.iter_teams())
+        daily_recaps = JSONObjectStream(self.iter_daily_recaps(schedule, standings_history))
+        players = JSONArrayStream(self.iter_players_with_game_logs())
+        if not stream:
+            teams, daily_recaps, players = dict(teams), dict(daily_recaps), list(players)
+        
+        return self.standings_document(
+            schedule, standings, standings_history, standings_by_game, daily_recaps, teams, players,
+            marginal_points=getattr(self, 'marginal_points', {}),
+            hot_players=getattr(self, 'hot_players_summary', []),
+            cold_players=getattr(self, 'cold_players_summary', []),
+            milestones=getattr(self, 'milestones_summary', []))
+
+    def standings_document(self, schedule: Dict, standings: List[Dict], standings_history: List[Dict],
+                           standings_by_game: List[Dict], daily_recaps, teams, players,
+                           marginal_points: Dict, hot_players: List[Dict], cold_players: List[Dict],
+                           milestones: List[Dict]) -> Dict:
+        """Assemble standings.json in its published key order"""
+        return {
+            "updated_at": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            "tournament_status": "group_stage",
+            "schedule": schedule,
+            "country_status": self.create_country_status(schedule),
+            "standings": standings,
+            "marginal_points": marginal_points,
+            "standings_history": standings_history,
+            "standings_by_game": standings_by_game,
+            "daily_recaps": daily_recaps,
+            "teams": teams,
+            "country_names": {code: info["name"] for code, info in COUNTRY_INFO.items()},
+            "flag_map": {code: info["flag"] for code, info in COUNTRY_INFO.items()},
+            "all_olympic_players": players,
+            "hot_players": hot_players,
+            "cold_players": cold_players,
+            "milestones": milestones
+        }
+
+    def fetch_live_game(self, game_id: int) -> Optional[Dict]:
+        """Live-mode fetch: play-by-play for started, non-final games
+        
+        Returns None when the regular boxscore path should handle the game
+        (never seen before, or already FINAL in the cache). Once the feed reports
+        the game over, the FINAL boxscore is fetched and reconciled against the
+        live tallies.
+        """
+        try:
+            cached = load_cached_boxscore(game_id)
+        except ValueError:
+            return None
+        if not cached or cached.get('gameState') in ('FINAL', 'OFF'):
+            return None
+        start = cached.get('startTimeUTC')
+        if start and datetime.fromisoformat(start.replace('Z', '+00:00')) > datetime.now(timezone.utc):
+            return cached  # Not started yet
+        
+        live = self.live_feed.poll(game_id, self.http)
+        if live is None:
+            return cached
+        if live.get('gameState') in ('FINAL', 'OFF'):
+            boxscore = self.fetch_game_boxscore(game_id)
+            if boxscore.get('gameState') in ('FINAL', 'OFF'):
+                self.live_feed.reconcile(game_id, boxscore)
+                return boxscore
+            live['gameState'] = 'CRIT'  # Over per the feed, but not FINAL until the boxscore says so
+        return live
+
+    def _parse_cached_games(self, game_ids: List[int], workers: int):
+        """Parse cached FINAL games across a process pool, yielding (game_id, batch or None) in game-id order"""
+        with ProcessPoolExecutor(workers, initializer=_init_parse_worker,
+                                 initargs=(config.GAMES_DB_PATH, jsonio.JSON_BACKEND, self.player_lookup, self.abbreviated_lookup)) as pool:
+            chunksize = max(1, len(game_ids) // (workers * 8))
+            yield from zip(game_ids, pool.map(_parse_cached_game, game_ids, chunksize=chunksize))
+
+    def fetch_boxscores(self, rate_limit: float = 0.1) -> int:
+        """Bring the games cache up to date without parsing anything; returns the number of requests made
+        
+        Covers the same games as fetch_games: uncached and unfinished games,
+        and FINAL games due for revalidation.
+        """
+        self.revalidate_due = set(self.revalidation.due())
+        requests_start = self.http.requests
+        for game_id in range(GAME_ID_START, config.GAME_ID_END + 1):
+            requests_before = self.http.requests
+            self.fetch_game_boxscore(game_id)
+            if rate_limit and self.http.requests != requests_before:
+                time.sleep(rate_limit)  # Rate limiting (cache hits made no request)
+        self.revalidation.save()
+        return self.http.requests - requests_start
+
+    def fetch_games(self, rate_limit: float = 0.1, workers: int = 1, offline: bool = False):
+        """Fetch and process every game boxscore in the ID range
+        
+        With workers > 1, cached FINAL games are decoded and parsed into row
+        batches by a process pool and merged here in game-id order, so player
+        indexes and every aggregate match a serial run. Games needing the
+        network (not cached, not FINAL, due for revalidation) and live mode
+        stay on the main process. offline=True processes whatever is cached,
+        finished or not, and makes no requests.
+        """
+        self.revalidate_due = set() if offline else set(self.revalidation.due())
+        game_ids = [g for g in range(GAME_ID_START, config.GAME_ID_END + 1) if g not in self.revalidate_due]
+        batches = iter(self._parse_cached_games(game_ids, workers) if workers > 1 and not self.live_feed else ())
+        pending = next(batches, None)
+        
+        for game_id in range(GAME_ID_START, config.GAME_ID_END + 1):
+            if pending and pending[0] == game_id:
+                batch = pending[1]
+                pending = next(batches, None)
+                if batch is not None:
+                    _, game_date, start_time, rows = batch
+                    if game_date is not None:
+                        self.game_dates[game_id] = game_date
+                        self.game_starts[game_id] = start_time
+                    for row in rows:
+                        self._track_all_player(*row)
+                    continue
+            
+            requests_before = self.http.requests
+            if offline:
+                try:
+                    boxscore = load_cached_boxscore(game_id)
+                except ValueError:
+                    boxscore = None
+            else:
+                boxscore = self.fetch_live_game(game_id) if self.live_feed else None
+                if boxscore is None:
+                    boxscore = self.fetch_game_boxscore(game_id)
+            if boxscore and boxscore.get('gameState') in ('LIVE', 'CRIT'):
+                self.live_games.add(game_id)
+            if boxscore:
+                self.process_game_boxscore(game_id, boxscore)
+            if rate_limit and self.http.requests != requests_before:
+                time.sleep(rate_limit)  # Rate limiting (cache hits made no request)
+        self.roster_ledger.date_moves(max(self.game_dates.values(), default=None))
+        self.roster_timelines = self.roster_ledger.timelines()
+        self.apply_roster_moves()
+        if not offline:
+            self.revalidation.save()
+
+    def apply_roster_moves(self) -> int:
+        """Re-attribute moved players' game rows to the team they were on at each game's date
+        
+        Rows are parsed against the current roster; only rows of players in the
+        roster ledger are revisited, so a move shifts just those players' stats
+        between teams. Returns the number of rows whose team changed.
+        """
+        moved = {}
+        for name, timeline in self.roster_timelines.items():
+            info = self.player_lookup[name]
+            idx = self.player_index.get(f"{name}|{info['country']}")
+            if idx is not None:
+                moved[idx] = ([start for start, _ in timeline], [self.team_index.get(team, -1) for _, team in timeline])
+        if not moved:
+            return 0
+        
+        table = self.game_table
+        player_idx, date, team_idx = table['player_idx'], table['date'], table['team_idx']
+        changed = 0
+        for i in range(len(table)):
+            spans = moved.get(player_idx[i])
+            if spans is None:
+                continue
+            starts, teams = spans
+            team = teams[bisect_right(starts, date[i]) - 1]
+            if team_idx[i] != team:
+                team_idx[i] = team
+                changed += 1
+        return changed
+
+    def what_if(self, specs: List[str], rate_limit: float = 0.1):
+        """Print standings under hypothetical stat deltas ('Name:stat=value,...') without publishing"""
+        deltas = parse_scenario(specs)
+        self.fetch_games(rate_limit)
+        self.calculate_player_totals()
+        self.calculate_team_totals()
+        
+        engine = self.scenario_engine()
+        team_deltas = {target: d for target, d in deltas.items() if target in engine.team_index}
+        player_deltas = {target: d for target, d in deltas.items() if target not in engine.team_index}
+        current = {row['team']: row for row in self.calculate_roto_rankings()}
+        
+        print("\n🔮 What-if standings:")
+        for row in engine.standings(player_deltas, team_deltas):
+            before = current[row['team']]
+            change = row['total_roto_points'] - before['total_roto_points']
+            print(f"{row['rank']:>2}. {row['team']}: {row['total_roto_points']:.1f} roto points "
+                  f"({change:+.1f}, was #{before['rank']})")
+
+    # PlayerRecord fields set by the z-score, hot and cold stages (restored from their memos)
+    ZSCORE_FIELDS = ('zscore', 'zscore_rank')
+    HOT_FIELDS = ('hot_zscore', 'is_hot', 'hot_72h_stats')
+    COLD_FIELDS = ('cold_zscore', 'is_cold', 'cold_72h_stats')
+
+    def _player_fields(self, fields) -> Dict[str, List]:
+        return {key: [getattr(player, field) for field in fields] for key, player in self.all_olympic_players.items()}
+
+    def _restore_player_fields(self, fields, values: Dict[str, List]) -> None:
+        for key, row in values.items():
+            player = self.all_olympic_players[key]
+            for field, value in zip(fields, row):
+                setattr(player, field, value)
+
+    def games_fingerprint(self) -> str:
+        """Fingerprint of everything post-fetch stages read: game table, player dimension, game dates, rosters"""
+        players = [(p.name, p.country, p.pos, p.wally_team, p.player_id, p.headshot_url)
+                   for p in self.all_olympic_players.values()]
+        return stage_fingerprint(*self.game_table.columns.values(), self.player_keys, players,
+                                 sorted(self.game_dates.items()), sorted(self.game_starts.items()),
+                                 sorted(self.live_games), self.rosters, self.roster_ledger.moves)
+
+    def cache_fingerprint(self) -> str:
+        """Cheap fingerprint of what the schedule is read from: cache files (name, size, mtime) and live projections"""
+        entries = []
+        for game_id in range(GAME_ID_START, config.GAME_ID_END + 1):
+            try:
+                st = os.stat(f"{config.GAMES_DB_PATH}/{game_id}.json")
+            except OSError:
+                continue
+            entries.append((game_id, st.st_size, st.st_mtime_ns))
+        return stage_fingerprint(entries, sorted(self.live_feed.boxscores.items()) if self.live_feed else [])
+
+    def pipeline_stages(self, read_only: bool = False) -> List[Stage]:
+        """The post-fetch pipeline as a stage DAG (see StageScheduler); read_only stages don't save a snapshot"""
+        def totals(_):
+            print("📊 Calculating team totals...")
+            self.calculate_player_totals()
+            self.calculate_team_totals()
+        
+        def marginal(_):
+            # Points each team would gain from one more of each category
+            self.marginal_points = self.scenario_engine().marginal_points()
+            return self.marginal_points
+        
+        def zscores(_):
+            self.compute_zscore_rankings()
+            # Ranking also fills in goalies' season save % on their stats
+            save_pcts = {key: p.stats['save_pct'] for key, p in self.all_olympic_players.items() if 'save_pct' in p.stats}
+            return {"players": self._player_fields(self.ZSCORE_FIELDS), "save_pct": save_pcts}
+        
+        def restore_zscores(output):
+            self._restore_player_fields(self.ZSCORE_FIELDS, output["players"])
+            for key, save_pct in output["save_pct"].items():
+                self.all_olympic_players[key].stats['save_pct'] = save_pct
+        
+        def hot(_):
+            self.hot_players_summary = self.compute_hot_players()
+            return {"summary": self.hot_players_summary, "players": self._player_fields(self.HOT_FIELDS)}
+        
+        def restore_hot(output):
+            self.hot_players_summary = output["summary"]
+            self._restore_player_fields(self.HOT_FIELDS, output["players"])
+        
+        def cold(_):
+            self.cold_players_summary = self.compute_cold_players()
+            return {"summary": self.cold_players_summary, "players": self._player_fields(self.COLD_FIELDS)}
+        
+        def restore_cold(output):
+            self.cold_players_summary = output["summary"]
+            self._restore_player_fields(self.COLD_FIELDS, output["players"])
+        
+        def milestones(_):
+            self.milestones_summary = self.compute_milestones()
+            return self.milestones_summary
+        
+        def snapshot(inputs):
+            if not read_only:
+                self.save_daily_snapshot(inputs['standings'])
+            # The history reads every snapshot file, including ones written outside the pipeline
+            return snapshot_files()
+        
+        def recaps(inputs):
+            return RawJSON.encode(JSONObjectStream(self.iter_daily_recaps(inputs['schedule'], inputs['history'])))
+        
+        def players(_):
+            return RawJSON.encode(JSONArrayStream(self.iter_players_with_game_logs()))
+        
+        def publish(inputs):
+            # Only reads its inputs, so it can run from memoized outputs alone
+            standings_data = self.standings_document(
+                inputs['schedule'], inputs['standings'], inputs['history'], inputs['replay'],
+                inputs['recaps'], inputs['teams'], inputs['players'],
+                marginal_points=inputs['marginal'], hot_players=inputs['hot']['summary'],
+                cold_players=inputs['cold']['summary'], milestones=inputs['milestones'])
+            # Files whose content is unchanged are left as they are, so a quiet run doesn't redeploy the site
+            manifest = self.publish_manifest = PublishManifest()
+            manifest.write(config.STANDINGS_PATH, standings_data)
+            # Leaderboards and page view models go next to it, compact
+            data_dir = os.path.dirname(config.STANDINGS_PATH)
+            files = {f"{data_dir}/leaderboards.json": inputs['leaderboards'],
+                     f"{data_dir}/profiles.json": inputs['profiles']}
+            files.update((f"{data_dir}/views/{page}.json", model) for page, model in inputs['views'].items())
+            os.makedirs(f"{data_dir}/views", exist_ok=True)
+            for path, obj in files.items():
+                manifest.write(path, obj, indent=False)
+            manifest.save()
+            return standings_data
+        
+        return [
+            Stage('totals', totals, ['games']),
+            Stage('standings', lambda _: self.calculate_roto_rankings(), ['totals', 'scoring'], memo=True),
+            Stage('marginal', marginal, ['totals', 'scoring'], memo=True,
+                  restore=lambda output: setattr(self, 'marginal_points', output)),
+            Stage('zscores', zscores, ['totals'], memo=True, restore=restore_zscores),
+            Stage('hot', hot, ['totals'], memo=True, restore=restore_hot),
+            Stage('cold', cold, ['totals'], memo=True, restore=restore_cold),
+            Stage('milestones', milestones, ['totals'], memo=True,
+                  restore=lambda output: setattr(self, 'milestones_summary', output)),
+            Stage('schedule', lambda _: self.fetch_olympic_schedule(), ['cache'], memo=True),
+            Stage('replay', lambda _: self.replay_standings(), ['games', 'scoring'], memo=True),
+            # Save daily snapshot before the history (and the main file) is built
+            Stage('snapshot', snapshot, ['standings'], content_fingerprint=True),
+            Stage('history', lambda inputs: self.build_standings_history(inputs['replay']), ['replay', 'snapshot'],
+                  memo=True, content_fingerprint=True),
+            Stage('teams', lambda _: RawJSON.encode(JSONObjectStream(self.iter_teams())), ['totals', 'scoring'],
+                  memo=True, raw=True),
+            Stage('recaps', recaps, ['games', 'scoring', 'schedule', 'history'], memo=True, raw=True),
+            Stage('players', players, ['totals', 'zscores', 'hot', 'cold'], memo=True, raw=True),
+            Stage('leaderboards', lambda _: self.compute_leaderboards(), ['totals', 'zscores'], memo=True),
+            Stage('views', lambda inputs: self.build_view_models(inputs['standings']),
+                  ['standings', 'zscores', 'hot', 'cold'], memo=True),
+            Stage('profiles', lambda _: self.compute_profiles(), ['totals', 'scoring'], memo=True),
+            # Analyst tables; only built by the export command
+            Stage('export', lambda inputs: self.export_tables(inputs['standings'], inputs['replay'], inputs['history']),
+                  ['totals', 'standings', 'replay', 'history']),
+            Stage('publish', publish, ['schedule', 'standings', 'marginal', 'hot', 'cold', 'milestones',
+                                       'replay', 'history', 'recaps', 'teams', 'players', 'leaderboards', 'views',
+                                       'profiles']),
+        ]
+
+    def stage_seeds(self) -> Dict[str, tuple]:
+        """Fingerprinted pipeline inputs for StageScheduler.run"""
+        return {'games': (None, self.games_fingerprint()), 'cache': (None, self.cache_fingerprint()),
+                'scoring': (None, stage_fingerprint(self.roto.rules.config))}
+
+    def stage_scheduler(self, read_only: bool = False) -> StageScheduler:
+        """The pipeline's scheduler; read_only=True writes no snapshot, memo or manifest (for export)"""
+        return StageScheduler(self.pipeline_stages(read_only), f"{config.WORKSPACE_PATH}/db/stages", read_only=read_only)
+
+    def compute(self) -> Dict[str, Any]:
+        """Run every stage up to publishing on the fetched games; stages whose inputs are unchanged reuse their last output"""
+        # Moves are recorded here, not on startup, so publish, export and --what-if leave the ledger alone
+        if self.roster_ledger.save():
+            for move in self.roster_moves:
+                print(f"🔁 Roster move: {move['name']} {move['from'] or '(unrostered)'} → "
+                      f"{move['to'] or '(dropped)'} from {move['effective']}")
+        scheduler = self.stage_scheduler()
+        results = scheduler.run(self.stage_seeds(), targets=scheduler.stages['publish'].inputs)
+        self.stage_fingerprints = scheduler.fingerprints
+        reused = sorted(name for name, (status, _) in scheduler.timings.items() if status == 'memo')
+        if reused:
+            print(f"♻️ Unchanged inputs, reused: {', '.join(reused)}")
+        return results
+
+    def publish(self, results: Optional[Dict[str, Any]] = None) -> Dict:
+        """Write standings.json from computed stage outputs (default: those stored by the last compute)"""
+        scheduler = self.stage_scheduler()
+        stage = scheduler.stages['publish']
+        inputs = scheduler.load_memoized(stage.inputs) if results is None else {name: results[name] for name in stage.inputs}
+        standings_data = stage.fn(inputs)
+        manifest = self.publish_manifest
+        if os.path.relpath(config.STANDINGS_PATH, config.WORKSPACE_PATH) in manifest.written:
+            print(f"✅ Standings saved to {config.STANDINGS_PATH}")
+        else:
+            print(f"⏸️ Standings unchanged since the last publish, {config.STANDINGS_PATH} not rewritten")
+        if manifest.unchanged:
+            print(f"⏸️ {len(manifest.unchanged)} of {len(manifest.unchanged) + len(manifest.written)} "
+                  f"published files unchanged, not rewritten")
+        return standings_data
+
+    def export_tables(self, standings: List[Dict], replay: List[Dict], history: List[Dict]) -> Dict[str, Any]:
+        """Game-level and season-level stats as typed Arrow tables (needs pyarrow)
+
+        game_stats has one row per player per game, keyed to players by
+        player_idx; team and category columns are dictionary-encoded so they
+        load as pandas categoricals. Numeric columns are viewed straight out of
+        the game table's arrays rather than converted value by value.
+        """
+        pa = import_pyarrow()
+        import pyarrow.compute as pc
+        table = self.game_table
+        epoch = date_to_ordinal('1970-01-01')
+        int_types = {4: pa.int32(), 8: pa.int64()}
+
+        def ints(name: str, type_=None):
+            column = table[name]
+            values = pa.Array.from_buffers(int_types[column.itemsize], len(column), [None, pa.py_buffer(column)])
+            return values.cast(type_ or pa.int32())
+
+        def categories(values: List[Optional[str]]):
+            return pa.array(values, pa.string()).dictionary_encode()
+
+        def days(ordinals):
+            return pc.if_else(pc.equal(ordinals, 0), None, pc.subtract(ordinals, epoch)).cast(pa.int32()).cast(pa.date32())
+
+        team_idx = ints('team_idx')
+        game_stats = pa.table({
+            'game_id': ints('game_id', pa.int64()),
+            'date': days(ints('date')),
+            'player_idx': ints('player_idx'),
+            'wally_team': pa.DictionaryArray.from_arrays(pc.if_else(pc.less(team_idx, 0), None, team_idx),
+                                                         pa.array(self.team_names, pa.string())),
+            **{stat: ints(stat) for stat in GameStatTable.STAT_COLUMNS},
+            'toi': ints('toi', pa.int64()).cast(pa.duration('s')),
+        })
+
+        players = [self.all_olympic_players[key] for key in self.player_keys]
+        player_table = pa.table({
+            'player_idx': pa.array(range(len(players)), pa.int32()),
+            'name': pa.array([p.name for p in players], pa.string()),
+            'country': categories([p.country for p in players]),
+            'pos': categories([p.pos for p in players]),
+            'wally_team': categories([p.wally_team for p in players]),
+            'player_id': pa.array([p.player_id for p in players], pa.int64()),
+        })
+
+        teams = {'team': pa.array([row['team'] for row in standings], pa.string()),
+                 'rank': pa.array([row['rank'] for row in standings], pa.int32()),
+                 'total_roto_points': pa.array([float(row['total_roto_points']) for row in standings], pa.float64())}
+        for category in self.roto.categories:
+            entries = [row['categories'][category] for row in standings]
+            teams[category] = pa.array([entry['value'] for entry in entries])
+            if category in self.roto.qualifiers:
+                teams[self.roto.qualifiers[category]] = pa.array([entry['qualified'] for entry in entries], pa.bool_())
+            teams[f"{category}_rank"] = pa.array([entry['rank'] for entry in entries], pa.int32())
+            teams[f"{category}_roto_points"] = pa.array([float(entry['roto_points']) for entry in entries], pa.float64())
+        for stat in GameStatTable.STAT_COLUMNS:
+            teams[stat] = pa.array([self.team_sums[row['team']][stat] for row in standings], pa.int64())
+
+        def standings_rows(entries: List[Dict], keys: Dict[str, Any]):
+            rows = [(entry, row) for entry in entries for row in entry['standings']]
+            columns = {name: pa.array([entry[name] for entry, _ in rows], type_) for name, type_ in keys.items()}
+            columns['date'] = columns['date'].cast(pa.date32())
+            return pa.table({**columns, 'team': categories([row['team'] for _, row in rows]),
+                             'roto_points': pa.array([float(row['roto_points']) for _, row in rows], pa.float64()),
+                             'rank': pa.array([row['rank'] for _, row in rows], pa.int32())})
+
+        by_game = standings_rows(replay, {'game_id': pa.int64(), 'date': pa.string()})
+        by_game = by_game.append_column('start_time', pc.strptime(
+            pa.array([entry['start_time'] for entry in replay for _ in entry['standings']], pa.string()),
+            format='%Y-%m-%dT%H:%M:%SZ', unit='s', error_is_null=True).cast(pa.timestamp('s', tz='UTC')))
+        return {
+            'game_stats': game_stats,
+            'players': player_table,
+            'teams': pa.table(teams),
+            'standings_history': standings_rows(history, {'date': pa.string()}),
+            'standings_by_game': by_game,
+        }
+
+    def export(self, fmt: str = 'parquet', out_dir: Optional[str] = None) -> List[str]:
+        """Write the export stage's tables as Parquet or Arrow IPC files; returns the paths written"""
+        pa = import_pyarrow()
+        out_dir = out_dir or f"{config.WORKSPACE_PATH}/db/export"
+        scheduler = self.stage_scheduler(read_only=True)
+        tables = scheduler.run(self.stage_seeds(), targets=['export'])['export']
+        os.makedirs(out_dir, exist_ok=True)
+        paths = []
+        for name, table in tables.items():
+            path = f"{out_dir}/{name}.{EXPORT_FORMATS[fmt]}"
+            with atomic_write(path) as f:
+                if fmt == 'parquet':
+                    import pyarrow.parquet as pq
+                    pq.write_table(table, f)
+                else:
+                    with pa.ipc.new_file(f, table.schema) as writer:
+                        writer.write_table(table)
+            paths.append(path)
+        return paths
+
+    def run(self, rate_limit: float = 0.1, workers: int = 1) -> Dict[str, Any]:
+        """Main execution method; returns the computed stage outputs"""
+        print("🏒 Starting Wally Cup Olympics stats fetch...")
+        
+        # Fetch all game boxscores
+        with timed("fetch"):
+            self.fetch_games(rate_limit, workers)
+        
+        print("🏆 Generating standings...")
+        with timed("compute"):
+            results = self.compute()
+        with timed("publish"):
+            standings_data = self.publish(results)
+        
+        # Print summary
+        print("\n📈 Team Standings Summary:")
+        for i, team in enumerate(standings_data['standings'][:5], 1):
+            print(f"{i}. {team['team']}: {team['total_roto_points']:.1f} roto points")
+        print("...")
+        return results
+
+class _BatchParser(StatsFetcher):
+    """StatsFetcher's boxscore parsing without its state: player rows are collected, not applied"""
+
+    def __init__(self, player_lookup: Dict, abbreviated_lookup: Dict):
+        self.player_lookup = player_lookup
+        self.abbreviated_lookup = abbreviated_lookup
+        self.game_dates: Dict[int, str] = {}
+        self.game_starts: Dict[int, str] = {}
+        self.rows: List[tuple] = []
+
+    def _track_all_player(self, *row):
+        self.rows.append(row)
+
+_PARSE_WORKER: Optional[_BatchParser] = None
+
+def _init_parse_worker(games_db_path: str, json_backend: str, player_lookup: Dict, abbreviated_lookup: Dict) -> None:
+    global _PARSE_WORKER
+    config.GAMES_DB_PATH = games_db_path
+    set_json_backend(json_backend)
+    _PARSE_WORKER = _BatchParser(player_lookup, abbreviated_lookup)
+
+def _parse_cached_game(game_id: int):
+    """Worker: a cached FINAL game as (game_id, date, start, rows); None leaves the game to the main process"""
+    try:
+        boxscore = load_cached_boxscore(game_id)
+    except ValueError:
+        return None
+    if not boxscore or boxscore.get('gameState') not in ('FINAL', 'OFF'):
+        return None
+    parser = _PARSE_WORKER
+    parser.rows = []
+    parser.process_game_boxscore(game_id, boxscore)
+    return game_id, parser.game_dates.pop(game_id, None), parser.game_starts.pop(game_id, None), parser.rows
+
+def run_live(interval: float = 15.0, transport=None) -> None:
+    """Republish standings from play-by-play every interval seconds while games are in progress"""
+    live_feed = LiveFeed()
+    transport = transport or HTTPTransport()
+    print("ℹ️ Plus/minus isn't in the play-by-play feed: games in progress count 0 for it until their FINAL boxscore")
+    while True:
+        started = time.monotonic()
+        try:
+            with run_lock(interval):
+                fetcher = StatsFetcher(live_feed=live_feed, transport=transport)
+                fetcher.run(rate_limit=0)
+        except LockHeld as e:
+            print(f"⏳ Another run holds the workspace ({e}), retrying")
+            continue
+        if not fetcher.live_games:
+            print("🏁 No games in progress, leaving live mode")
+            return
+        print(f"⏱️ {len(fetcher.live_games)} games in progress, next update in {interval:g}s")
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
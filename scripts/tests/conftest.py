@@ -0,0 +1,47 @@
+"""Fixtures for the pipeline tests: synthetic leagues and a fault-injecting upstream
+
+The scripts directory isn't a package, so it goes on sys.path here, the way
+running a script from it would put it there.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from config import GAME_ID_START, set_base_url, set_workspace
+from leagues import League, Upstream
+
+# The default season's size, before any test moves the game range
+DEFAULT_GAMES = config.GAME_ID_END - GAME_ID_START + 1
+
+@pytest.fixture(autouse=True)
+def restore_config():
+    """Put the workspace, games DB and API URL back after each test"""
+    saved = (config.WORKSPACE_PATH, config.GAMES_DB_PATH, config.GAME_ID_END, config.API_BASE_URL)
+    yield
+    workspace, games_db, game_id_end, base_url = saved
+    set_workspace(workspace, game_count=game_id_end - GAME_ID_START + 1, games_db=games_db)
+    set_base_url(base_url)
+
+@pytest.fixture(scope="session")
+def league(tmp_path_factory) -> League:
+    """A 240-game synthetic league; call fresh() for a workspace of your own"""
+    return League(str(tmp_path_factory.mktemp("league")), 240)
+
+@pytest.fixture(scope="session")
+def upstream(tmp_path_factory):
+    """The fault stand-in serving a league that spans the default game range (as an end-to-end run sees it)"""
+    upstream = Upstream(str(tmp_path_factory.mktemp("upstream")), DEFAULT_GAMES)
+    yield upstream
+    upstream.close()
+
+@pytest.fixture
+def clean_upstream(upstream) -> Upstream:
+    """The upstream with no faults and an empty request log"""
+    upstream.faults(0)
+    set_base_url(upstream.server.base_url)
+    return upstream
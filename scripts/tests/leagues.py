@@ -0,0 +1,104 @@
+"""Synthetic leagues and a local upstream for the tests (see conftest.py for the fixtures)"""
+
+import contextlib
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Dict, List
+from unittest import mock
+
+import jsonio
+from bench import write_synthetic_league
+from config import GAME_ID_START, set_base_url, set_workspace
+from games_db import cache_projection, load_cached_boxscore
+from standins import fault_standin, recorded_boxscore
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FETCH_STATS = os.path.join(SCRIPTS_DIR, 'fetch-stats.py')
+
+def published(workspace: str) -> Dict:
+    """standings.json without its volatile fields"""
+    with open(f"{workspace}/site/public/data/standings.json", 'rb') as f:
+        standings = json.loads(f.read())
+    for field in jsonio.VOLATILE_FIELDS:
+        standings.pop(field, None)
+    return standings
+
+def first_difference(a, b, path: str = '') -> str:
+    """Where two decoded JSON values first differ, for failure messages"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in list(a) + [key for key in b if key not in a]:
+            if key not in a or key not in b:
+                return f"{path}/{key} only on one side"
+            if a[key] != b[key]:
+                return first_difference(a[key], b[key], f"{path}/{key}")
+    if isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        for i, (x, y) in enumerate(zip(a, b)):
+            if x != y:
+                return first_difference(x, y, f"{path}[{i}]")
+    return f"{path or '/'}: {str(a)[:80]} != {str(b)[:80]}"
+
+class League:
+    """A synthetic league workspace; fresh() copies it so each run starts from the same cache"""
+
+    def __init__(self, root: str, games: int):
+        self.games = games
+        self.source = f"{root}/league"
+        self.root = root
+        self.copies = 0
+        write_synthetic_league(self.source, games=games)
+
+    def fresh(self) -> str:
+        self.copies += 1
+        workspace = f"{self.root}/run{self.copies}"
+        shutil.copytree(self.source, workspace)
+        set_workspace(workspace, game_count=self.games)
+        return workspace
+
+    def use(self, workspace: str) -> str:
+        set_workspace(workspace, game_count=self.games)
+        return workspace
+
+class Upstream:
+    """The fault stand-in serving a synthetic league's payloads, and fresh fetcher workspaces of that league"""
+
+    def __init__(self, root: str, games: int):
+        self.league = League(root, games)
+        self.league.use(self.league.source)
+        self.payloads = {game_id: recorded_boxscore(game_id) for game_id in range(GAME_ID_START, GAME_ID_START + games)}
+        self.server = fault_standin(0, fault_rate=0, faults=(), boxscore=self.payloads.get)
+        self.server.quiet = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        set_base_url(self.server.base_url)
+
+    def faults(self, fault_rate: float, *kinds: str) -> None:
+        """Inject the given faults from now on, and start a new request log"""
+        self.server.fault_rate = fault_rate
+        self.server.faults = kinds
+        self.server.log.clear()
+
+    def workspace(self, uncached=(), unfinished=()) -> str:
+        """A fresh copy of the league with some games missing from the cache and some cached as still LIVE"""
+        workspace = self.league.fresh()
+        for game_id in uncached:
+            os.remove(f"{workspace}/db/games/{game_id}.json")
+        for game_id in unfinished:
+            cache_projection(game_id, dict(load_cached_boxscore(game_id), gameState='LIVE'))
+        return workspace
+
+    def env(self, workspace: str, **extra: str) -> Dict[str, str]:
+        """Environment for a fetch-stats.py subprocess on workspace, talking to this upstream"""
+        return dict(os.environ, WALLY_WORKSPACE=workspace, WALLY_BASE_URL=self.server.base_url, **extra)
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+@contextlib.contextmanager
+def recorded_sleeps():
+    """Record the fetch layer's sleeps instead of waiting them out"""
+    sleeps: List[float] = []
+    with mock.patch.object(time, 'sleep', sleeps.append):
+        yield sleeps
@@ -0,0 +1,267 @@
+"""The fetch layer against the fault stand-in
+
+The stand-in serves a synthetic league on a free port; each test injects
+faults into it. Sleeps and the clock are recorded or moved forward rather than
+waited on, except in the end-to-end fetch runs.
+"""
+
+import contextlib
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict
+from unittest import mock
+
+import pytest
+
+import config
+from config import GAME_ID_START, set_workspace
+from fetch_layer import CircuitBreaker, CircuitOpenError, HTTPTransport, RecordingTransport, ReplayTransport, \
+    ResilientFetcher, TransientFetchError, TransportResponse, read_recording
+from games_db import NEGATIVE_CACHE_TTL, load_cached_boxscore, negative_cache_path, store_boxscore
+from jsonio import load_json_file
+from leagues import FETCH_STATS, recorded_sleeps
+from locks import FileLock
+from stats_fetcher import StatsFetcher
+
+def pass_cooldown(breaker: CircuitBreaker) -> None:
+    breaker.opened_at -= breaker.cooldown
+
+@pytest.mark.parametrize("kind", ['error', 'drop'])
+def test_retries_with_full_jitter_backoff(clean_upstream, kind):
+    url = config.BASE_URL.format(GAME_ID_START)
+    delays: Dict[int, set] = {}
+    for _ in range(5):
+        clean_upstream.faults(1, kind)
+        http = ResilientFetcher(HTTPTransport())
+        with recorded_sleeps() as sleeps, pytest.raises(TransientFetchError):
+            http.get(url)
+        assert len(clean_upstream.server.log) == 4
+        assert len(sleeps) == 3
+        for attempt, delay in enumerate(sleeps):
+            assert 0 <= delay <= min(http.max_delay, http.base_delay * 2 ** attempt)
+            delays.setdefault(attempt, set()).add(delay)
+    assert all(len(seen) > 1 for seen in delays.values()), "backoff delays are identical across runs (no jitter)"
+
+def test_healthy_upstream_is_not_retried(clean_upstream):
+    with recorded_sleeps() as sleeps:
+        response = ResilientFetcher(HTTPTransport()).get(config.BASE_URL.format(GAME_ID_START))
+    assert response.status_code == 200 and not sleeps and len(clean_upstream.server.log) == 1
+
+def test_retry_after_is_honoured(clean_upstream):
+    clean_upstream.faults(1, 'throttle')
+    with recorded_sleeps() as sleeps, pytest.raises(TransientFetchError):
+        ResilientFetcher(HTTPTransport()).get(config.BASE_URL.format(GAME_ID_START))
+    assert len(clean_upstream.server.log) == 4
+    assert sleeps == [float(retry_after) for _, status, retry_after in clean_upstream.server.log[:-1]]
+
+def test_circuit_breaker_opens_and_recovers_through_a_probe(clean_upstream):
+    url = config.BASE_URL.format(GAME_ID_START)
+    breaker = CircuitBreaker()
+    http = ResilientFetcher(HTTPTransport(), breaker=breaker)
+
+    def get() -> str:
+        """What a request ended in: ok, failed or open"""
+        with recorded_sleeps():
+            try:
+                http.get(url)
+                return 'ok'
+            except TransientFetchError:
+                return 'failed'
+            except CircuitOpenError:
+                return 'open'
+
+    clean_upstream.faults(1, 'error')
+    assert get() == 'failed' and breaker.state == 'closed'
+    assert get() == 'open' and breaker.state == 'open'
+    assert len(clean_upstream.server.log) == 5, "attempts before opening"
+    assert get() == 'open' and len(clean_upstream.server.log) == 5, "a request was made while the breaker was open"
+
+    pass_cooldown(breaker)
+    assert breaker.state == 'half_open'
+    assert get() == 'open' and breaker.state == 'open', "a failed half-open probe didn't reopen the breaker"
+    assert len(clean_upstream.server.log) == 6, "the half-open probe made more than one request"
+
+    pass_cooldown(breaker)
+    clean_upstream.faults(0)
+    assert get() == 'ok' and breaker.state == 'closed' and breaker.failures == 0
+
+def test_half_open_breaker_lets_one_concurrent_probe_through():
+    class SlowTransport:
+        """Answers 200 after a pause long enough for every other thread to try"""
+
+        def __init__(self):
+            self.calls = 0
+
+        def get(self, url: str, timeout=None) -> TransportResponse:
+            self.calls += 1
+            time.sleep(0.2)
+            return TransportResponse(200, {}, b'{}')
+
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.record_failure()
+    pass_cooldown(breaker)
+    transport = SlowTransport()
+    http = ResilientFetcher(transport, breaker=breaker)
+    start = threading.Barrier(8)
+    outcomes = []
+
+    def get() -> None:
+        start.wait()
+        try:
+            outcomes.append(http.get("http://upstream/probe").status_code)
+        except CircuitOpenError:
+            outcomes.append('open')
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert transport.calls == 1, "more than one request was let through while half-open"
+    assert sorted(outcomes, key=str) == [200] + ['open'] * 7
+    assert breaker.state == 'closed' and not breaker.probe_in_flight
+    assert breaker.allow() and breaker.allow(), "a closed breaker refused requests"
+
+def test_failed_probe_frees_the_next_one():
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.record_failure()
+    pass_cooldown(breaker)
+    assert breaker.allow() and not breaker.allow(), "a second probe was allowed while the first was out"
+    assert breaker.blocked
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.probe_in_flight
+    pass_cooldown(breaker)
+    assert not breaker.blocked and breaker.allow(), "no probe allowed after the next cooldown"
+
+def test_negative_cache_expires(clean_upstream):
+    game_id = GAME_ID_START + 3
+    clean_upstream.workspace(uncached=[game_id])
+    fetcher = StatsFetcher()
+    ttl = NEGATIVE_CACHE_TTL[404]
+
+    def fetch(at: float = None):
+        with mock.patch.object(time, 'time', lambda: at) if at else contextlib.nullcontext():
+            return fetcher.fetch_game_boxscore(game_id)
+
+    clean_upstream.faults(1, 'notfound')
+    started = time.time()
+    assert fetch() == {}
+    assert os.path.exists(negative_cache_path(game_id)), "no .miss.json after a 404"
+    clean_upstream.faults(0)
+    fetch()
+    fetch(started + ttl - 60)
+    assert not clean_upstream.server.log, "requests for a game with an unexpired .miss.json"
+    boxscore = fetch(time.time() + ttl + 1)
+    assert len(clean_upstream.server.log) == 1, "the game wasn't requested again once its .miss.json expired"
+    assert boxscore and boxscore.get('gameState') == 'FINAL'
+    assert not os.path.exists(negative_cache_path(game_id)), ".miss.json kept after the game was fetched"
+
+def test_outage_keeps_cached_games(clean_upstream):
+    unfinished = [GAME_ID_START + i for i in (2, 5, 9)]
+    clean_upstream.workspace(unfinished=unfinished)
+    fetcher = StatsFetcher()
+    clean_upstream.faults(1, 'error', 'drop')
+    for game_id in unfinished:
+        stale = load_cached_boxscore(game_id)
+        with recorded_sleeps():
+            assert fetcher.fetch_game_boxscore(game_id) == stale
+        assert load_cached_boxscore(game_id) == stale
+    assert fetcher.http.breaker.state == 'open'
+    assert len(clean_upstream.server.log) == 5, "expected 4 requests, then 1 before opening"
+
+def test_fetch_command_during_and_after_an_outage(clean_upstream):
+    unfinished = [GAME_ID_START + i for i in (2, 5, 9)]
+    uncached = GAME_ID_START + 12
+    workspace = clean_upstream.workspace(uncached=[uncached], unfinished=unfinished)
+    env = clean_upstream.env(workspace)
+    before = {game_id: load_cached_boxscore(game_id) for game_id in unfinished}
+    clean_upstream.faults(1, 'error', 'drop')
+    run = subprocess.run([sys.executable, FETCH_STATS, 'fetch'], env=env, capture_output=True, text=True)
+    assert run.returncode == 0, run.stdout + run.stderr
+    assert "Circuit opened" in run.stdout
+    assert all(load_cached_boxscore(game_id) == before[game_id] for game_id in unfinished)
+    assert not os.path.exists(f"{workspace}/db/games/{uncached}.json") and not os.path.exists(negative_cache_path(uncached))
+
+    clean_upstream.faults(0)
+    run = subprocess.run([sys.executable, FETCH_STATS, 'fetch'], env=env, capture_output=True, text=True)
+    assert run.returncode == 0, run.stdout + run.stderr
+    assert all(load_cached_boxscore(game_id).get('gameState') == 'FINAL' for game_id in unfinished + [uncached])
+
+def test_shared_games_db_fetches_each_game_once(clean_upstream):
+    uncached = [GAME_ID_START + i for i in (0, 1, 4, 7, 15)]
+    held = uncached[1]
+    workspaces = [clean_upstream.workspace(), clean_upstream.workspace()]
+    shared = f"{clean_upstream.league.root}/shared-games"
+    shutil.copytree(f"{workspaces[0]}/db/games", shared)
+    for game_id in uncached:
+        os.remove(f"{shared}/{game_id}.json")
+    set_workspace(workspaces[0], game_count=clean_upstream.league.games, games_db=shared)
+
+    # Hold one game's lock as if a third run were fetching it; both runs must wait and take its result
+    lock = FileLock(f"{shared}/locks/{held}.lock", remove=True)
+    assert lock.acquire(), "couldn't take a game lock in a fresh games DB"
+    runs = [subprocess.Popen([sys.executable, FETCH_STATS, 'fetch'], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                             text=True, env=clean_upstream.env(workspace, WALLY_GAMES_DB=shared))
+            for workspace in workspaces]
+    time.sleep(2)
+    store_boxscore(held, clean_upstream.payloads[held])
+    lock.release()
+    outputs = [run.communicate()[0] for run in runs]
+
+    assert all(run.returncode == 0 for run in runs), "\n".join(outputs)
+    assert all(f"Game {held} is being fetched by another run" in output for output in outputs)
+    requests = [game_id for game_id, _, _ in clean_upstream.server.log]
+    assert held not in requests, "requested although another run fetched it"
+    assert sorted(requests) == [game_id for game_id in uncached if game_id != held]
+    assert not os.listdir(f"{shared}/locks"), "lock files left behind"
+    tracked = load_json_file(f"{shared}/revalidation.json")
+    assert all(str(game_id) in tracked for game_id in requests), "a run's revalidation schedule was overwritten"
+
+def test_replay_serves_recorded_responses_in_order(tmp_path):
+    class Scripted:
+        """A 503, a binary 200, then a dropped connection"""
+
+        def __init__(self):
+            self.responses = [TransportResponse(503, {'Retry-After': '2', 'Server': 'x'}, b'busy', 0.25),
+                              TransportResponse(200, {}, b'\xff\x00\x01')]
+
+        def get(self, url: str, timeout=None) -> TransportResponse:
+            if not self.responses:
+                raise OSError("connection reset")
+            return self.responses.pop(0)
+
+    archive = str(tmp_path / "recorded" / "run.jsonl.gz")
+    recording = RecordingTransport(Scripted(), archive)
+    url = "http://upstream/v1/gamecenter/1/boxscore"
+    assert recording.get(url).status_code == 503 and recording.get(url).status_code == 200
+    with pytest.raises(OSError):
+        recording.get(url)
+    assert [record.get('status') for record in read_recording(archive)] == [503, 200, None]
+
+    replay = ReplayTransport(archive)
+    busy = replay.get(url)
+    assert (busy.status_code, busy.headers, busy.content, busy.elapsed) == (503, {'Retry-After': '2'}, b'busy', 0.25)
+    assert replay.get(url).content == b'\xff\x00\x01'
+    for _ in range(2):  # the last response repeats once the recording runs out
+        with pytest.raises(ConnectionError, match="recorded failure: OSError: connection reset"):
+            replay.get(url)
+    with pytest.raises(ConnectionError, match="not in the recording"):
+        replay.get("http://upstream/v1/gamecenter/2/boxscore")
+
+def test_recorded_run_replays_offline(clean_upstream, tmp_path):
+    uncached = [GAME_ID_START + i for i in (1, 4, 8)]
+    clean_upstream.workspace(uncached=uncached)
+    archive = str(tmp_path / "run.jsonl.gz")
+    StatsFetcher(transport=RecordingTransport(HTTPTransport(), archive)).fetch_games(rate_limit=0)
+    fetched = {game_id: load_cached_boxscore(game_id) for game_id in uncached}
+    assert len(read_recording(archive)) == len(clean_upstream.server.log) == len(uncached)
+
+    clean_upstream.workspace(uncached=uncached)
+    clean_upstream.faults(1, 'error')  # Every request to the upstream would fail now
+    StatsFetcher(transport=ReplayTransport(archive)).fetch_games(rate_limit=0)
+    assert not clean_upstream.server.log, "the replayed run made requests"
+    assert {game_id: load_cached_boxscore(game_id) for game_id in uncached} == fetched
@@ -0,0 +1,48 @@
+"""The games cache: projected boxscores, raw archives and migrations"""
+
+import gzip
+import json
+
+import config
+from config import GAME_ID_START
+from games_db import BOXSCORE_FIELDS, BOXSCORE_SCHEMA_VERSION, cache_projection, decode_boxscore, \
+    load_cached_boxscore, project_boxscore, raw_boxscore_path, reproject_boxscores
+from jsonio import dump_json_file
+
+def cache_file(game_id: int) -> str:
+    return f"{config.GAMES_DB_PATH}/{game_id}.json"
+
+def test_decoding_keeps_only_the_projected_fields(league):
+    league.fresh()
+    with open(cache_file(GAME_ID_START), 'rb') as f:
+        payload = json.loads(f.read())
+    payload['tvBroadcasts'] = [{"network": "CBC"}]
+    payload['playerByGameStats']['homeTeam']['forwards'][0]['faceoffWinningPctg'] = 0.5
+    boxscore = decode_boxscore(json.dumps(payload).encode('utf-8'))
+    assert boxscore == project_boxscore(payload)
+    assert 'tvBroadcasts' not in boxscore and set(boxscore) <= set(BOXSCORE_FIELDS)
+    assert 'faceoffWinningPctg' not in boxscore['playerByGameStats']['homeTeam']['forwards'][0]
+
+def test_full_payload_in_the_cache_is_migrated_to_a_projection(league):
+    league.fresh()
+    game_id = GAME_ID_START + 1
+    with open(cache_file(game_id), 'rb') as f:
+        raw = f.read()
+    assert '_schema' not in json.loads(raw), "the synthetic league should start with full payloads"
+    boxscore = load_cached_boxscore(game_id)
+    assert boxscore == project_boxscore(json.loads(raw))
+    with open(cache_file(game_id), 'rb') as f:
+        assert json.loads(f.read()) == dict(boxscore, _schema=BOXSCORE_SCHEMA_VERSION)
+    with gzip.open(raw_boxscore_path(game_id), 'rb') as f:
+        assert f.read() == raw, "the raw archive isn't the original payload"
+
+def test_outdated_projection_is_rebuilt_from_the_raw_archive(league):
+    league.fresh()
+    game_id = GAME_ID_START + 2
+    boxscore = load_cached_boxscore(game_id)
+    dump_json_file({"gameState": "FINAL", "_schema": BOXSCORE_SCHEMA_VERSION - 1}, cache_file(game_id), indent=False)
+    assert load_cached_boxscore(game_id) == boxscore
+
+    cache_projection(game_id, {"gameState": "FINAL"})
+    assert reproject_boxscores() == 1
+    assert load_cached_boxscore(game_id) == boxscore
@@ -0,0 +1,33 @@
+"""JSON backends: every installed one reads and writes the same documents"""
+
+import json
+
+import pytest
+
+import jsonio
+from jsonio import JSON_BACKENDS, available_json_backends, json_dumps, json_loads, set_json_backend
+
+DOCUMENT = {"name": "Jānis Ozoliņš", "stats": {"goals": 3, "save_pct": 0.9125, "qualified": True},
+            "log": [None, -1, 2.5, "", {}], "nested": [[1, [2, [3]]]]}
+
+@pytest.fixture
+def restore_backend():
+    active = jsonio.JSON_BACKEND
+    yield
+    set_json_backend(active)
+
+@pytest.mark.parametrize("backend", available_json_backends())
+def test_backend_round_trips_and_matches_stdlib_layout(backend, restore_backend):
+    assert set_json_backend(backend) == backend
+    encoded = json_dumps(DOCUMENT)
+    assert json_loads(encoded) == DOCUMENT and json_loads(encoded.decode('utf-8')) == DOCUMENT
+    assert json.loads(json_dumps(DOCUMENT, indent=True)) == DOCUMENT
+    # The fast backends don't escape non-ASCII, so compare the indented layout on ASCII text
+    ascii_document = dict(DOCUMENT, name="Janis Ozolins")
+    assert json_dumps(ascii_document, indent=True) == json.dumps(ascii_document, indent=2).encode('utf-8')
+
+def test_unavailable_backend_falls_back_to_the_fastest(restore_backend, capsys):
+    assert set_json_backend('simdjson') == available_json_backends()[0]
+    assert "not available" in capsys.readouterr().out
+    assert set_json_backend() == available_json_backends()[0]
+    assert available_json_backends()[-1] == 'stdlib' and set(available_json_backends()) <= set(JSON_BACKENDS)
@@ -0,0 +1,79 @@
+"""Live mode's play-by-play cursors, against recordings synthesized from the league's games"""
+
+import json
+import os
+
+import pytest
+
+import config
+from config import GAME_ID_START
+from fetch_layer import TransportResponse
+from games_db import cache_projection, load_cached_boxscore
+from live import LiveFeed
+from standins import synthesize_play_by_play
+from stats_fetcher import StatsFetcher
+
+GAME_ID = GAME_ID_START + 3
+
+@pytest.fixture
+def recording(league):
+    """A fresh workspace and the synthesized play-by-play of its FINAL game GAME_ID: (final boxscore, pbp)"""
+    league.fresh()
+    final = load_cached_boxscore(GAME_ID)
+    return final, synthesize_play_by_play(GAME_ID, final)
+
+def skater_totals(boxscore: dict, stat: str) -> int:
+    stats = boxscore['playerByGameStats']
+    return sum(player[stat] for side in ('homeTeam', 'awayTeam')
+               for player in stats[side]['forwards'] + stats[side]['defense'])
+
+def test_cursor_applies_each_play_once(recording):
+    final, pbp = recording
+    plays = pbp['plays']
+    feed = LiveFeed()
+    half = feed.update(GAME_ID, dict(pbp, plays=plays[:len(plays) // 2]))
+    again = feed.update(GAME_ID, dict(pbp, plays=plays[:len(plays) // 2]))
+    assert again == half, "replaying the same plays moved the tallies"
+    full = feed.update(GAME_ID, pbp)
+    assert feed.games[GAME_ID]['cursor'] == plays[-1]['sortOrder']
+    for stat in ('goals', 'assists', 'pim'):
+        assert skater_totals(full, stat) == skater_totals(final, stat)
+    assert skater_totals(full, 'plusMinus') == 0, "plus/minus isn't in the feed"
+
+    # A restart resumes from the saved cursor
+    assert LiveFeed().update(GAME_ID, pbp) == full
+
+def test_overturned_goal_rebuilds_the_tallies(recording, capsys):
+    final, pbp = recording
+    feed = LiveFeed()
+    feed.update(GAME_ID, pbp)
+    goal = next(play for play in pbp['plays'] if play['typeDescKey'] == 'goal')
+    revised = feed.update(GAME_ID, dict(pbp, plays=[play for play in pbp['plays'] if play is not goal]))
+    assert "play-by-play revised" in capsys.readouterr().out
+    assert skater_totals(revised, 'goals') == skater_totals(final, 'goals') - 1
+    assert goal['eventId'] not in feed.games[GAME_ID]['events']
+
+def test_live_projection_stays_out_of_the_games_cache(recording):
+    final, pbp = recording
+    cache_projection(GAME_ID, dict(final, gameState='LIVE', startTimeUTC='2020-01-01T00:00:00Z'))
+    cache_file = f"{config.GAMES_DB_PATH}/{GAME_ID}.json"
+    with open(cache_file, 'rb') as f:
+        cached = f.read()
+    in_progress = dict(pbp, gameState='LIVE', plays=pbp['plays'][:len(pbp['plays']) // 2],
+                       homeTeam=dict(pbp['homeTeam'], score=7), awayTeam=dict(pbp['awayTeam'], score=5))
+
+    class PlayByPlay:
+        def get(self, url: str, timeout=None) -> TransportResponse:
+            if url == config.PLAY_BY_PLAY_URL.format(GAME_ID):
+                return TransportResponse(200, {}, json.dumps(in_progress).encode('utf-8'))
+            return TransportResponse(404, {}, b'')
+
+    fetcher = StatsFetcher(live_feed=LiveFeed(), transport=PlayByPlay())
+    live = fetcher.fetch_live_game(GAME_ID)
+    assert live['gameState'] == 'LIVE'
+    with open(cache_file, 'rb') as f:
+        assert f.read() == cached, "the live projection was written into the games cache"
+    assert os.path.exists(f"{config.WORKSPACE_PATH}/db/live/{GAME_ID}.json")
+    assert not os.path.exists(f"{config.GAMES_DB_PATH}/live")
+    game = next(game for game in fetcher.fetch_olympic_schedule()['games'] if game['id'] == GAME_ID)
+    assert (game['status'], game['home_score'], game['away_score']) == ('LIVE', 7, 5)
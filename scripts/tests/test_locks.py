@@ -0,0 +1,52 @@
+"""The workspace run lock and the FileLock under it"""
+
+import os
+import socket
+import time
+
+import pytest
+
+import config
+from jsonio import dump_json_file
+from locks import RUN_LOCK_HUNG_AFTER, FileLock, LockHeld, run_lock
+
+@pytest.fixture
+def workspace(tmp_path):
+    config.WORKSPACE_PATH = str(tmp_path)
+    os.makedirs(tmp_path / "db")
+    return str(tmp_path)
+
+def test_run_lock_is_refused_while_another_run_holds_it(workspace):
+    with run_lock():
+        with pytest.raises(LockHeld, match=f"held by pid {os.getpid()} on {socket.gethostname()}") as held:
+            with run_lock():
+                pass
+        assert held.value.holder['pid'] == os.getpid()
+    with run_lock():
+        pass
+
+def test_lock_left_by_a_dead_holder_is_recovered(workspace, capsys):
+    dump_json_file({"pid": 1, "host": "elsewhere", "started": time.time() - 60}, f"{workspace}/db/run.lock")
+    with run_lock():
+        pass
+    assert "Recovered the run lock from pid 1" in capsys.readouterr().out
+    with run_lock():
+        pass
+    assert "Recovered" not in capsys.readouterr().out, "a clean release left its holder behind"
+
+def test_holder_past_the_hung_limit_is_reported():
+    holder = {"pid": 7, "host": "cron", "started": time.time() - RUN_LOCK_HUNG_AFTER - 1}
+    assert "looks hung" in str(LockHeld("run.lock", holder))
+    assert "looks hung" not in str(LockHeld("run.lock", dict(holder, started=time.time())))
+
+def test_acquire_gives_up_after_its_timeout(tmp_path):
+    path = str(tmp_path / "locks" / "game.lock")
+    holder, waiter = FileLock(path, remove=True), FileLock(path, remove=True)
+    assert holder.acquire()
+    started = time.monotonic()
+    assert not waiter.acquire(0.2)
+    assert time.monotonic() - started >= 0.2
+    holder.release()
+    assert not os.path.exists(path), "remove=True left the lock file"
+    assert waiter.acquire() and waiter.recovered is None
+    waiter.release()
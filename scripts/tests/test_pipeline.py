@@ -0,0 +1,371 @@
+"""The rewritten pipeline against the plain versions it replaced, on a synthetic league
+
+Each test compares a rewritten path against the original, or against another
+path that must agree with it. No network is needed.
+"""
+
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import pytest
+
+import config
+import jsonio
+from jsonio import JSONArrayStream, JSONObjectStream, RawJSON, available_json_backends, dump_json_file, file_version, \
+    load_json_file, set_json_backend, write_json_streaming
+from leagues import FETCH_STATS, first_difference, published
+from pipeline import Stage, StageScheduler, snapshot_files
+from records import GameStatTable
+from scoring import LEADERBOARD_SIZE, LEADERBOARDS, PLAYERS_VIEW_COLUMNS, RotoEngine
+from stats_fetcher import EXPORT_FORMATS, StatsFetcher, import_pyarrow
+
+@pytest.fixture
+def stdlib_backend():
+    """Use the stdlib JSON backend for the test, then go back to the active one"""
+    active = jsonio.JSON_BACKEND
+    set_json_backend('stdlib')
+    yield
+    set_json_backend(active)
+
+def streamed_document(streams: bool) -> Dict:
+    """A document exercising every kind of streamed value; streams are single-use, so each write needs a new one"""
+    rng = random.Random(7)
+    rows = [{"name": f"Pläyer {i}", "stats": {"goals": rng.randrange(5), "save_pct": rng.random()},
+             "log": [rng.randrange(-3, 3) for _ in range(rng.randrange(4))], "tags": {}} for i in range(25)]
+    array = JSONArrayStream if streams else list
+    members = (lambda pairs: JSONObjectStream(list(pairs))) if streams else dict
+    raw = members((str(i), {"nested": [i, {"x": None}]}) for i in range(5))
+    return {
+        "updated_at": "2026-02-11T00:00:00Z",
+        "rows": array(rows),
+        "by_name": members((row["name"], array(row["log"])) for row in rows),
+        "raw": RawJSON.encode(raw) if streams else raw,
+        "empty_stream": array([]),
+        "empty_object": members([]),
+        "plain": {"a": [], "b": {}, "c": [1.5, True, None, "é"]},
+    }
+
+@pytest.mark.parametrize("backend", available_json_backends())
+def test_streaming_writer_matches_json_dump(backend, tmp_path):
+    active = jsonio.JSON_BACKEND
+    set_json_backend(backend)
+    try:
+        write_json_streaming(str(tmp_path / "streamed.json"), streamed_document(True))
+    finally:
+        set_json_backend(active)
+    written = (tmp_path / "streamed.json").read_bytes()
+    # Faster backends keep the layout but may not escape non-ASCII text
+    assert json.loads(written) == streamed_document(False)
+    if backend == 'stdlib':
+        assert written == json.dumps(streamed_document(False), indent=2).encode('utf-8')
+
+def test_published_standings_are_laid_out_like_json_dump(league, stdlib_backend):
+    workspace = league.fresh()
+    StatsFetcher().run(rate_limit=0)
+    with open(f"{workspace}/site/public/data/standings.json", 'rb') as f:
+        written = f.read()
+    assert written == json.dumps(json.loads(written), indent=2).encode('utf-8')
+
+def reference_roto_standings(team_totals: Dict[str, Dict]) -> List[Dict]:
+    """The original calculate_roto_rankings, with its hard-coded 13 generalised to n + 1 teams"""
+    teams_data = list(team_totals.items())
+    base = len(teams_data) + 1
+    categories = ['goals', 'assists', 'plus_minus', 'pim', 'goalie_wins', 'save_pct']
+    team_ranks = {team: {} for team, _ in teams_data}
+    for category in categories:
+        if category == 'save_pct':
+            qualified_teams = [(team, totals[category]) for team, totals in teams_data if totals['sv_qualified']]
+            unqualified_teams = [team for team, totals in teams_data if not totals['sv_qualified']]
+            qualified_teams.sort(key=lambda x: x[1], reverse=True)
+            for i, (team, value) in enumerate(qualified_teams):
+                rank = i + 1
+                if i > 0 and value == qualified_teams[i - 1][1]:
+                    rank = team_ranks[qualified_teams[i - 1][0]][category]['rank']
+                team_ranks[team][category] = {'value': value, 'rank': rank, 'qualified': True}
+            for team in unqualified_teams:
+                team_ranks[team][category] = {'value': 0, 'rank': len(qualified_teams) + 1, 'qualified': False}
+        else:
+            values = [(team, totals[category]) for team, totals in teams_data]
+            values.sort(key=lambda x: x[1], reverse=True)
+            for i, (team, value) in enumerate(values):
+                rank = i + 1
+                if i > 0 and value == values[i - 1][1]:
+                    rank = team_ranks[values[i - 1][0]][category]['rank']
+                team_ranks[team][category] = {'value': value, 'rank': rank}
+    for team in team_ranks:
+        total_roto_points = 0
+        for category in categories:
+            rank = team_ranks[team][category]['rank']
+            tied_teams = [t for t in team_ranks if team_ranks[t][category]['rank'] == rank]
+            if len(tied_teams) > 1:
+                roto_points = sum(base - (rank + i) for i in range(len(tied_teams))) / len(tied_teams)
+            else:
+                roto_points = base - rank
+            team_ranks[team][category]['roto_points'] = roto_points
+            total_roto_points += roto_points
+        team_ranks[team]['total_roto_points'] = total_roto_points
+    standings = [{'team': team, 'categories': {category: ranks[category] for category in categories},
+                  'total_roto_points': ranks['total_roto_points'], 'rank': 0} for team, ranks in team_ranks.items()]
+    standings.sort(key=lambda x: x['total_roto_points'], reverse=True)
+    for i, team in enumerate(standings):
+        team['rank'] = i + 1
+    return standings
+
+def random_team_totals(rng: random.Random) -> Dict[str, Dict]:
+    """Team totals for 2-16 teams; small spreads make most values tie"""
+    teams = rng.choice((2, 5, 12, 12, 12, 16))
+    spread = rng.choice((2, 4, 50))
+    totals = {}
+    for t in range(teams):
+        shots = rng.choice((0, 10, 25, 25, 30))
+        saves = min(shots, rng.choice((0, 9, 20, 23, 23)))
+        qualified = shots >= 20
+        totals[f"Team {t}"] = {"goals": rng.randrange(spread), "assists": rng.randrange(spread),
+                               "plus_minus": rng.randrange(-spread, spread), "pim": rng.randrange(spread) * 2,
+                               "goalie_wins": rng.randrange(spread),
+                               "save_pct": saves / shots if qualified else 0, "sv_qualified": qualified}
+    return totals
+
+def test_roto_engine_matches_original_ranking():
+    rng = random.Random(2026)
+    engine = RotoEngine()
+    for trial in range(500):
+        totals = random_team_totals(rng)
+        expected = reference_roto_standings(totals)
+        actual = engine.standings(totals)
+        assert actual == expected, f"trial {trial} ({len(totals)} teams): {first_difference(actual, expected)}"
+
+def test_stages_run_serially_in_dependency_order():
+    calls = []
+
+    def stage(name: str, *inputs: str) -> Stage:
+        def fn(values: Dict) -> str:
+            calls.append((name, threading.current_thread()))
+            assert sorted(values) == sorted(inputs)
+            return name + ''.join(values[dep] for dep in inputs)
+        return Stage(name, fn, inputs)
+
+    # Declared out of order, with a diamond, so the scheduler has to wait on inputs
+    scheduler = StageScheduler([stage('z', 'x', 'y'), stage('x', 'seed'), stage('y', 'seed'), stage('w', 'x')])
+    values = scheduler.run({'seed': ('s', 'seed-fingerprint')})
+    assert [name for name, _ in calls] == ['x', 'y', 'z', 'w']
+    assert all(thread is threading.current_thread() for _, thread in calls), "a stage ran off the calling thread"
+    assert values['z'] == 'zxsys' and values['w'] == 'wxs'
+    with pytest.raises(ValueError, match="unresolvable inputs: z"):
+        StageScheduler([stage('z', 'missing')]).run({})
+
+def test_parse_workers_match_serial_parsing(league):
+    league.fresh()
+    StatsFetcher().fetch_games(rate_limit=0)  # migrate raw payloads into projections first
+    baseline = None
+    for workers in (1, 2, 4):
+        fetcher = StatsFetcher()
+        fetcher.fetch_games(rate_limit=0, workers=workers, offline=True)
+        table = {name: fetcher.game_table[name].tobytes() for name, _ in GameStatTable.COLUMNS}
+        result = (table, fetcher.player_keys, fetcher.game_dates)
+        if baseline is None:
+            baseline = result
+            assert len(fetcher.game_table) > 0, "no player-game rows parsed"
+        assert result == baseline, f"{workers} workers parsed differently from serial"
+
+def test_published_output_is_the_same_for_every_run_shape(league):
+    full = league.fresh()
+    StatsFetcher().run(rate_limit=0)
+    expected = published(full)
+
+    StatsFetcher().run(rate_limit=0)  # Every stage memoized
+    runs = {"memoized rerun": published(full)}
+
+    split = league.fresh()
+    fetcher = StatsFetcher()
+    fetcher.fetch_games(rate_limit=0, offline=True)
+    fetcher.compute()
+    StatsFetcher().publish()
+    runs["compute + publish"] = published(split)
+
+    league.use(full)
+    shutil.rmtree(f"{full}/db/stages")
+    os.remove(f"{full}/db/published.json")
+    StatsFetcher().run(rate_limit=0, workers=4)
+    runs["fresh memos, 4 workers"] = published(full)
+    for name, standings in runs.items():
+        assert standings == expected, f"{name}: {first_difference(standings, expected)}"
+
+    # Team totals summed from each player's season stats, the way calculate_team_totals did
+    rows = {row['team']: row['categories'] for row in expected['standings']}
+    for team, data in expected['teams'].items():
+        skaters = {"goals": 0, "assists": 0, "plus_minus": 0, "pim": 0}
+        goalies = {"wins": 0, "saves": 0, "shots_against": 0}
+        for player in data['players']:
+            sums = skaters if player['pos'] in ('F', 'D') else goalies
+            for stat in sums:
+                sums[stat] += player['stats'].get(stat, 0)
+        qualified = goalies['shots_against'] >= 20
+        values = dict(skaters, goalie_wins=goalies['wins'],
+                      save_pct=goalies['saves'] / goalies['shots_against'] if qualified else 0)
+        for category, value in values.items():
+            assert rows[team][category]['value'] == value, f"{team} {category}"
+
+    # Season stats are the sum of the game log
+    for player in expected['all_olympic_players']:
+        for stat, value in player['stats'].items():
+            if stat != 'save_pct':
+                logged = sum(game['stats'].get(stat, 0) for game in player.get('game_log', []))
+                assert logged == value, f"{player['name']} {stat}"
+
+def test_replay_matches_standings_rebuilt_from_scratch(league):
+    workspace = league.fresh()
+    fetcher = StatsFetcher()
+    fetcher.run(rate_limit=0)
+    replay = fetcher.replay_standings()
+    assert [entry['game_id'] for entry in replay] == sorted(fetcher.game_dates)
+    final = {row['team']: row['total_roto_points'] for row in published(workspace)['standings']}
+    assert {row['team']: row['roto_points'] for row in replay[-1]['standings']} == final
+
+    table = fetcher.game_table
+    engine = RotoEngine(fetcher.roto.rules)
+    for k in (0, len(replay) // 3, len(replay) - 2):
+        played = {entry['game_id'] for entry in replay[:k + 1]}
+        rows = [i for i in range(len(table)) if table['team_idx'][i] >= 0 and table['game_id'][i] in played]
+        sums = table.group_sum('team_idx', rows=rows)
+        totals = {team: engine.team_totals(sums.get(i, dict.fromkeys(GameStatTable.STAT_COLUMNS, 0)))
+                  for i, team in enumerate(fetcher.team_names)}
+        expected = {row['team']: row['total_roto_points'] for row in engine.standings(totals)}
+        assert {row['team']: row['roto_points'] for row in replay[k]['standings']} == expected, f"after game {k}"
+        assert [row['rank'] for row in replay[k]['standings']] == list(range(1, len(totals) + 1))
+
+    history = published(workspace)['standings_history']
+    last_of_day = {entry['date']: entry['standings'] for entry in replay}
+    assert all(day['standings'] == last_of_day[day['date']] for day in history if day['date'] in last_of_day)
+
+def test_leaderboards_and_view_orders_match_sorting_every_player(league):
+    league.fresh()
+    fetcher = StatsFetcher()
+    results = fetcher.run(rate_limit=0)
+    played = [p for p in fetcher.all_olympic_players.values() if p.stats['gp'] > 0]
+    for name, (positions, value) in LEADERBOARDS.items():
+        pool = [p for p in played if positions == 'all' or (p.pos == 'G') == (positions == 'goalies')]
+        values = sorted((value(p) for p in pool if value(p) is not None), reverse=True)
+        board = results['leaderboards'][name]
+        assert [row['value'] for row in board] == values[:LEADERBOARD_SIZE], name
+        assert [row['rank'] for row in board] == [values.index(row['value']) + 1 for row in board], name
+
+    players = results['views']['players']
+    rows = players['players']
+    for column, key in PLAYERS_VIEW_COLUMNS.items():
+        ascending = [key(rows[i]) for i in players['order'][column]['asc']]
+        assert ascending == sorted(map(key, rows)), column
+        assert [key(rows[i]) for i in players['order'][column]['desc']] == ascending[::-1], column
+
+def test_compute_then_publish_subcommands_match_a_full_run(clean_upstream):
+    full = clean_upstream.workspace()
+    StatsFetcher().run(rate_limit=0)
+    split = clean_upstream.workspace()
+    env = clean_upstream.env(split)
+    clean_upstream.faults(1, 'error')  # compute and publish must not need the network
+
+    def fetch_stats(*args: str) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, FETCH_STATS, *args], env=env, capture_output=True, text=True)
+
+    run = fetch_stats('publish')
+    assert run.returncode == 2 and "run the compute command first" in run.stderr
+    run = fetch_stats('compute', '--workers', '2')
+    assert run.returncode == 0, run.stdout + run.stderr
+    run = fetch_stats('publish')
+    assert run.returncode == 0, run.stdout + run.stderr
+    assert not clean_upstream.server.log, "compute or publish made requests"
+    assert published(split) == published(full), first_difference(published(split), published(full))
+
+@pytest.mark.parametrize("fmt", sorted(EXPORT_FORMATS))
+def test_exported_tables_hold_the_game_table_and_standings(league, fmt):
+    workspace = league.fresh()
+    StatsFetcher().run(rate_limit=0)
+    fetcher = StatsFetcher()
+    fetcher.fetch_games(rate_limit=0, offline=True)
+    pa = import_pyarrow()
+    import pyarrow.parquet as pq
+    read = pq.read_table if fmt == 'parquet' else lambda path: pa.ipc.open_file(path).read_all()
+    tables = {os.path.basename(path).split('.')[0]: read(path) for path in fetcher.export(fmt, f"{workspace}/export")}
+
+    table = fetcher.game_table
+    game_stats = tables['game_stats']
+    assert game_stats.num_rows == len(table) > 0
+    for stat in GameStatTable.STAT_COLUMNS:
+        assert game_stats[stat].to_pylist() == table[stat].tolist(), stat
+    assert tables['players'].num_rows == len(fetcher.player_keys)
+    standings = published(workspace)['standings']
+    assert tables['teams']['team'].to_pylist() == [row['team'] for row in standings]
+    assert tables['teams']['total_roto_points'].to_pylist() == [row['total_roto_points'] for row in standings]
+
+def test_publishing_unchanged_content_rewrites_no_file(league):
+    workspace = league.fresh()
+    fetcher = StatsFetcher()
+    fetcher.run(rate_limit=0)
+    data_dir = os.path.relpath(os.path.dirname(config.STANDINGS_PATH), workspace)
+    names = fetcher.publish_manifest.written
+    assert f"{data_dir}/standings.json" in names and f"{data_dir}/views/players.json" in names
+    versions = {name: file_version(f"{workspace}/{name}") for name in names}
+
+    fetcher = StatsFetcher()
+    fetcher.publish()
+    assert fetcher.publish_manifest.written == [] and sorted(fetcher.publish_manifest.unchanged) == sorted(names)
+    assert {name: file_version(f"{workspace}/{name}") for name in names} == versions
+
+    os.remove(f"{workspace}/{data_dir}/leaderboards.json")
+    with open(f"{workspace}/{data_dir}/views/radar.json", 'w') as f:
+        f.write('{}')
+    fetcher = StatsFetcher()
+    fetcher.publish()
+    assert sorted(fetcher.publish_manifest.written) == [f"{data_dir}/leaderboards.json", f"{data_dir}/views/radar.json"]
+    assert load_json_file(f"{workspace}/{data_dir}/views/radar.json") != {}
+
+def test_added_snapshot_shows_up_in_history(league):
+    workspace = league.fresh()
+    StatsFetcher().run(rate_limit=0)
+    history = published(workspace)['standings_history']
+    # A day after every other one, as if --rebuild-history or an off-day run had written it
+    last = datetime.strptime(history[-1]['date'], '%Y-%m-%d')
+    added = (last + timedelta(days=1)).strftime('%Y-%m-%d')
+    dump_json_file({"date": added, "standings": history[-1]['standings']}, f"{workspace}/snapshots/{added}.json")
+    StatsFetcher().run(rate_limit=0)
+    assert published(workspace)['standings_history'][-1]['date'] == added
+
+def test_read_only_commands_write_nothing(league):
+    workspace = league.fresh()
+    StatsFetcher().run(rate_limit=0)
+    # As if today's run hadn't happened yet, so a snapshot stage would write one
+    os.remove(f"{workspace}/snapshots/{datetime.now().strftime('%Y-%m-%d')}.json")
+    snapshots = snapshot_files()
+    stages = {name: file_version(f"{workspace}/db/stages/{name}") for name in os.listdir(f"{workspace}/db/stages")}
+    ledger_path = f"{workspace}/db/roster_moves.json"
+    with open(ledger_path, 'rb') as f:
+        ledger = f.read()
+
+    rosters = load_json_file(f"{workspace}/rosters.json")
+    teams = list(rosters)
+    moved = rosters[teams[0]].pop(0)
+    rosters[teams[1]].append(moved)
+    dump_json_file(rosters, f"{workspace}/rosters.json")
+
+    fetcher = StatsFetcher()
+    fetcher.fetch_games(rate_limit=0, offline=True)
+    fetcher.export('parquet', f"{workspace}/export")
+    StatsFetcher().what_if([f"{teams[0]}:goals=1"])
+    StatsFetcher().publish()  # Still finds the last compute's memos
+    with open(ledger_path, 'rb') as f:
+        assert f.read() == ledger, "a read-only command wrote db/roster_moves.json"
+    assert snapshot_files() == snapshots, "a read-only command wrote a snapshot"
+    for name in sorted(set(stages) | set(os.listdir(f"{workspace}/db/stages"))):
+        assert file_version(f"{workspace}/db/stages/{name}") == stages.get(name), f"a read-only command wrote {name}"
+
+    fetcher = StatsFetcher()
+    fetcher.fetch_games(rate_limit=0, offline=True)
+    fetcher.compute()
+    assert [move['name'] for move in load_json_file(ledger_path)['moves']] == [moved['name']]
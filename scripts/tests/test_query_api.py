@@ -0,0 +1,87 @@
+"""The query API's resources and change events"""
+
+import gzip
+from datetime import date, timedelta
+
+import pytest
+
+from query_api import EventStream, QueryAPI, negotiate_encoding
+from stats_fetcher import MILESTONES_LISTED, StatsFetcher
+
+def milestone(n: int) -> dict:
+    """The n-th milestone of the season, one per game, one game a day"""
+    return {"type": "hat_trick", "player": f"Player {n}", "country": "CAN", "game_id": 1000 + n,
+            "date": (date(2026, 2, 6) + timedelta(days=n)).isoformat()}
+
+def listed(milestones) -> dict:
+    """/milestones as compute_milestones publishes it: the most recent first, at most MILESTONES_LISTED"""
+    newest = sorted(milestones, key=lambda m: (m['date'], m['game_id']), reverse=True)
+    return {'/milestones': newest[:MILESTONES_LISTED]}
+
+def announced(events) -> list:
+    return [m['player'] for kind, m in events if kind == 'milestone']
+
+def test_milestone_events_announce_each_milestone_once():
+    api = QueryAPI()
+    season = [milestone(n) for n in range(3)]
+    assert announced(api._milestone_changes(listed(season[:2]), listed(season))) == ["Player 2"]
+    assert announced(api._milestone_changes(listed(season), listed(season))) == []
+
+    season = [milestone(n) for n in range(MILESTONES_LISTED + 1)]
+    assert announced(api._milestone_changes(listed(season[:-1]), listed(season))) == [f"Player {MILESTONES_LISTED}"]
+    # A stat correction withdraws the newest one, and the oldest comes back onto the list
+    assert announced(api._milestone_changes(listed(season), listed(season[:-1]))) == []
+
+    for n in range(MILESTONES_LISTED + 1, 400):
+        before = listed(season)
+        season.append(milestone(n))
+        assert announced(api._milestone_changes(before, listed(season))) == [f"Player {n}"]
+        assert len(api.milestones_seen) <= MILESTONES_LISTED + 1, "the seen set keeps growing"
+
+@pytest.fixture(scope="module")
+def stage_outputs(league):
+    """(results, fingerprints) of one run over a fresh copy of the league"""
+    league.fresh()
+    fetcher = StatsFetcher()
+    return fetcher.run(rate_limit=0), fetcher.stage_fingerprints
+
+@pytest.fixture
+def api(stage_outputs) -> QueryAPI:
+    api = QueryAPI()
+    api.update(*stage_outputs)
+    return api
+
+def test_gzip_variant_has_its_own_etag_and_the_same_content(api):
+    status, plain_headers, plain = api.respond('GET', '/standings', {})
+    assert status == 200 and 'Content-Encoding' not in plain_headers
+    status, headers, body = api.respond('GET', '/standings', {'accept-encoding': 'br;q=0, gzip'})
+    assert status == 200 and headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(body) == plain
+    assert headers['ETag'] == plain_headers['ETag'][:-1] + '-gzip"', "both representations share a strong ETag"
+    assert negotiate_encoding('gzip;q=0, identity') == 'identity'
+
+def test_if_none_match_answers_304_for_any_representation(api):
+    _, headers, _ = api.respond('GET', '/standings', {})
+    for encoding in ('', 'gzip'):
+        status, _, body = api.respond('GET', '/standings', {'if-none-match': headers['ETag'], 'accept-encoding': encoding})
+        assert (status, body) == (304, b'')
+    assert api.respond('GET', '/standings', {'if-none-match': '"stale"'})[0] == 200
+    assert api.respond('GET', '/no-such-path', {})[0] == 404
+    assert api.respond('POST', '/standings', {})[0] == 405
+
+def test_unchanged_stages_keep_their_bodies_and_etags(api, stage_outputs):
+    before = dict(api.resources)
+    assert api.update(*stage_outputs) == []
+    assert all(api.resources[path] is resource for path, resource in before.items())
+    assert QueryAPI().respond('GET', '/standings', {})[0] == 503
+
+def test_event_stream_resumes_from_ids_still_in_its_buffer():
+    stream = EventStream(buffer_size=3)
+    stream.publish([('hot', {"n": n}) for n in range(2)])
+    first = f"{stream.epoch}-1"
+    assert stream.since(stream.resume_point(first)) == [stream.encode('hot', {"n": 1}, f"{stream.epoch}-2")]
+    assert stream.resume_point(None) == stream.last_seq == 2, "a new client replays old events"
+    stream.publish([('hot', {"n": n}) for n in range(2, 5)])
+    assert stream.resume_point(first) is None, "resumed past events that left the buffer"
+    assert len(stream.since(stream.resume_point(f"{stream.epoch}-2"))) == 3
+    assert stream.resume_point(f"0-{stream.last_seq}") is None, "resumed another process's ids"
@@ -0,0 +1,73 @@
+"""The columnar game table and the records read out of it"""
+
+import random
+from collections import defaultdict
+
+import pytest
+
+from records import GameLogRow, GameStatTable, GoalieLine, PlayerRecord, date_to_ordinal, ordinal_to_date, \
+    strip_diacritics, toi_to_seconds
+
+def random_table(rows: int, seed: int = 26) -> GameStatTable:
+    """rows player-games over 6 players and 3 Wally teams, about one in five of them not played"""
+    rng = random.Random(seed)
+    table = GameStatTable()
+    for i in range(rows):
+        gp = int(rng.random() > 0.2)
+        table.append(2025090001 + i // 4, 739000 + i // 8 if rng.random() > 0.05 else 0, rng.randrange(6),
+                     rng.randrange(-1, 3), gp, *(rng.randrange(-2, 4) * gp for _ in range(7)), 900 * gp)
+    return table
+
+def test_group_sum_matches_summing_row_dicts():
+    table = random_table(300)
+    rows = [{name: table[name][i] for name, _ in GameStatTable.COLUMNS} for i in range(len(table))]
+    for key in ('player_idx', 'team_idx'):
+        expected = defaultdict(lambda: dict.fromkeys(GameStatTable.STAT_COLUMNS, 0))
+        for row in rows:
+            for stat in GameStatTable.STAT_COLUMNS:
+                expected[row[key]][stat] += row[stat]
+        assert table.group_sum(key) == dict(expected)
+    subset = list(range(0, len(table), 3))
+    assert table.group_sum('player_idx', ('goals',), subset) == {
+        player: {'goals': sum(rows[i]['goals'] for i in subset if rows[i]['player_idx'] == player)}
+        for player in {rows[i]['player_idx'] for i in subset}}
+
+def test_group_rows_and_logged_rows_keep_row_order():
+    table = random_table(120)
+    groups = table.group_rows('player_idx')
+    assert sorted(i for rows in groups.values() for i in rows) == list(range(len(table)))
+    assert all(rows == sorted(rows) and all(table['player_idx'][i] == player for i in rows)
+               for player, rows in groups.items())
+    logged = table.logged_rows()
+    assert logged == [i for i in range(len(table)) if table['gp'][i] and table['date'][i] and table['game_id'][i]]
+    assert len(table) == 120 and all(len(table[name]) == 120 for name, _ in GameStatTable.COLUMNS)
+
+@pytest.mark.parametrize("record", [GameLogRow(1, '2026-02-11', 1, 0, 0, 0, 0, 0, 0, 0, False), GoalieLine(),
+                                    PlayerRecord("Nico Hischier", "SUI", "F")])
+def test_records_are_slotted(record):
+    assert not hasattr(record, '__dict__')
+    with pytest.raises(AttributeError):
+        record.nickname = "Nico"
+
+def test_game_log_row_reads_a_table_row():
+    table = GameStatTable()
+    table.append(2026020011, date_to_ordinal('2026-02-11'), 3, 1, 1, 2, 1, -1, 4, 0, 0, 0, 1032)
+    table.append(2026020011, date_to_ordinal('2026-02-11'), 4, 1, 1, 0, 0, 0, 0, 1, 27, 29, 3600)
+    assert GameLogRow.from_table(table, 0, False).to_dict() == {
+        "game_id": 2026020011, "date": '2026-02-11',
+        "stats": {"gp": 1, "goals": 2, "assists": 1, "plus_minus": -1, "pim": 4}}
+    assert GameLogRow.from_table(table, 1, True).stats_dict() == {"gp": 1, "wins": 1, "saves": 27, "shots_against": 29}
+
+def test_player_record_serializes_the_72h_stats_only_when_set():
+    player = PlayerRecord("Nico Hischier", "SUI", "F", "Bardown")
+    assert 'hot_72h_stats' not in player.to_dict([])
+    player.hot_72h_stats = {"goals": 3}
+    serialized = player.to_dict([{"game_id": 1}])
+    assert serialized['hot_72h_stats'] == {"goals": 3} and serialized['game_log'] == [{"game_id": 1}]
+    assert serialized['stats'] == {"gp": 0, "goals": 0, "assists": 0, "plus_minus": 0, "pim": 0}
+
+def test_conversions():
+    assert toi_to_seconds('17:32') == 1052 and toi_to_seconds(None) == 0 and toi_to_seconds('--') == 0
+    assert ordinal_to_date(date_to_ordinal('2026-02-28')) == '2026-02-28'
+    assert date_to_ordinal('') == 0 and ordinal_to_date(0) == ''
+    assert strip_diacritics("Zdeno Chára, Jesper Bratt, Jānis Ozoliņš") == "Zdeno Chara, Jesper Bratt, Janis Ozolins"
@@ -0,0 +1,99 @@
+"""Stat-correction re-checks of FINAL games against the fault stand-in"""
+
+import gzip
+import json
+import time
+from unittest import mock
+
+import pytest
+
+import config
+import jsonio
+from config import GAME_ID_START
+from games_db import REVALIDATE_FIRST_DELAY, REVALIDATE_WINDOW, RevalidationSchedule, boxscore_hash, \
+    load_cached_boxscore, raw_boxscore_path
+from jsonio import available_json_backends, set_json_backend
+from stats_fetcher import StatsFetcher
+
+GAME_ID = GAME_ID_START + 6
+
+@pytest.fixture
+def due_game(clean_upstream):
+    """A fetcher with GAME_ID cached as FINAL and due for a re-check: (fetcher, cached boxscore, cache file bytes)"""
+    clean_upstream.workspace()
+    fetcher = StatsFetcher()
+    cached = load_cached_boxscore(GAME_ID)
+    fetcher.revalidation.track(GAME_ID, cached)
+    fetcher.revalidate_due = {GAME_ID}
+    return fetcher, cached, cache_entry()
+
+def upstream_payload(upstream, **changes) -> bytes:
+    """The upstream's payload for GAME_ID with top-level changes and the first forward given one more goal"""
+    payload = dict(json.loads(upstream.payloads[GAME_ID]), **changes)
+    payload['playerByGameStats']['homeTeam']['forwards'][0]['goals'] += 1
+    return json.dumps(payload).encode('utf-8')
+
+def cache_entry() -> bytes:
+    with open(f"{config.GAMES_DB_PATH}/{GAME_ID}.json", 'rb') as f:
+        return f.read()
+
+def test_correction_replaces_the_cached_game_and_its_raw_archive(clean_upstream, due_game, monkeypatch, capsys):
+    fetcher, cached, _ = due_game
+    corrected = upstream_payload(clean_upstream)
+    monkeypatch.setitem(clean_upstream.payloads, GAME_ID, corrected)
+    boxscore = fetcher.fetch_game_boxscore(GAME_ID)
+    forward = boxscore['playerByGameStats']['homeTeam']['forwards'][0]
+    assert forward['goals'] == cached['playerByGameStats']['homeTeam']['forwards'][0]['goals'] + 1
+    assert load_cached_boxscore(GAME_ID) == boxscore
+    with gzip.open(raw_boxscore_path(GAME_ID), 'rb') as f:
+        assert f.read() == corrected, "the raw archive would reproject the uncorrected game"
+    assert f"Stat correction in game {GAME_ID}: {forward['name']['default']} goals +1" in capsys.readouterr().out
+    assert fetcher.revalidation.games[str(GAME_ID)]['hash'] == boxscore_hash(boxscore)
+
+@pytest.mark.parametrize("fault", ['notfound', 'live'])
+def test_error_or_live_payload_leaves_the_cached_game(clean_upstream, due_game, monkeypatch, fault):
+    fetcher, cached, before = due_game
+    # As if another league had recorded a different hash, so the re-check sees a change
+    fetcher.revalidation.games[str(GAME_ID)]['hash'] = 'recorded-by-another-league'
+    if fault == 'notfound':
+        clean_upstream.faults(1, 'notfound')
+    else:
+        monkeypatch.setitem(clean_upstream.payloads, GAME_ID, upstream_payload(clean_upstream, gameState='LIVE'))
+    assert fetcher.fetch_game_boxscore(GAME_ID) == cached
+    assert len(clean_upstream.server.log) == 1
+    assert cache_entry() == before, "the FINAL game's cache entry was rewritten"
+
+def test_boxscore_hash_does_not_depend_on_the_json_backend(due_game):
+    _, cached, _ = due_game
+    active = jsonio.JSON_BACKEND
+    try:
+        hashes = set()
+        for backend in available_json_backends():
+            set_json_backend(backend)
+            hashes.add(boxscore_hash(cached))
+    finally:
+        set_json_backend(active)
+    assert len(hashes) == 1
+    assert boxscore_hash(dict(reversed(list(cached.items())))) == boxscore_hash(cached)
+
+def test_schedule_backs_off_within_the_budget_and_window(tmp_path):
+    config.GAMES_DB_PATH = str(tmp_path)
+    started = time.time()
+    schedule = RevalidationSchedule(budget=2)
+    for game_id in (3, 1, 2):
+        with mock.patch.object(time, 'time', lambda: started + game_id):
+            schedule.track(game_id, {"game": game_id})
+
+    def due(at: float):
+        with mock.patch.object(time, 'time', lambda: started + at):
+            return schedule.due()
+
+    assert due(REVALIDATE_FIRST_DELAY) == []
+    assert due(REVALIDATE_FIRST_DELAY + 3) == [1, 2], "not the most overdue games first, or over budget"
+    with mock.patch.object(time, 'time', lambda: started + REVALIDATE_FIRST_DELAY + 3):
+        assert not schedule.checked(1, boxscore_hash({"game": 1}))
+        assert schedule.checked(2, "corrected")
+    assert due(REVALIDATE_FIRST_DELAY + 4) == [3]
+    assert due(3 * REVALIDATE_FIRST_DELAY + 2) == [3], "the second check wasn't twice as far out"
+    assert due(3 * REVALIDATE_FIRST_DELAY + 4) == [3, 1], "game 3 is the most overdue, then game 1 within the budget"
+    assert due(REVALIDATE_WINDOW + 4) == [] and not schedule.games, "games kept past the window"
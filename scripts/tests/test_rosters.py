@@ -0,0 +1,81 @@
+"""Effective-dated roster moves and the cached roster lookups"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import GAME_ID_START
+from games_db import cache_projection, load_cached_boxscore
+from jsonio import dump_json_file, file_version, load_json_file
+from leagues import published
+from rosters import load_roster_inputs
+from stats_fetcher import StatsFetcher
+
+@pytest.fixture
+def played_today(league):
+    """A run whose last day of games is today, and a rostered skater who played in it: (workspace, player)"""
+    workspace = league.fresh()
+    boxscores = {game_id: load_cached_boxscore(game_id) for game_id in range(GAME_ID_START, GAME_ID_START + league.games)}
+    last = max(boxscore['gameDate'] for boxscore in boxscores.values())
+    today = datetime.now().strftime('%Y-%m-%d')
+    for game_id, boxscore in boxscores.items():
+        if boxscore['gameDate'] == last:
+            cache_projection(game_id, dict(boxscore, gameDate=today))
+    StatsFetcher().run(rate_limit=0)
+    player = next(player for player in published(workspace)['all_olympic_players']
+                  if player['wally_team'] and player['pos'] != 'G'
+                  and any(game['date'] == today for game in player['game_log']))
+    return workspace, player
+
+def move_player(workspace: str, player: dict, **entry) -> str:
+    """Move player to another Wally team in rosters.json; returns the team"""
+    rosters = load_json_file(f"{workspace}/rosters.json")
+    moved = next(p for p in rosters[player['wally_team']] if p['name'] == player['name'])
+    rosters[player['wally_team']].remove(moved)
+    team = next(team for team in rosters if team != player['wally_team'])
+    rosters[team].append(dict(moved, **entry))
+    dump_json_file(rosters, f"{workspace}/rosters.json")
+    return team
+
+def team_entry(standings: dict, team: str, name: str) -> dict:
+    return next(p for p in standings['teams'][team]['players'] if p['name'] == name)
+
+def test_move_takes_effect_after_the_games_already_played(played_today):
+    workspace, player = played_today
+    new_team = move_player(workspace, player)
+    StatsFetcher().run(rate_limit=0)
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+    assert [move['effective'] for move in load_json_file(f"{workspace}/db/roster_moves.json")['moves']] == [tomorrow]
+    standings = published(workspace)
+    former = team_entry(standings, player['wally_team'], player['name'])
+    assert former['status'] == 'former' and former['stats'] == player['stats'], "today's game left the old team"
+    assert team_entry(standings, new_team, player['name'])['stats']['gp'] == 0
+
+def test_roster_entry_effective_date_is_kept(played_today):
+    workspace, player = played_today
+    today = datetime.now().strftime('%Y-%m-%d')
+    new_team = move_player(workspace, player, effective=today)
+    StatsFetcher().run(rate_limit=0)
+    assert [move['effective'] for move in load_json_file(f"{workspace}/db/roster_moves.json")['moves']] == [today]
+    standings = published(workspace)
+    played = sum(1 for game in player['game_log'] if game['date'] == today)
+    assert team_entry(standings, new_team, player['name'])['stats']['gp'] == played
+    assert team_entry(standings, player['wally_team'], player['name'])['stats']['gp'] == player['stats']['gp'] - played
+
+def test_lookup_cache_is_reused_until_an_input_changes(league):
+    workspace = league.fresh()
+    cache_path = f"{workspace}/db/lookups.bin"
+    inputs = load_roster_inputs()
+    version = file_version(cache_path)
+    assert load_roster_inputs() == inputs and file_version(cache_path) == version, "unchanged inputs rebuilt the cache"
+
+    team, players = next(iter(inputs['rosters'].items()))
+    player = {"name": players[0]['name'], "wally_team": team}
+    new_team = move_player(workspace, player)
+    assert load_roster_inputs()['player_lookup'][player['name']]['team'] == new_team
+    dump_json_file({"X. Nobody": player['name']}, f"{workspace}/name_overrides.json")
+    assert load_roster_inputs()['name_overrides'] == {"X. Nobody": player['name']}
+
+    with open(cache_path, 'wb') as f:
+        f.write(b'not marshal data')
+    assert load_roster_inputs()['player_lookup'][player['name']]['team'] == new_team
@@ -0,0 +1,144 @@
+"""Scoring-rule validation and fantasy points"""
+
+import random
+
+import pytest
+
+from records import GameStatTable
+from scoring import DEFAULT_SCORING, RotoEngine, ScenarioEngine, ScoringRules, parse_scenario, percentile_ranks
+
+def save_pct_category(**qualify) -> dict:
+    return {"name": "save_pct", "ratio": ["saves", "shots_against"], "qualify": qualify}
+
+@pytest.mark.parametrize("missing", ['stat', 'min', 'flag'])
+def test_qualify_entry_missing_a_key_names_the_category(missing):
+    qualify = {"stat": "shots_against", "min": 20, "flag": "sv_qualified"}
+    del qualify[missing]
+    with pytest.raises(ValueError, match=f"qualify in save_pct is missing {missing}"):
+        ScoringRules({"categories": [save_pct_category(**qualify)]})
+
+@pytest.mark.parametrize("config, message", [
+    ({"categories": [{"name": "goals", "stat": "shots"}]}, "unknown stat 'shots' in goals"),
+    ({"categories": [{"name": "gaa", "ratio": ["goals"]}]}, "ratio in gaa needs two stats"),
+    ({"categories": [{"stat": "goals"}]}, "category without a name"),
+    ({"fantasy_points": {"skater": {"hits": 1}}}, "unknown stat 'hits' in fantasy_points.skater"),
+    ({"ties": "worst"}, "unknown tie rule 'worst'"),
+])
+def test_bad_config_raises_value_error(config, message):
+    with pytest.raises(ValueError, match=message):
+        ScoringRules(config)
+
+def test_qualification_zeroes_the_category_and_sets_the_flag():
+    rules = ScoringRules()
+    sums = dict.fromkeys(GameStatTable.STAT_COLUMNS, 0)
+    assert rules.team_totals(dict(sums, saves=18, shots_against=19))['save_pct'] == 0
+    qualified = rules.team_totals(dict(sums, saves=18, shots_against=20))
+    assert qualified['save_pct'] == 0.9 and qualified['sv_qualified'] is True
+
+def test_fantasy_points_match_row_by_row_weights():
+    rng = random.Random(45)
+    table = GameStatTable()
+    for i in range(400):
+        table.append(i, 0, i, -1, *(rng.randrange(-3, 30) for _ in GameStatTable.STAT_COLUMNS), 0)
+    rules = ScoringRules()
+    rows = rng.sample(range(len(table)), 150)
+    goalie = [rng.random() < 0.2 for _ in rows]
+    weights = DEFAULT_SCORING['fantasy_points']
+    expected = [sum(table[stat][row] * weight for stat, weight in weights['goalie' if is_goalie else 'skater'].items())
+                for row, is_goalie in zip(rows, goalie)]
+    assert rules.fantasy_points(table, rows, goalie) == expected
+    for size in (0, 1, 2):
+        assert rules.fantasy_points(table, rows[:size], goalie[:size]) == expected[:size]
+
+def test_percentile_ranks_match_pairwise_mid_ranks():
+    rng = random.Random(44)
+    for trial in range(200):
+        values = [rng.choice((0, 1, 2, 2, 3, 0.5, -1)) * rng.randrange(1, 4) for _ in range(rng.randrange(1, 40))]
+        expected = [50.0 * (2 * sum(w < v for w in values) + sum(w == v for w in values)) / len(values) for v in values]
+        assert percentile_ranks(values) == expected, f"trial {trial}"
+    assert percentile_ranks([7]) == [50.0]
+    assert percentile_ranks([1, 2, 3, 4]) == [12.5, 37.5, 62.5, 87.5]
+
+def test_rank_category_splits_or_shares_the_best_points_for_ties():
+    values = [5, 9, 5, 1, 5]
+    split = RotoEngine().rank_category(values)
+    assert split == ([2, 1, 2, 5, 2], [3.0, 5, 3.0, 1, 3.0])
+    best = RotoEngine(ScoringRules({"ties": "best"})).rank_category(values)
+    assert best == ([2, 1, 2, 5, 2], [4, 5, 4, 1, 4])
+
+def test_unqualified_teams_tie_after_the_qualified_ones():
+    ranks, points = RotoEngine().rank_category([0.91, 0.95, 0.99, 0.0], [True, True, False, False])
+    assert ranks == [2, 1, 3, 3] and points == [3, 4, 1.5, 1.5]
+
+def test_score_matches_standings_totals():
+    rng = random.Random(32)
+    engine = RotoEngine()
+    totals = {f"Team {t}": {"goals": rng.randrange(4), "assists": rng.randrange(4), "plus_minus": rng.randrange(-2, 2),
+                            "pim": rng.randrange(3) * 2, "goalie_wins": rng.randrange(3),
+                            "save_pct": rng.choice((0.9, 0.92)), "sv_qualified": rng.random() > 0.3}
+              for t in range(12)}
+    columns = {category: [t[category] for t in totals.values()] for category in engine.categories}
+    qualified = {'save_pct': [t['sv_qualified'] for t in totals.values()]}
+    by_team = {row['team']: row['total_roto_points'] for row in engine.standings(totals)}
+    assert engine.score(columns, qualified) == [by_team[team] for team in totals]
+    # Every category hands out 1 + 2 + ... + n points in total
+    assert sum(by_team.values()) == len(engine.categories) * sum(range(1, len(totals) + 1))
+
+def random_team_sums(rng: random.Random, teams: int = 8) -> dict:
+    sums = {}
+    for t in range(teams):
+        shots = rng.choice((12, 19, 20, 25, 40))
+        sums[f"Team {t}"] = {"gp": 10, "goals": rng.randrange(6), "assists": rng.randrange(8),
+                             "plus_minus": rng.randrange(-3, 4), "pim": rng.randrange(4) * 2, "wins": rng.randrange(3),
+                             "saves": shots - rng.randrange(4), "shots_against": shots}
+    return sums
+
+def full_scores(sums: dict, deltas: dict, engine: RotoEngine) -> dict:
+    """Total points per team from scratch, with deltas added to the teams' sums"""
+    totals = {}
+    for team, team_sums in sums.items():
+        changed = dict(team_sums)
+        for stat, value in deltas.get(team, {}).items():
+            changed[stat] += value
+        totals[team] = engine.team_totals(changed)
+    return {row['team']: row['total_roto_points'] for row in engine.standings(totals)}
+
+def test_scenarios_match_reranking_from_scratch():
+    rng = random.Random(33)
+    engine = RotoEngine()
+    for trial in range(100):
+        sums = random_team_sums(rng)
+        players = {f"Player {t}": team for t, team in enumerate(sums)}
+        scenario = ScenarioEngine(sums, players, engine)
+        team, player = rng.sample(list(sums), 2)
+        deltas = {team: {"goals": rng.randrange(-2, 3), "saves": 2, "shots_against": 2}}
+        player_deltas = {f"Player {list(sums).index(player)}": {"pim": 4, "goalie_wins": 1}}
+        expected = full_scores(sums, {**deltas, player: {"pim": 4, "wins": 1}}, engine)
+        assert scenario.score(player_deltas, deltas) == expected, f"trial {trial}"
+        assert {row['team']: row['total_roto_points'] for row in scenario.standings(player_deltas, deltas)} == expected
+
+        scenario.apply(deltas)
+        assert {row['team']: row['roto_points'] for row in scenario.ranking()} == full_scores(sums, deltas, engine)
+
+def test_marginal_points_are_one_more_of_each_category():
+    sums = random_team_sums(random.Random(133))
+    scenario = ScenarioEngine(sums, {}, RotoEngine())
+    base = full_scores(sums, {}, scenario.roto)
+    marginal = scenario.marginal_points()
+    for team in sums:
+        assert marginal[team]['goals'] == full_scores(sums, {team: {"goals": 1}}, scenario.roto)[team] - base[team]
+        save = {team: {"saves": 1, "shots_against": 1}}
+        assert marginal[team]['save_pct'] == full_scores(sums, save, scenario.roto)[team] - base[team]
+
+def test_parse_scenario_and_its_errors():
+    assert parse_scenario(["Nico Hischier:goals=2,pm=-1", "Bardown: pim = 4", "Nico Hischier:assists=1"]) == {
+        "Nico Hischier": {"goals": 2, "pm": -1, "assists": 1}, "Bardown": {"pim": 4}}
+    with pytest.raises(ValueError, match="should look like 'Name:goals=1,assists=2'"):
+        parse_scenario(["goals=2"])
+    with pytest.raises(ValueError, match="stat=integer"):
+        parse_scenario(["Bardown:goals=two"])
+    scenario = ScenarioEngine(random_team_sums(random.Random(3)), {}, RotoEngine())
+    with pytest.raises(ValueError, match="Nobody is not a Wally team or rostered player"):
+        scenario.score({"Nobody": {"goals": 1}})
+    with pytest.raises(ValueError, match="unknown scenario stat 'hits'"):
+        scenario.score(team_deltas={"Team 0": {"hits": 1}})